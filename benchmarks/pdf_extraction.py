@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Benchmark serial vs process-pool PDF text extraction on a directory of local PDFs.
+
+Usage:
+    python benchmarks/pdf_extraction.py [pdf_dir] [--workers 2 4 8] [--pages-per-task 16]
+
+Runs the serial in-process path first, then the process pool for each worker
+count, and checks that every mode returns the same text.
+"""
+
+import argparse
+import os
+import time
+from pathlib import Path
+from literature_review.pdf_processor import PDFProcessor
+
+def time_extraction(processor: PDFProcessor, pdf_paths: list[Path]) -> tuple[float, list[str]]:
+    """Extract all PDFs and return the wall time and the texts."""
+    start = time.perf_counter()
+    texts = processor.extract_texts(pdf_paths)
+    return time.perf_counter() - start, texts
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark PDF text extraction.")
+    parser.add_argument("pdf_dir", nargs="?", default="papers", help="Directory of PDF files (default: papers)")
+    parser.add_argument("--workers", type=int, nargs="+", default=[2, 4, os.cpu_count() or 4],
+                        help="Worker process counts to compare against the serial path")
+    parser.add_argument("--pages-per-task", type=int, default=16, help="Pages per worker task")
+    args = parser.parse_args()
+
+    pdf_paths = sorted(Path(args.pdf_dir).glob("*.pdf"))
+    if not pdf_paths:
+        print(f"No PDF files found in {args.pdf_dir}")
+        return
+    total_mb = sum(path.stat().st_size for path in pdf_paths) / 1e6
+    print(f"Corpus: {len(pdf_paths)} PDFs, {total_mb:.1f} MB")
+
+    serial_time, serial_texts = time_extraction(PDFProcessor(workers=1), pdf_paths)
+    print(f"\n{'mode':<24}{'seconds':>10}{'PDFs/s':>10}{'speedup':>10}")
+    print(f"{'serial':<24}{serial_time:>10.2f}{len(pdf_paths) / serial_time:>10.1f}{1:>10.2f}")
+
+    for workers in sorted(set(args.workers)):
+        processor = PDFProcessor(workers=workers, pages_per_task=args.pages_per_task)
+        # Start the worker processes before timing
+        processor.extract_texts(pdf_paths[:1])
+        elapsed, texts = time_extraction(processor, pdf_paths)
+        processor.close()
+
+        mode = f"pool, {workers} workers"
+        print(f"{mode:<24}{elapsed:>10.2f}{len(pdf_paths) / elapsed:>10.1f}{serial_time / elapsed:>10.2f}")
+        if texts != serial_texts:
+            print("  Warning: output differs from the serial path")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Benchmark summary parsing for gather_summaries.py on a synthetic corpus.
+
+Usage:
+    python benchmarks/summary_parsing.py [--papers 10000] [--workers 2 4 8] [--seed 0]
+
+Writes a corpus of synthetic analyses in the heading styles Claude uses to a
+temporary directory, then times the former per-file regexes, the single-pass
+parser in-process, and the single-pass parser on a process pool for each
+worker count. Each mode's fields are checked against the sections the
+corpus was generated from, and the wrong ones are counted.
+"""
+
+import argparse
+import os
+import random
+import re
+import tempfile
+import time
+from pathlib import Path
+from literature_review.summary_parser import SUMMARY_FIELDS, SummaryParser, parse_summary_file
+
+WORDS = (
+    "model training scaling attention layer token loss benchmark dataset transformer gradient "
+    "representation probe circuit feature sparse evaluation baseline ablation objective reward"
+).split()
+
+HEADING_STYLES = (
+    "{label}:",
+    "**{label}:**",
+    "**{label}**:",
+    "## {label}:",
+    "{number}. **{label}:**",
+    "* **{label}:**"
+)
+
+def sentence(rng: random.Random) -> str:
+    """Build a sentence of filler words with a page reference."""
+    words = " ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 25)))
+    return f"{words.capitalize()} (Section {rng.randint(1, 9)})."
+
+def paragraph(rng: random.Random) -> str:
+    """Build a paragraph of a few sentences."""
+    return " ".join(sentence(rng) for _ in range(rng.randint(2, 6)))
+
+def synthetic_summary(rng: random.Random) -> tuple[str, dict]:
+    """Build the markdown of one synthetic paper analysis and its expected fields."""
+    style = rng.choice(HEADING_STYLES)
+    sections = [
+        (rng.choice(("Summary", "Summary of the paper", "Summary of the Paper")), rng.randint(1, 4)),
+        (rng.choice(("Relation to your project", "Key findings relevant to your project")), rng.randint(1, 5)),
+        (rng.choice(("Potential Extensions", "Potential extensions/topics", "Potential Topics")), rng.randint(1, 4))
+    ]
+    parts = []
+    bodies = []
+    for number, (label, paragraphs) in enumerate(sections, 1):
+        bodies.append("\n\n".join(paragraph(rng) for _ in range(paragraphs)))
+        parts.append(f"{style.format(label=label, number=number)} {bodies[-1]}")
+    score = str(rng.randint(0, 100))
+    reasoning = "\n\n".join(paragraph(rng) for _ in range(rng.randint(1, 3)))
+    parts += [f"{style.format(label='Relevance score', number=len(sections) + 1)} {score}/100", reasoning]
+    if rng.random() < 0.5:
+        parts.append("Would you like me to expand on any of these points?")
+    return "\n\n".join(parts), dict(zip(SUMMARY_FIELDS, bodies + [score, reasoning]))
+
+# Per-file regexes gather_summaries.py used before the single-pass parser, kept as the baseline
+LEGACY_BOUNDARY = r'(?=\n\n(?:\*\*)?[A-Z][a-zA-Z ]*(?:of (?:the )?(?:[Pp]aper|.*?))?:|\Z)'
+
+def legacy_parse_summary_file(file_path: str) -> dict:
+    """Parse a summary file the way gather_summaries.py did before."""
+    with open(file_path, encoding="utf-8") as f:
+        content = f.read()
+    parsed = dict.fromkeys(SUMMARY_FIELDS, "N/A")
+    if match := re.search(r'(?:\*\*)?(?:Summary|Summary of (?:the )?(?:[Pp]aper|.*?)):.*?(?:\*\*)?\s*(.*?)' + LEGACY_BOUNDARY, content, re.DOTALL):
+        parsed["Summary"] = match.group(1).strip()
+    if match := re.search(r'(?:\*\*)?(?:Relation to|Key findings relevant to|Relevance to) .*?:.*?(?:\*\*)?\s*(.*?)' + LEGACY_BOUNDARY, content, re.DOTALL):
+        parsed["Relation to project"] = match.group(1).strip()
+    if match := re.search(r'(?:\*\*)?Potential (?:[Ee]xtensions|[Ee]xtensions/[Tt]opics|[Tt]opics|[Ee]xtensions.*?):.*?(?:\*\*)?\s*(.*?)' + LEGACY_BOUNDARY, content, re.DOTALL):
+        parsed["Potential Extensions"] = match.group(1).strip()
+    if match := re.search(r'(?:\*\*)?(?:Relevance|Score).*?:.*?(?:\*\*)?\s*(\d+)/100\s*(?:\*\*)?(.*)', content, re.DOTALL):
+        parsed["Relevance"] = match.group(1)
+        sentences = match.group(2).strip().split('\n\n')
+        if sentences and sentences[-1].strip().endswith('?'):
+            sentences = sentences[:-1]
+        parsed["Reasoning"] = '\n\n'.join(sentences).strip()
+    return parsed
+
+def time_parsing(parse, file_paths: list[str]) -> tuple[float, list[dict]]:
+    """Parse all files and return the wall time and the results."""
+    start = time.perf_counter()
+    results = parse(file_paths)
+    return time.perf_counter() - start, results
+
+def count_errors(results: list[dict], expected: list[dict]) -> int:
+    """Count the fields that differ from the generated sections."""
+    return sum(result[field] != fields[field] for result, fields in zip(results, expected) for field in SUMMARY_FIELDS)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark summary parsing on a synthetic corpus.")
+    parser.add_argument("--papers", type=int, default=10000, help="Number of synthetic summaries (default: 10000)")
+    parser.add_argument("--workers", type=int, nargs="+", default=[2, 4, os.cpu_count() or 4],
+                        help="Worker process counts to compare against the in-process parser")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the synthetic corpus")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    with tempfile.TemporaryDirectory() as corpus_dir:
+        file_paths = []
+        expected = []
+        for index in range(args.papers):
+            file_path = Path(corpus_dir) / f"2401.{index:05d}.md"
+            text, fields = synthetic_summary(rng)
+            file_path.write_text(text, encoding="utf-8")
+            file_paths.append(str(file_path))
+            expected.append(fields)
+        total_mb = sum(os.path.getsize(file_path) for file_path in file_paths) / 1e6
+        print(f"Corpus: {len(file_paths)} summaries, {total_mb:.1f} MB")
+
+        legacy_time, results = time_parsing(lambda paths: [legacy_parse_summary_file(path) for path in paths], file_paths)
+        print(f"\n{'mode':<24}{'seconds':>10}{'files/s':>10}{'speedup':>10}{'errors':>8}")
+        print(f"{'former regexes':<24}{legacy_time:>10.2f}{len(file_paths) / legacy_time:>10.0f}"
+              f"{1:>10.2f}{count_errors(results, expected):>8}")
+
+        elapsed, results = time_parsing(lambda paths: [parse_summary_file(path) for path in paths], file_paths)
+        print(f"{'single pass':<24}{elapsed:>10.2f}{len(file_paths) / elapsed:>10.0f}"
+              f"{legacy_time / elapsed:>10.2f}{count_errors(results, expected):>8}")
+
+        for workers in sorted(set(min(workers, os.cpu_count() or 1) for workers in args.workers)):
+            # Worker start-up is included, as gather_summaries.py pays it on every run
+            elapsed, results = time_parsing(SummaryParser(workers=workers).parse_files, file_paths)
+            mode = f"pool, {workers} workers"
+            print(f"{mode:<24}{elapsed:>10.2f}{len(file_paths) / elapsed:>10.0f}"
+                  f"{legacy_time / elapsed:>10.2f}{count_errors(results, expected):>8}")
+
+if __name__ == "__main__":
+    main()
@@ -1,139 +1,84 @@
 #!/usr/bin/env python3
 
-import arxiv
-import pandas as pd
+import argparse
+import os
 from datetime import datetime, timedelta
 import logging
 from datetime import timezone
+from literature_review.config import Config
+from literature_review.harvester import ArxivHarvester
+from literature_review.metadata_store import MetadataStore
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
-def collect_papers_for_date_range(start_date, end_date):
+def collect_recent_papers(days_back=180, chunk_size=15, output_file='recent_ml_papers.csv',
+                          restart=False, incremental=False, config=None):
     """
-    Collect papers for a specific date range.
-    
-    Args:
-        start_date: datetime object for range start (inclusive)
-        end_date: datetime object for range end (inclusive)
-    
-    Returns:
-        list: Papers in the date range
-    """
-    # Format dates for arXiv query
-    start_str = start_date.strftime('%Y%m%d')
-    end_str = end_date.strftime('%Y%m%d')
-    
-    # Set up the arXiv search client
-    client = arxiv.Client()
-    
-    # Create the search query for ML papers within date range
-    search = arxiv.Search(
-        query=f"cat:cs.LG AND submittedDate:[{start_str} TO {end_str}]",
-        max_results=None,
-        sort_by=arxiv.SortCriterion.SubmittedDate,
-        sort_order=arxiv.SortOrder.Descending
-    )
-    
-    papers = []
-    try:
-        for result in client.results(search):
-            paper_info = {
-                'title': result.title,
-                'authors': ', '.join(author.name for author in result.authors),
-                'abstract': result.summary,
-                'published_date': result.published.strftime('%Y-%m-%d'),
-                'arxiv_id': result.entry_id.split('/')[-1],
-                'url': result.entry_id
-            }
-            papers.append(paper_info)
-            
-            # Log progress
-            if len(papers) % 100 == 0:
-                logging.info(f"Collected {len(papers)} papers for date range {start_str} to {end_str}")
-                
-    except arxiv.UnexpectedEmptyPageError:
-        logging.warning(f"Reached API limit for date range {start_str} to {end_str} after collecting {len(papers)} papers")
-    except Exception as e:
-        logging.error(f"Error collecting papers for date range {start_str} to {end_str}: {str(e)}")
-        if not papers:
-            raise
-            
-    return papers
-
-def collect_recent_papers(days_back=180, chunk_size=15):
-    """
-    Collect papers from arXiv's Machine Learning section (cs.LG) from the past specified days.
-    Uses date chunking to bypass API limits.
+    Collect papers from arXiv's Machine Learning section (cs.LG, or the categories
+    configured under [harvest]) from the past specified days.
+    Uses adaptive date chunking to bypass API limits. Chunks are fetched concurrently and
+    written to output_file as they finish; an interrupted run resumes where it stopped.
     
     Args:
         days_back (int): Number of days to look back (default: 180)
-        chunk_size (int): Number of days per chunk (default: 15)
+        chunk_size (int): Number of days of the first chunk; later chunks are sized
+            from the observed paper density (default: 15)
+        output_file (str): CSV file, or JSON Lines file if it ends in .jsonl
+        restart (bool): Ignore the checkpoint of an interrupted run and start over
+        incremental (bool): If output_file already holds a finished harvest, only fetch papers
+            submitted or updated since its latest paper and upsert them into it
+        config (Config): Configuration with the [harvest] settings (default: config.toml)
     
     Returns:
-        list: List of dictionaries containing paper information
+        int: Number of papers added by this run
     """
+    config = config or Config()
     end_date = datetime.now(timezone.utc)
     start_date = end_date - timedelta(days=days_back)
     
-    logging.info(f"Collecting papers from the last {days_back} days (since {start_date.strftime('%Y-%m-%d')})...")
+    harvester = ArxivHarvester(
+        output_file,
+        categories=config.harvest_categories,
+        workers=config.harvest_workers,
+        requests_per_minute=config.harvest_requests_per_minute,
+        page_size=config.harvest_page_size,
+        max_results_per_window=config.harvest_max_results_per_window,
+        # Keep the metadata of harvested papers for the other scripts
+        metadata_store=MetadataStore(ttl_days=config.metadata_ttl_days)
+    )
     
-    all_papers = []
-    current_start = start_date
+    if incremental and not restart and os.path.exists(output_file) and not harvester.has_checkpoint():
+        added, changed = harvester.update(end_date, overlap_days=config.harvest_overlap_days)
+        logging.info(f"Added {added} new papers and updated {changed} papers in {output_file}")
+        return added
     
-    while current_start < end_date:
-        # Calculate chunk end date
-        chunk_end = min(current_start + timedelta(days=chunk_size), end_date)
-        
-        # Collect papers for this chunk
-        logging.info(f"Collecting papers from {current_start.strftime('%Y-%m-%d')} to {chunk_end.strftime('%Y-%m-%d')}...")
-        chunk_papers = collect_papers_for_date_range(current_start, chunk_end)
-        all_papers.extend(chunk_papers)
-        
-        # Move to next chunk
-        current_start = chunk_end
-        
-        # Sleep between chunks to be nice to the API
-        if current_start < end_date:
-            logging.info("Sleeping between chunks...")
-            import time
-            time.sleep(3)
+    logging.info(f"Collecting papers from the last {days_back} days (since {start_date.strftime('%Y-%m-%d')})...")
+    written = harvester.harvest(start_date, end_date, chunk_days=chunk_size, restart=restart)
     
-    logging.info(f"Successfully collected {len(all_papers)} papers from cs.LG in the specified timeframe")
-    return all_papers
-
-def save_papers(papers, output_file='recent_ml_papers.csv'):
-    """
-    Save the collected papers to a CSV file.
-    
-    Args:
-        papers (list): List of paper dictionaries
-        output_file (str): Path to save the CSV file
-    """
-    try:
-        df = pd.DataFrame(papers)
-        # Remove duplicates if any (can happen with overlapping date ranges)
-        df = df.drop_duplicates(subset=['arxiv_id'])
-        df.to_csv(output_file, index=False)
-        logging.info(f"Successfully saved {len(df)} papers to {output_file}")
-    except Exception as e:
-        logging.error(f"Error saving papers to CSV: {str(e)}")
-        raise
+    logging.info(f"Successfully saved {written} papers from {', '.join(config.harvest_categories)} to {output_file}")
+    return written
 
 def main():
+    parser = argparse.ArgumentParser(description="Collect recent arXiv papers into a CSV or JSON Lines file.")
+    parser.add_argument("--days-back", type=int, default=180, help="Number of days to look back (default: 180)")
+    parser.add_argument("--chunk-size", type=float, default=15, help="Number of days of the first chunk (default: 15)")
+    parser.add_argument("--output", default="recent_ml_papers.csv",
+                        help="Output file, .csv or .jsonl (default: recent_ml_papers.csv)")
+    parser.add_argument("--restart", action="store_true",
+                        help="Ignore the checkpoint of an interrupted run and start over")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Only fetch papers submitted or updated since the last run and add them to the output")
+    args = parser.parse_args()
+    
     try:
-        # Collect papers
-        papers = collect_recent_papers()
-        
-        # Save to CSV
-        if papers:
-            save_papers(papers)
-        else:
+        written = collect_recent_papers(args.days_back, args.chunk_size, args.output, args.restart, args.incremental)
+        if not written and not args.incremental:
             logging.error("No papers were collected")
-        
+    
     except Exception as e:
         logging.error(f"Script execution failed: {str(e)}")
         raise
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Rank harvested arXiv papers against the project description and keep the most relevant.
+
+Reads the output of collect_recent_papers.py, scores each title and abstract
+against project.docx with BM25, and writes the URLs of the top papers to
+paper_list.txt, ready for run.py. Scoring is local and takes seconds even for
+tens of thousands of abstracts, so only the selected papers are downloaded
+and analyzed.
+
+Usage:
+    python filter_papers.py [recent_ml_papers.csv] [--top-k 100] [--min-score 0.2] [--output paper_list.txt]
+"""
+
+import argparse
+import time
+import pandas as pd
+from literature_review.config import Config
+from literature_review.docx_handler import DocxHandler
+from literature_review.metadata_store import MetadataStore
+from literature_review.relevance_filter import RelevanceFilter
+
+def load_papers(input_file: str) -> pd.DataFrame:
+    """Load harvested papers from a CSV or JSON Lines file."""
+    if input_file.endswith(".jsonl"):
+        return pd.read_json(input_file, lines=True, dtype={"arxiv_id": str})
+    return pd.read_csv(input_file, dtype={"arxiv_id": str})
+
+def main():
+    config = Config()
+    parser = argparse.ArgumentParser(description="Select the harvested papers most relevant to the project.")
+    parser.add_argument("input", nargs="?", default="recent_ml_papers.csv",
+                        help="Output of collect_recent_papers.py (default: recent_ml_papers.csv)")
+    parser.add_argument("--top-k", type=int, default=config.filter_top_k,
+                        help=f"Number of papers to keep (default: {config.filter_top_k})")
+    parser.add_argument("--min-score", type=float, default=config.filter_min_score,
+                        help="Keep only papers scoring at least this fraction of the best score, 0-1")
+    parser.add_argument("--output", default=config.paper_list,
+                        help=f"File to write the selected arXiv URLs to (default: {config.paper_list})")
+    args = parser.parse_args()
+    
+    papers = load_papers(args.input)
+    project_context = DocxHandler(config.project_doc).get_document_content()
+    documents = (papers["title"].fillna("") + "\n" + papers["abstract"].fillna("")).tolist()
+    
+    start = time.perf_counter()
+    relevance_filter = RelevanceFilter()
+    scores = relevance_filter.score(project_context, documents)
+    selected = relevance_filter.select(scores, top_k=args.top_k, min_score=args.min_score)
+    elapsed = time.perf_counter() - start
+    
+    with open(args.output, "w") as f:
+        for index in selected:
+            arxiv_id = MetadataStore.split_version(papers["arxiv_id"].iloc[index])[0]
+            f.write(f"https://arxiv.org/abs/{arxiv_id}\n")
+    
+    print(f"Scored {len(papers)} abstracts in {elapsed:.2f}s and wrote {len(selected)} papers to {args.output}")
+    for index in selected[:10]:
+        print(f"  {scores[index]:6.2f}  {papers['title'].iloc[index]}")
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,14 @@
 import os
 import re
 import csv
-import glob
 import arxiv
 import pandas as pd
 from typing import Dict, List, Optional
+from literature_review.arxiv_downloader import ID_LIST_CHUNK, resolve_metadata
+from literature_review.config import Config
+from literature_review.metadata_store import MetadataStore
+from literature_review.summary_generator import SummaryGenerator
+from literature_review.summary_parser import SummaryParser
 
 def extract_arxiv_id(url: str) -> str:
     """Extract arxiv ID from URL."""
@@ -12,88 +16,84 @@ def extract_arxiv_id(url: str) -> str:
 
 def get_paper_metadata(arxiv_id: str) -> Dict:
     """Fetch paper metadata from arxiv API."""
-    try:
-        client = arxiv.Client()
-        search = arxiv.Search(id_list=[arxiv_id])
-        paper = next(client.results(search))
-        return {
-            'Arxiv ID': arxiv_id,
-            'Title': paper.title,
-            'Authors': ', '.join(author.name for author in paper.authors)
-        }
-    except Exception as e:
-        print(f"Error fetching metadata for {arxiv_id}: {e}")
-        return {
-            'Arxiv ID': arxiv_id,
-            'Title': 'N/A',
-            'Authors': 'N/A'
-        }
+    return get_papers_metadata([arxiv_id])[arxiv_id]
+
+def get_papers_metadata(arxiv_ids: List[str]) -> Dict[str, Dict]:
+    """Get metadata for many papers from the local metadata store.
 
-def parse_summary_file(file_path: str) -> Dict:
-    """Parse a markdown summary file to extract relevant sections."""
+    Only papers without a fresh record are fetched from the arxiv API,
+    up to 100 IDs per query.
+    """
+    config = Config()
+    metadata_store = MetadataStore(ttl_days=config.metadata_ttl_days)
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
+        records = resolve_metadata(metadata_store, arxiv.Client(page_size=ID_LIST_CHUNK), arxiv_ids)
+    except Exception as e:
+        print(f"Error fetching metadata: {e}")
+        records = metadata_store.get_many(arxiv_ids, include_stale=True)
+    
+    metadata = {}
+    for arxiv_id in arxiv_ids:
+        if record := records.get(arxiv_id):
+            metadata[arxiv_id] = {
+                'Arxiv ID': arxiv_id,
+                'Title': record['title'],
+                'Authors': ', '.join(record['authors'])
+            }
+        else:
+            print(f"Error fetching metadata for {arxiv_id}: not found")
+            metadata[arxiv_id] = {
+                'Arxiv ID': arxiv_id,
+                'Title': 'N/A',
+                'Authors': 'N/A'
+            }
+    return metadata
 
-        # Initialize default values
-        summary = relevance = relation = extensions = reasoning = "N/A"
+def find_summary_files(arxiv_ids: List[str], summaries_dir: str) -> Dict[str, str]:
+    """Find the latest summary file of each paper.
 
-        # Extract sections using regex patterns
-        # Handle various summary header formats:
-        # - Summary:
-        # - Summary of the paper:
-        # - Summary of [paper name]:
-        # - Summary of the Paper:
-        if summary_match := re.search(r'(?:\*\*)?(?:Summary|Summary of (?:the )?(?:[Pp]aper|.*?)):.*?(?:\*\*)?\s*(.*?)(?=\n\n(?:\*\*)?[A-Z][a-zA-Z ]*(?:of (?:the )?(?:[Pp]aper|.*?))?:|\Z)', content, re.DOTALL):
-            summary = summary_match.group(1).strip()
-        
-        # Handle variations of the relation section:
-        # - Relation to your project:
-        # - Key findings relevant to your project:
-        # - Relevance to your project:
-        if relation_match := re.search(r'(?:\*\*)?(?:Relation to|Key findings relevant to|Relevance to) .*?:.*?(?:\*\*)?\s*(.*?)(?=\n\n(?:\*\*)?[A-Z][a-zA-Z ]*(?:of (?:the )?(?:[Pp]aper|.*?))?:|\Z)', content, re.DOTALL):
-            relation = relation_match.group(1).strip()
-        
-        # Handle "Potential Extensions" and variations (topics, extensions/topics)
-        if extensions_match := re.search(r'(?:\*\*)?Potential (?:[Ee]xtensions|[Ee]xtensions/[Tt]opics|[Tt]opics|[Ee]xtensions.*?):.*?(?:\*\*)?\s*(.*?)(?=\n\n(?:\*\*)?[A-Z][a-zA-Z ]*(?:of (?:the )?(?:[Pp]aper|.*?))?:|\Z)', content, re.DOTALL):
-            extensions = extensions_match.group(1).strip()
-        
-        # Find score and everything after it, handling trailing bold markers
-        score_and_text = re.search(r'(?:\*\*)?(?:Relevance|Score).*?:.*?(?:\*\*)?\s*(\d+)/100\s*(?:\*\*)?(.*)', content, re.DOTALL)
-        
-        if score_and_text:
-            relevance = score_and_text.group(1)
-            full_text = score_and_text.group(2).strip()
-            
-            # Split into sentences and remove the last one if it ends with a question mark
-            sentences = full_text.split('\n\n')
-            if sentences and sentences[-1].strip().endswith('?'):
-                full_text = '\n\n'.join(sentences[:-1])
-            
-            reasoning = full_text.strip()
-
-        return {
-            'Summary': summary,
-            'Relation to project': relation,
-            'Potential Extensions': extensions,
-            'Relevance': relevance,
-            'Reasoning': reasoning
-        }
-    except Exception as e:
-        print(f"Error parsing summary file {file_path}: {e}")
-        return {
-            'Summary': 'N/A',
-            'Relation to project': 'N/A',
-            'Potential Extensions': 'N/A',
-            'Relevance': 'N/A',
-            'Reasoning': 'N/A'
-        }
+    Paths come from the manifest written with the summaries, read once.
+    Structured analyses resolve to their raw JSON, whose fields are copied
+    to the CSV as they are. Papers missing from the manifest fall back to
+    one listing of the directory, for summaries written by older versions.
+    """
+    manifest = SummaryGenerator.load_manifest(summaries_dir)
+    files = set(os.listdir(summaries_dir)) if os.path.isdir(summaries_dir) else set()
+    
+    # Legacy summaries are named "paper_<index>_<timestamp>.md"; the largest name is the latest
+    legacy_files = {}
+    for name in files:
+        if match := re.fullmatch(r'paper_(\d+)_.*\.md', name):
+            index = int(match.group(1))
+            legacy_files[index] = max(legacy_files.get(index, name), name)
+    
+    summary_files = {}
+    for index, arxiv_id in enumerate(arxiv_ids, 1):
+        base_id = re.sub(r'v\d+$', '', arxiv_id)
+        if entry := manifest.get(arxiv_id) or manifest.get(base_id):
+            summary_files[arxiv_id] = os.path.join(summaries_dir, entry['raw_path'] if entry.get('structured') else entry['path'])
+        elif f'{arxiv_id}.md' in files:
+            summary_files[arxiv_id] = os.path.join(summaries_dir, f'{arxiv_id}.md')
+        elif index in legacy_files:
+            summary_files[arxiv_id] = os.path.join(summaries_dir, legacy_files[index])
+    return summary_files
 
 def main():
     # Read paper list
     with open('paper_list.txt', 'r') as f:
         paper_urls = [line.strip() for line in f if line.strip()]
     
+    arxiv_ids = [extract_arxiv_id(url) for url in paper_urls]
+    
+    # Look up metadata for all papers, fetching only what isn't stored locally
+    all_metadata = get_papers_metadata(arxiv_ids)
+    
+    # Resolve every summary file from the manifest in one read, then parse them all in parallel
+    config = Config()
+    summary_files = find_summary_files(arxiv_ids, config.summaries_dir)
+    parsed = SummaryParser(workers=config.gather_workers).parse_files(list(summary_files.values()))
+    summary_sections = dict(zip(summary_files, parsed))
+    
     # Create a list to store all paper data
     papers_data = []
     
@@ -102,17 +102,9 @@ def main():
         arxiv_id = extract_arxiv_id(url)
         
         # Get paper metadata
-        metadata = get_paper_metadata(arxiv_id)
-        
-        # Find corresponding summary file
-        summary_files = glob.glob(f'summaries/paper_{index}_*.md')
-        summary_data = {}
+        metadata = all_metadata[arxiv_id]
         
-        if summary_files:
-            # Use the most recent summary if multiple exist
-            latest_summary = max(summary_files)
-            if not latest_summary.endswith('raw.json'):  # Ignore raw json files
-                summary_data = parse_summary_file(latest_summary)
+        summary_data = summary_sections.get(arxiv_id, {})
         
         # Combine all data
         paper_data = {
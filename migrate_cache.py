@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+"""
+One-shot migration of the per-file JSON prompt cache into the SQLite cache database.
+
+Earlier versions wrote one {paper_id}_{prompt_hash}.json file per analysis into .cache/.
+This script imports them, including files written with the legacy hash, into
+.cache/prompt_cache.sqlite. Paper text and project context are moved to the
+content-addressed blob store in .cache/blobs/, also for entries already in the
+database. The JSON files are left in place; delete them once the migration has
+been checked.
+"""
+
+import argparse
+from literature_review.cache import PromptCache
+
+def main():
+    parser = argparse.ArgumentParser(description="Import JSON cache files into the cache database.")
+    parser.add_argument("--cache-dir", default=".cache", help="Directory of the cache database (default: .cache)")
+    parser.add_argument("--json-dir", default=None, help="Directory of the JSON cache files (default: --cache-dir)")
+    args = parser.parse_args()
+    
+    cache = PromptCache(cache_dir=args.cache_dir)
+    imported, skipped = cache.migrate_from_dir(args.json_dir or args.cache_dir)
+    
+    print(f"Imported {imported} cache entries into {cache.db_path}")
+    print(f"Moved the texts of {cache.compact()} entries to {cache.blobs.blob_dir}")
+    if skipped:
+        print(f"Skipped {skipped} corrupted files")
+
+if __name__ == "__main__":
+    main()
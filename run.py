@@ -9,6 +9,7 @@ Before running:
 4. List your arXiv paper URLs in 'paper_list.txt' (one URL per line)
 """
 
+import argparse
 import os
 from pathlib import Path
 from dotenv import load_dotenv
@@ -57,6 +58,15 @@ def read_paper_list():
     return urls
 
 def main():
+    parser = argparse.ArgumentParser(description="Analyze the papers listed in paper_list.txt.")
+    parser.add_argument(
+        "--verify",
+        action="store_true",
+        help="Download and extract every paper and check cached analyses against the PDF content, "
+             "instead of trusting a cached analysis for the same paper ID and settings"
+    )
+    args = parser.parse_args()
+    
     if not check_environment():
         return
     
@@ -77,11 +87,12 @@ def main():
     print("This may take a while depending on the number and size of papers.")
     
     # Run the analysis
-    review.analyze_papers(papers)
+    review.analyze_papers(papers, verify=args.verify)
     
     print("\nAnalysis complete! Check the 'summaries' directory for results:")
-    print("- Individual paper summaries: paper_*.md")
-    print("- Raw analysis data: paper_*_raw.json")
+    print("- Individual paper summaries: <arxiv_id>.md")
+    print("- Raw analysis data: <arxiv_id>_raw.json")
+    print("- Index of the latest summary of each paper: manifest.json")
     print("- Meta-summary across all papers: meta_summary_*.md")
 
 if __name__ == "__main__":
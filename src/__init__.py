@@ -1,9 +1,15 @@
+from pathlib import Path
+from typing import Callable
 from .arxiv_downloader import ArxivDownloader
 from .claude_analyzer import ClaudeAnalyzer
 from .docx_handler import DocxHandler
+from .metadata_store import MetadataStore
 from .pdf_processor import PDFProcessor
 from .summary_generator import SummaryGenerator
 from .config import Config
+from .pipeline import PaperPipeline
+from .text_cache import ExtractedTextCache
+from .triage import PaperTriage
 
 class LiteratureReview:
     def __init__(self, config: Config = None):
@@ -14,22 +20,211 @@ class LiteratureReview:
         """
         self.config = config or Config()
         self.doc_handler = DocxHandler(self.config.project_doc)
-        self.downloader = ArxivDownloader(papers_dir=self.config.papers_dir)
-        self.pdf_processor = PDFProcessor()
+        self.downloader = ArxivDownloader(
+            papers_dir=self.config.papers_dir,
+            workers=self.config.download_workers,
+            per_host_limit=self.config.download_per_host_limit,
+            metadata_store=MetadataStore(ttl_days=self.config.metadata_ttl_days)
+        )
         self.analyzer = ClaudeAnalyzer(config=self.config)
-        self.summary_generator = SummaryGenerator(output_dir=self.config.summaries_dir)
-        
-    def analyze_papers(self, arxiv_links: list[str]) -> None:
+        self.pdf_processor = PDFProcessor(
+            workers=self.config.pdf_workers,
+            pages_per_task=self.config.pdf_pages_per_task,
+            # Shares the analyzer's fingerprints so each PDF is hashed once per run
+            text_cache=ExtractedTextCache(fingerprints=self.analyzer.fingerprints) if self.config.pdf_cache_text else None
+        )
+        self.triage = PaperTriage(self.analyzer, config=self.config) if self.config.triage_enabled else None
+        self.summary_generator = SummaryGenerator(
+            output_dir=self.config.summaries_dir,
+            config=self.config,
+            cache=self.analyzer.cache
+        )
+    
+    def analyze_papers(self, arxiv_links: list[str], verify: bool = False) -> None:
         """Analyze a list of papers from arXiv.
         
+        Papers with a cached analysis for the current project context, prompt
+        template and model settings are not downloaded or extracted at all.
+        If triage is enabled, the other papers are first scored by a cheap
+        model and only the relevant ones are analyzed in full. Each analysis
+        is written to the summaries directory as soon as it is available,
+        and the meta-summary reads them back from there.
+        
         Args:
             arxiv_links: List of arXiv paper URLs to analyze
+            verify: If True, download and extract every paper and check cached
+                analyses against the PDF content instead of the paper ID alone
         """
         # Get project context
         project_context = self.doc_handler.get_document_content()
         
-        summaries = []
-        for link in arxiv_links:
+        paper_ids = [self.downloader._extract_arxiv_id(link) for link in arxiv_links]
+        # Only paper IDs are kept in memory; results go to disk as they arrive
+        missing = list(range(len(arxiv_links)))
+        if not verify:
+            missing = []
+            for index, paper_id in enumerate(paper_ids):
+                if cached_result := self.analyzer.get_cached_analysis(paper_id, project_context):
+                    print(f"Using cached analysis for paper {paper_id}")
+                    self._write_result(paper_id, cached_result, project_context)
+                else:
+                    missing.append(index)
+        
+        skipped = set()
+        if missing and self.triage:
+            triage_results = self._triage_links([arxiv_links[index] for index in missing], project_context)
+            for index, result in zip(missing, triage_results):
+                if result is not None:
+                    self._write_result(paper_ids[index], result, project_context)
+                    skipped.add(paper_ids[index])
+            missing = [index for index in missing if paper_ids[index] not in skipped]
+        try:
+            if missing:
+                self._analyze_links(
+                    [arxiv_links[index] for index in missing],
+                    project_context,
+                    lambda position, result: self._write_result(paper_ids[missing[position]], result, project_context)
+                )
+        finally:
+            self.analyzer.cache.flush()
+        
+        # Papers rejected by triage have no analysis to summarize
+        self.summary_generator.generate_meta_summary(
+            self.summary_generator.read_analyses([paper_id for paper_id in paper_ids if paper_id not in skipped])
+        )
+        
+        print("\nToken usage for paper analyses:")
+        print(self.analyzer.usage_report())
+        if self.triage:
+            print(self.triage.savings_report(self.analyzer.usage))
+    
+    def _write_result(self, paper_id: str, result: dict, project_context: str) -> None:
+        """Write a paper's result to the summaries directory and its manifest.
+        
+        Args:
+            paper_id: arXiv paper ID
+            result: Analysis result, or the stand-in of a paper rejected by triage
+            project_context: Content from the project's document
+        """
+        if result.get("triage_skipped"):
+            self.summary_generator.write_summary(paper_id, result, model=result["triage"]["model"])
+        else:
+            self.summary_generator.write_summary(
+                paper_id, result,
+                model=self.config.claude_model,
+                fingerprint=self.analyzer._analysis_fingerprint(paper_id, project_context)
+            )
+    
+    def _triage_links(self, arxiv_links: list[str], project_context: str) -> list[dict | None]:
+        """Score papers with the triage model and build stand-ins for the rejected ones.
+        
+        The triage model sees the title and abstract from the metadata store,
+        or the first pages of the PDF if no abstract is available.
+        
+        Args:
+            arxiv_links: List of arXiv paper URLs to triage
+            project_context: Content from the project's document
+        
+        Returns:
+            Stand-in results of rejected papers, and None for papers to analyze
+            in full, in the same order as arxiv_links
+        """
+        paper_ids = [self.downloader._extract_arxiv_id(link) for link in arxiv_links]
+        try:
+            metadata = self.downloader.resolve_metadata(paper_ids)
+        except Exception as e:
+            print(f"\nWarning: Failed to fetch abstracts for triage: {str(e)}")
+            metadata = {}
+        
+        paper_texts = {}
+        for paper_id in paper_ids:
+            record = metadata.get(paper_id)
+            if record and record.get("abstract"):
+                paper_texts[paper_id] = f"Title: {record['title']}\n\nAbstract: {record['abstract']}"
+        without_abstract = [link for paper_id, link in zip(paper_ids, arxiv_links) if paper_id not in paper_texts]
+        if without_abstract:
+            for paper_id, paper_text, _ in self._extract_papers(without_abstract):
+                paper_texts[paper_id] = paper_text[:self.config.triage_max_input_chars]
+        
+        papers = [(paper_id, paper_texts[paper_id]) for paper_id in paper_ids]
+        triage_results = self.triage.triage_papers(papers, project_context)
+        return [
+            None if triage["passed"] else self.triage.skipped_result(paper_id, triage, paper_text, project_context)
+            for (paper_id, paper_text), triage in zip(papers, triage_results)
+        ]
+    
+    def _analyze_links(self, arxiv_links: list[str], project_context: str,
+                       on_result: Callable[[int, dict], None]) -> None:
+        """Download, extract and analyze papers using the configured mode.
+        
+        Args:
+            arxiv_links: List of arXiv paper URLs to analyze
+            project_context: Content from the project's document
+            on_result: Called with the position in arxiv_links and the result
+                of each paper as soon as it is analyzed
+        """
+        if self.config.batch_enabled:
+            papers = self._extract_papers(arxiv_links)
+            for index, result in enumerate(self.analyzer.analyze_papers_batch(papers, project_context)):
+                on_result(index, result)
+            return
+        if self.config.pipeline_enabled:
+            # Resolve metadata for every paper still to download in batched queries
+            self.downloader.resolve_metadata([
+                paper_id for paper_id in map(self.downloader._extract_arxiv_id, arxiv_links)
+                if not (self.downloader.download_dir / f"{paper_id}.pdf").exists()
+            ])
+            self._create_pipeline(self.analyzer).run(arxiv_links, project_context, on_result)
+            return
+        self._analyze_sequentially(arxiv_links, project_context, on_result)
+    
+    def _create_pipeline(self, analyzer: ClaudeAnalyzer = None) -> PaperPipeline:
+        """Create a concurrent pipeline using the configured worker counts.
+        
+        Args:
+            analyzer: Analyzer for the last stage. If None, the pipeline only downloads and extracts.
+        
+        Returns:
+            The pipeline
+        """
+        return PaperPipeline(
+            downloader=self.downloader,
+            pdf_processor=self.pdf_processor,
+            analyzer=analyzer,
+            download_workers=self.config.download_workers,
+            extract_workers=self.config.extract_workers,
+            # With async analysis, each worker waits on one request of the shared event loop
+            analyze_workers=self.config.max_in_flight if self.config.pipeline_async_analysis else self.config.analyze_workers,
+            async_analysis=self.config.pipeline_async_analysis
+        )
+    
+    def _extract_papers(self, arxiv_links: list[str]) -> list[tuple[str, str, Path]]:
+        """Download papers and extract their text without analyzing them.
+        
+        Args:
+            arxiv_links: List of arXiv paper URLs
+        
+        Returns:
+            (paper_id, paper_text, pdf_path) tuples in the same order as arxiv_links
+        """
+        if self.config.pipeline_enabled:
+            return self._create_pipeline().run(arxiv_links, project_context=None)
+        
+        paper_ids = [self.downloader._extract_arxiv_id(link) for link in arxiv_links]
+        pdf_paths = self.downloader.download_many(arxiv_links)
+        paper_texts = self.pdf_processor.extract_texts(pdf_paths)
+        return list(zip(paper_ids, paper_texts, pdf_paths))
+    
+    def _analyze_sequentially(self, arxiv_links: list[str], project_context: str,
+                              on_result: Callable[[int, dict], None]) -> None:
+        """Download, extract and analyze papers one after another.
+        
+        Args:
+            arxiv_links: List of arXiv paper URLs to analyze
+            project_context: Content from the project's document
+            on_result: Called with the position in arxiv_links and the result of each paper
+        """
+        for index, link in enumerate(arxiv_links):
             # Extract paper ID from URL
             paper_id = self.downloader._extract_arxiv_id(link)
             
@@ -43,10 +238,7 @@ class LiteratureReview:
             summary = self.analyzer.analyze_paper(
                 paper_text=paper_text,
                 project_context=project_context,
-                paper_id=paper_id
+                paper_id=paper_id,
+                pdf_path=pdf_path
             )
-            summaries.append(summary)
-        
-        # Generate final summaries
-        self.summary_generator.generate_individual_summaries(summaries)
-        self.summary_generator.generate_meta_summary(summaries) 
\ No newline at end of file
+            on_result(index, summary) 
\ No newline at end of file
@@ -0,0 +1,113 @@
+import json
+
+# Tool the model is made to call in structured mode, so the analysis comes back as typed fields
+ANALYSIS_TOOL = {
+    "name": "record_analysis",
+    "description": "Record the analysis of the paper, following the instructions of the analysis prompt. Cite the sections of the paper each claim comes from.",
+    "input_schema": {
+        "type": "object",
+        "properties": {
+            "summary": {
+                "type": "string",
+                "description": "Summary of the paper and its results"
+            },
+            "relation_to_project": {
+                "type": "string",
+                "description": "How the paper relates to the project proposal"
+            },
+            "potential_extensions": {
+                "type": "string",
+                "description": "Potential extensions or topics that would be interesting to expand on"
+            },
+            "relevance_score": {
+                "type": "integer",
+                "minimum": 0,
+                "maximum": 100,
+                "description": "Relevance of the paper to the project proposal, 0 if it is not relevant"
+            },
+            "reasoning": {
+                "type": "string",
+                "description": "Reasoning behind the relevance score"
+            }
+        },
+        "required": ["summary", "relation_to_project", "potential_extensions", "relevance_score", "reasoning"]
+    }
+}
+
+# CSV column of each field, as written by gather_summaries.py
+FIELD_COLUMNS = {
+    "summary": "Summary",
+    "relation_to_project": "Relation to project",
+    "potential_extensions": "Potential Extensions",
+    "relevance_score": "Relevance",
+    "reasoning": "Reasoning"
+}
+
+def message_text(message) -> str:
+    """Get the output of a Messages API response.
+    
+    Args:
+        message: Message returned by the API
+    
+    Returns:
+        The text of the response, or the JSON input of its tool call
+    """
+    for block in message.content:
+        if block.type == "tool_use":
+            return json.dumps(block.input)
+    return message.content[0].text
+
+def parse_fields(text: str) -> dict:
+    """Read the fields of a structured analysis.
+    
+    Args:
+        text: JSON input of the record_analysis tool call
+    
+    Returns:
+        Dictionary with a value for each property of ANALYSIS_TOOL
+    
+    Raises:
+        ValueError: If the JSON is malformed or a field is missing
+    """
+    try:
+        fields = json.loads(text)
+        return {
+            "summary": str(fields["summary"]).strip(),
+            "relation_to_project": str(fields["relation_to_project"]).strip(),
+            "potential_extensions": str(fields["potential_extensions"]).strip(),
+            "relevance_score": max(0, min(100, int(fields["relevance_score"]))),
+            "reasoning": str(fields["reasoning"]).strip()
+        }
+    except (KeyError, TypeError, ValueError) as e:
+        raise ValueError(f"Malformed structured analysis: {e}") from e
+
+def render_markdown(fields: dict) -> str:
+    """Write the fields of a structured analysis as markdown for the summary files.
+    
+    The headings are the ones the free-text analyses use, so the summaries
+    read the same and the meta-summary prompts are unchanged.
+    
+    Args:
+        fields: Fields from parse_fields()
+    
+    Returns:
+        Markdown text of the analysis
+    """
+    return (
+        f"Summary: {fields['summary']}\n\n"
+        f"Relation to your project: {fields['relation_to_project']}\n\n"
+        f"Potential Extensions: {fields['potential_extensions']}\n\n"
+        f"Relevance score: {fields['relevance_score']}/100\n\n"
+        f"{fields['reasoning']}\n"
+    )
+
+def field_columns(fields: dict) -> dict:
+    """Map the fields of a structured analysis to CSV columns.
+    
+    Args:
+        fields: Fields from parse_fields()
+    
+    Returns:
+        {column: value} with a value for every column in FIELD_COLUMNS
+    """
+    return {column: str(fields[field]) for field, column in FIELD_COLUMNS.items()}
@@ -1,24 +1,87 @@
 import os
 import arxiv
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
 from pathlib import Path
 import re
+import requests
+from requests.adapters import HTTPAdapter
+import threading
+from urllib.parse import urlparse
+import uuid
+from .metadata_store import MetadataStore
+
+# The arXiv API accepts this many IDs per query page
+ID_LIST_CHUNK = 100
+
+def resolve_metadata(metadata_store: MetadataStore, client: arxiv.Client, paper_ids: list[str],
+                     client_lock: threading.Lock = None) -> dict[str, dict]:
+    """Get arXiv metadata for many papers with as few queries as possible.
+    
+    Papers with a fresh record in the metadata store are not queried.
+    The others are fetched in id_list queries of up to ID_LIST_CHUNK IDs
+    each and written back to the store. If arXiv can't be reached, stale
+    records are used where available.
+    
+    Args:
+        metadata_store: Local store of arXiv metadata
+        client: arXiv API client
+        paper_ids: arXiv paper IDs
+        client_lock: Lock held around queries, for a client shared between threads
+    
+    Returns:
+        Mapping from paper ID to its metadata record, for the IDs that were found
+    """
+    missing = metadata_store.missing(paper_ids)
+    for start in range(0, len(missing), ID_LIST_CHUNK):
+        chunk = missing[start:start + ID_LIST_CHUNK]
+        search = arxiv.Search(id_list=chunk, max_results=len(chunk))
+        try:
+            # arxiv.Client enforces the API's delay between requests, but is not thread-safe
+            with client_lock or nullcontext():
+                results = list(client.results(search))
+        except Exception as e:
+            if len(metadata_store.get_many(chunk, include_stale=True)) < len(chunk):
+                raise
+            print(f"\nWarning: Could not refresh arXiv metadata, using stored records: {str(e)}")
+            continue
+        metadata_store.put_results(results)
+    return metadata_store.get_many(paper_ids, include_stale=True)
 
 class ArxivDownloader:
-    def __init__(self, papers_dir: str = "papers"):
+    def __init__(self, papers_dir: str = "papers", workers: int = 4, per_host_limit: int = 2,
+                 metadata_store: MetadataStore = None):
         """Initialize the ArXiv downloader.
         
         Args:
             papers_dir: Directory to save downloaded papers
+            workers: Number of concurrent downloads in download_many()
+            per_host_limit: Maximum concurrent downloads from one host
+            metadata_store: Local store of arXiv metadata. If None, uses the default store in .cache/
         """
         self.download_dir = Path(papers_dir)
         self.download_dir.mkdir(exist_ok=True)
+        self.workers = workers
+        self.per_host_limit = per_host_limit
         
+        self.client = arxiv.Client(page_size=ID_LIST_CHUNK)
+        self._client_lock = threading.Lock()
+        self.metadata_store = metadata_store or MetadataStore()
+        
+        # One pooled session so PDF downloads reuse connections
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max(workers, per_host_limit))
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self._host_limits = {}
+        self._host_limits_lock = threading.Lock()
+    
     def _extract_arxiv_id(self, url: str) -> str:
         """Extract arXiv ID from URL.
         
         Args:
             url: arXiv paper URL
-            
+        
         Returns:
             arXiv paper ID
         """
@@ -33,13 +96,58 @@ class ArxivDownloader:
                 return match.group(1)
         
         raise ValueError(f"Could not extract arXiv ID from URL: {url}")
+    
+    def resolve_metadata(self, paper_ids: list[str]) -> dict[str, dict]:
+        """Get arXiv metadata for many papers, see resolve_metadata().
+        
+        Args:
+            paper_ids: arXiv paper IDs
         
+        Returns:
+            Mapping from paper ID to its metadata record, for the IDs that were found
+        """
+        return resolve_metadata(self.metadata_store, self.client, paper_ids, self._client_lock)
+    
+    def _host_limit(self, url: str) -> threading.BoundedSemaphore:
+        """Get the semaphore limiting concurrent downloads from a URL's host."""
+        host = urlparse(url).netloc
+        with self._host_limits_lock:
+            if host not in self._host_limits:
+                self._host_limits[host] = threading.BoundedSemaphore(self.per_host_limit)
+            return self._host_limits[host]
+    
+    def _fetch_pdf(self, pdf_url: str, pdf_path: Path) -> None:
+        """Download a PDF atomically.
+        
+        The file is written under a temporary name and renamed when complete,
+        so an interrupted download never leaves a partial file at pdf_path.
+        
+        Args:
+            pdf_url: URL of the PDF
+            pdf_path: Destination path
+        """
+        tmp_path = pdf_path.with_name(f".{pdf_path.name}.{uuid.uuid4().hex}.part")
+        try:
+            with self._host_limit(pdf_url):
+                with self.session.get(pdf_url, stream=True, timeout=60) as response:
+                    response.raise_for_status()
+                    with open(tmp_path, "wb") as f:
+                        for chunk in response.iter_content(chunk_size=1 << 16):
+                            f.write(chunk)
+            
+            with open(tmp_path, "rb") as f:
+                if f.read(5) != b"%PDF-":
+                    raise ValueError(f"Downloaded file from {pdf_url} is not a PDF")
+            os.replace(tmp_path, pdf_path)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+    
     def download(self, url: str) -> Path:
         """Download a paper from arXiv.
         
         Args:
             url: arXiv paper URL
-            
+        
         Returns:
             Path to downloaded PDF file
         """
@@ -49,10 +157,33 @@ class ArxivDownloader:
         # Skip if already downloaded
         if pdf_path.exists():
             return pdf_path
-            
+        
         # Download paper
-        search = arxiv.Search(id_list=[paper_id])
-        paper = next(search.results())
-        paper.download_pdf(filename=str(pdf_path))
+        metadata = self.resolve_metadata([paper_id])
+        if paper_id not in metadata:
+            raise ValueError(f"Paper {paper_id} not found on arXiv")
+        self._fetch_pdf(metadata[paper_id]["pdf_url"], pdf_path)
+        
+        return pdf_path
+    
+    def download_many(self, urls: list[str]) -> list[Path]:
+        """Download many papers concurrently.
+        
+        Metadata for all missing papers is resolved up front in batched
+        queries, then PDFs are fetched by `workers` threads over the pooled
+        session, at most `per_host_limit` at a time from each host.
+        
+        Args:
+            urls: arXiv paper URLs
+        
+        Returns:
+            Paths to the downloaded PDF files, in the same order as urls
+        """
+        paper_ids = [self._extract_arxiv_id(url) for url in urls]
+        self.resolve_metadata([
+            paper_id for paper_id in paper_ids
+            if not (self.download_dir / f"{paper_id}.pdf").exists()
+        ])
         
-        return pdf_path 
\ No newline at end of file
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            return list(executor.map(self.download, urls))
@@ -0,0 +1,70 @@
+from abc import ABC, abstractmethod
+from typing import Iterator, Optional
+from anthropic import Anthropic
+from anthropic.types import Usage
+from .analysis_schema import message_text
+
+class BatchClient(ABC):
+    """Interface to a Message Batches backend.
+    
+    Implemented by AnthropicBatchClient for the real API. A local stub only
+    needs these three methods to stand in for it in tests.
+    """
+    
+    @abstractmethod
+    def submit(self, requests: list[dict]) -> str:
+        """Submit a batch of message requests.
+        
+        Args:
+            requests: Items of the form {"custom_id": str, "params": dict},
+                where params are the keyword arguments of messages.create
+        
+        Returns:
+            The batch ID
+        """
+    
+    @abstractmethod
+    def status(self, batch_id: str) -> str:
+        """Get the processing status of a batch.
+        
+        Args:
+            batch_id: ID returned by submit()
+        
+        Returns:
+            "in_progress", "canceling" or "ended"
+        """
+    
+    @abstractmethod
+    def results(self, batch_id: str) -> Iterator[tuple[str, Optional[str], Optional[Usage]]]:
+        """Iterate over the results of an ended batch.
+        
+        Args:
+            batch_id: ID returned by submit()
+        
+        Yields:
+            (custom_id, response text or tool call JSON, usage) triples. The text
+            and usage are None for requests that errored, expired or were canceled.
+        """
+
+class AnthropicBatchClient(BatchClient):
+    def __init__(self, client: Anthropic):
+        """Initialize the batch client.
+        
+        Args:
+            client: Anthropic API client
+        """
+        self.client = client
+    
+    def submit(self, requests: list[dict]) -> str:
+        batch = self.client.messages.batches.create(requests=requests)
+        return batch.id
+    
+    def status(self, batch_id: str) -> str:
+        return self.client.messages.batches.retrieve(batch_id).processing_status
+    
+    def results(self, batch_id: str) -> Iterator[tuple[str, Optional[str], Optional[Usage]]]:
+        for entry in self.client.messages.batches.results(batch_id):
+            if entry.result.type == "succeeded":
+                yield entry.custom_id, message_text(entry.result.message), entry.result.message.usage
+            else:
+                yield entry.custom_id, None, None
@@ -0,0 +1,124 @@
+from collections import OrderedDict
+import gzip
+import hashlib
+import os
+from pathlib import Path
+import threading
+import uuid
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+class BlobStore:
+    REF_KEY = "$blob"
+    
+    def __init__(self, blob_dir: str = ".cache/blobs"):
+        """Initialize the content-addressed text store.
+        
+        Each text is stored once, compressed, under the SHA-256 of its content.
+        zstd is used when the zstandard package is installed, gzip otherwise.
+        
+        Args:
+            blob_dir: Directory to store compressed texts
+        """
+        self.blob_dir = Path(blob_dir)
+        self.blob_dir.mkdir(parents=True, exist_ok=True)
+        # The same project context is stored for every paper, so remember recent hashes
+        self._recent = OrderedDict()
+        self._recent_size = 8
+        self._lock = threading.Lock()
+    
+    @classmethod
+    def is_ref(cls, value) -> bool:
+        """Check whether a value is a blob reference."""
+        return isinstance(value, dict) and len(value) == 1 and cls.REF_KEY in value
+    
+    def _path(self, digest: str, suffix: str) -> Path:
+        """Get the file path of a blob."""
+        return self.blob_dir / digest[:2] / f"{digest}{suffix}"
+    
+    def _digest(self, text: str) -> str:
+        """Hash a text, reusing the hash of recently stored identical texts."""
+        with self._lock:
+            if (digest := self._recent.get(text)) is not None:
+                self._recent.move_to_end(text)
+                return digest
+        digest = hashlib.sha256(text.encode("utf-8", "surrogatepass")).hexdigest()
+        with self._lock:
+            self._recent[text] = digest
+            if len(self._recent) > self._recent_size:
+                self._recent.popitem(last=False)
+        return digest
+    
+    def put(self, text: str) -> dict:
+        """Store a text unless an identical one is already stored.
+        
+        Args:
+            text: Text to store
+        
+        Returns:
+            Reference to the stored text, {"$blob": <sha256>}
+        """
+        digest = self._digest(text)
+        ref = {self.REF_KEY: digest}
+        if self._path(digest, ".zst").exists() or self._path(digest, ".gz").exists():
+            return ref
+        
+        data = text.encode("utf-8", "surrogatepass")
+        if zstandard is not None:
+            path, data = self._path(digest, ".zst"), zstandard.ZstdCompressor().compress(data)
+        else:
+            path, data = self._path(digest, ".gz"), gzip.compress(data, compresslevel=6)
+        
+        # Write to a unique temporary file first so readers never see partial blobs
+        path.parent.mkdir(exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{uuid.uuid4().hex}.tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        return ref
+    
+    def get(self, ref: dict) -> str:
+        """Load a stored text.
+        
+        Args:
+            ref: Reference returned by put()
+        
+        Returns:
+            The stored text
+        """
+        digest = ref[self.REF_KEY]
+        if (path := self._path(digest, ".zst")).exists():
+            if zstandard is None:
+                raise RuntimeError(f"Blob {digest} is zstd-compressed but zstandard is not installed")
+            data = zstandard.ZstdDecompressor().decompress(path.read_bytes())
+        elif (path := self._path(digest, ".gz")).exists():
+            data = gzip.decompress(path.read_bytes())
+        else:
+            raise FileNotFoundError(f"Blob {digest} not found in {self.blob_dir}")
+        return data.decode("utf-8", "surrogatepass")
+
+class LazyResult(dict):
+    """Analysis result whose blob references are loaded on first access.
+    
+    The underlying dict keeps the references, so serializing the result with
+    json.dump writes references rather than the full texts.
+    """
+    
+    def __init__(self, data: dict, blob_store: BlobStore):
+        super().__init__(data)
+        self._blob_store = blob_store
+        self._resolved = {}
+    
+    def __getitem__(self, key):
+        value = super().__getitem__(key)
+        if not BlobStore.is_ref(value):
+            return value
+        if key not in self._resolved:
+            self._resolved[key] = self._blob_store.get(value)
+        return self._resolved[key]
+    
+    def get(self, key, default=None):
+        return self[key] if key in self else default
@@ -1,24 +1,74 @@
+import atexit
 import json
 from pathlib import Path
 import hashlib
 import re
+import sqlite3
+import threading
+import time
+from .blob_store import BlobStore, LazyResult
 
 class PromptCache:
-    def __init__(self, cache_dir: str = ".cache"):
+    # Large texts repeated across entries, stored once in the blob store
+    BLOB_FIELDS = ("paper_text", "project_context")
+    
+    def __init__(self, cache_dir: str = ".cache", batch_size: int = 20, max_write_delay: float = 5.0):
         """Initialize the prompt cache.
         
+        Results are stored in a single indexed SQLite file inside cache_dir.
+        Writes are buffered and committed in batches. Paper text and project
+        context are kept in a content-addressed blob store under cache_dir/blobs
+        and entries only hold references to them.
+        
         Args:
             cache_dir: Directory to store cached results
+            batch_size: Number of buffered results that triggers a commit
+            max_write_delay: Seconds a buffered result may wait before a commit
         """
         self.cache_dir = Path(cache_dir)
         self.cache_dir.mkdir(exist_ok=True)
+        self.db_path = self.cache_dir / "prompt_cache.sqlite"
+        self.batch_size = batch_size
+        self.max_write_delay = max_write_delay
+        self.blobs = BlobStore(self.cache_dir / "blobs")
+        
+        is_new = not self.db_path.exists()
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS entries (
+                paper_id TEXT NOT NULL,
+                prompt_hash TEXT NOT NULL,
+                result TEXT NOT NULL,
+                PRIMARY KEY (paper_id, prompt_hash)
+            ) WITHOUT ROWID
+        """)
+        # Columns added after the first database version
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(entries)")}
+        if "fingerprint" not in columns:
+            self._conn.execute("ALTER TABLE entries ADD COLUMN fingerprint TEXT")
+        if "created_at" not in columns:
+            self._conn.execute("ALTER TABLE entries ADD COLUMN created_at REAL")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS entries_by_fingerprint ON entries (paper_id, fingerprint)")
+        self._conn.commit()
+        
+        # Results saved but not yet committed, keyed by (paper_id, prompt_hash),
+        # with values (serialized result, fingerprint, created_at)
+        self._pending = {}
+        self._pending_since = None
+        atexit.register(self.flush)
         
+        if is_new and any(len(f.stem.rsplit("_", 1)[-1]) == 64 for f in self.cache_dir.glob("*_*.json")):
+            print(f"\nNote: Found JSON cache files in {self.cache_dir}. "
+                  "Run 'python migrate_cache.py' to import them into the cache database.")
+    
     def _compute_hash(self, content: str) -> str:
         """Compute a hash of the content for cache key.
         
         Args:
             content: Content to hash
-            
+        
         Returns:
             Hash string
         """
@@ -31,7 +81,7 @@ class PromptCache:
         
         Args:
             content: Content to hash
-            
+        
         Returns:
             Hash string
         """
@@ -43,6 +93,26 @@ class PromptCache:
     def get(self, paper_id: str, prompt: str) -> dict | None:
         """Get cached analysis result if it exists.
         
+        Args:
+            paper_id: arXiv paper ID
+            prompt: Analysis prompt used
+        
+        Returns:
+            Cached analysis result or None if not found. Paper text and project
+            context are loaded from the blob store only when accessed.
+        """
+        # Try new hash first, then the legacy hash
+        hashes = [self._compute_hash(prompt)]
+        legacy_hash = self._legacy_hash(prompt)
+        if legacy_hash and legacy_hash != hashes[0]:
+            hashes.append(legacy_hash)
+        return self._lookup(paper_id, hashes)
+    
+    def pop(self, paper_id: str, prompt: str) -> dict | None:
+        """Remove and return a result cached under the hash of its full prompt.
+        
+        Used to move entries written by earlier versions to their new key.
+        
         Args:
             paper_id: arXiv paper ID
             prompt: Analysis prompt used
@@ -50,40 +120,271 @@ class PromptCache:
         Returns:
             Cached analysis result or None if not found
         """
-        # Try new hash first
-        prompt_hash = self._compute_hash(prompt)
-        cache_file = self.cache_dir / f"{paper_id}_{prompt_hash}.json"
-        
-        # If not found, try legacy hash
-        if not cache_file.exists():
-            legacy_hash = self._legacy_hash(prompt)
-            if legacy_hash:
-                legacy_file = self.cache_dir / f"{paper_id}_{legacy_hash}.json"
-                if legacy_file.exists():
-                    cache_file = legacy_file
-        
-        if cache_file.exists():
-            try:
-                with open(cache_file) as f:
-                    return json.load(f)
-            except (json.JSONDecodeError, UnicodeDecodeError):
-                print(f"\nWarning: Corrupted cache file for paper {paper_id}, will reanalyze")
-                return None
+        hashes = [self._compute_hash(prompt)]
+        legacy_hash = self._legacy_hash(prompt)
+        if legacy_hash and legacy_hash != hashes[0]:
+            hashes.append(legacy_hash)
+        if (result := self._lookup(paper_id, hashes)) is None:
+            return None
+        
+        with self._lock, self._conn:
+            for prompt_hash in hashes:
+                self._pending.pop((paper_id, prompt_hash), None)
+            self._conn.execute(
+                f"DELETE FROM entries WHERE paper_id = ? AND prompt_hash IN ({', '.join('?' * len(hashes))})",
+                (paper_id, *hashes)
+            )
+        return result
+    
+    def get_by_key(self, paper_id: str, key: str) -> dict | None:
+        """Get a cached analysis result stored under a precomputed key.
+        
+        Unlike get(), the cost does not depend on the size of the prompt.
+        
+        Args:
+            paper_id: arXiv paper ID
+            key: Cache key built from the analysis inputs
+            
+        Returns:
+            Cached analysis result or None if not found
+        """
+        return self._lookup(paper_id, [key])
+    
+    def get_by_fingerprint(self, paper_id: str, fingerprint: str) -> dict | None:
+        """Get the latest cached result saved with a given fingerprint.
+        
+        A fingerprint identifies an analysis by cheap inputs only (for example
+        without the paper's content hash), so it can be checked before the
+        paper is downloaded.
+        
+        Args:
+            paper_id: arXiv paper ID
+            fingerprint: Fingerprint passed to save_by_key()
+            
+        Returns:
+            Cached analysis result or None if not found
+        """
+        with self._lock:
+            pending = [
+                (created_at, serialized)
+                for (pending_id, _), (serialized, pending_fingerprint, created_at) in self._pending.items()
+                if pending_id == paper_id and pending_fingerprint == fingerprint
+            ]
+            if pending:
+                return LazyResult(json.loads(max(pending)[1]), self.blobs)
+            row = self._conn.execute(
+                "SELECT result FROM entries WHERE paper_id = ? AND fingerprint = ? ORDER BY created_at DESC LIMIT 1",
+                (paper_id, fingerprint)
+            ).fetchone()
+        
+        if row is None:
+            return None
+        try:
+            return LazyResult(json.loads(row[0]), self.blobs)
+        except json.JSONDecodeError:
+            print(f"\nWarning: Corrupted cache entry for paper {paper_id}, will reanalyze")
+            return None
+    
+    def _lookup(self, paper_id: str, hashes: list[str]) -> dict | None:
+        """Get the first cached result found under one of the given hashes.
+        
+        Args:
+            paper_id: arXiv paper ID
+            hashes: Candidate hashes, in order of preference
+            
+        Returns:
+            Cached analysis result or None if not found
+        """
+        with self._lock:
+            for prompt_hash in hashes:
+                if (paper_id, prompt_hash) in self._pending:
+                    return LazyResult(json.loads(self._pending[(paper_id, prompt_hash)][0]), self.blobs)
+            rows = dict(self._conn.execute(
+                f"SELECT prompt_hash, result FROM entries WHERE paper_id = ? AND prompt_hash IN ({', '.join('?' * len(hashes))})",
+                (paper_id, *hashes)
+            ).fetchall())
+        
+        for prompt_hash in hashes:
+            if prompt_hash in rows:
+                try:
+                    return LazyResult(json.loads(rows[prompt_hash]), self.blobs)
+                except json.JSONDecodeError:
+                    print(f"\nWarning: Corrupted cache entry for paper {paper_id}, will reanalyze")
+                    return None
         return None
     
-    def save(self, paper_id: str, prompt: str, result: dict) -> None:
+    def _externalize(self, result: dict) -> dict:
+        """Replace the large text fields of a result with blob references.
+        
+        Args:
+            result: Analysis result
+            
+        Returns:
+            Copy of the result holding references instead of the texts
+        """
+        stored = dict(result)
+        for field in self.BLOB_FIELDS:
+            if isinstance(stored.get(field), str):
+                stored[field] = self.blobs.put(stored[field])
+        return stored
+    
+    def save(self, paper_id: str, prompt: str, result: dict) -> dict:
         """Save analysis result to cache.
         
+        The result is committed together with other buffered results once
+        batch_size results are pending or max_write_delay has passed.
+        
         Args:
             paper_id: arXiv paper ID
             prompt: Analysis prompt used
             result: Analysis result to cache
+            
+        Returns:
+            The result as stored, with texts resolved lazily from the blob store
         """
-        prompt_hash = self._compute_hash(prompt)
-        cache_file = self.cache_dir / f"{paper_id}_{prompt_hash}.json"
+        return self.save_by_key(paper_id, self._compute_hash(prompt), result)
+    
+    def save_by_key(self, paper_id: str, key: str, result: dict, fingerprint: str = None) -> dict:
+        """Save analysis result to cache under a precomputed key.
         
+        Args:
+            paper_id: arXiv paper ID
+            key: Cache key built from the analysis inputs
+            result: Analysis result to cache
+            fingerprint: Optional cheap identifier for get_by_fingerprint()
+            
+        Returns:
+            The result as stored, with texts resolved lazily from the blob store
+        """
         try:
-            with open(cache_file, "w", encoding='utf-8') as f:
-                json.dump(result, f, indent=2, ensure_ascii=False)
-        except Exception as e:
-            print(f"\nWarning: Failed to cache results for paper {paper_id}: {str(e)}") 
\ No newline at end of file
+            stored = self._externalize(result)
+            serialized = json.dumps(stored, ensure_ascii=False)
+        except (TypeError, ValueError, OSError) as e:
+            print(f"\nWarning: Failed to cache results for paper {paper_id}: {str(e)}")
+            return result
+        
+        with self._lock:
+            self._pending[(paper_id, key)] = (serialized, fingerprint, time.time())
+            if self._pending_since is None:
+                self._pending_since = time.monotonic()
+            due = (
+                len(self._pending) >= self.batch_size
+                or time.monotonic() - self._pending_since >= self.max_write_delay
+            )
+        if due:
+            self.flush()
+        return LazyResult(stored, self.blobs)
+    
+    def flush(self) -> None:
+        """Commit all buffered results to the database."""
+        with self._lock:
+            if not self._pending:
+                return
+            try:
+                with self._conn:
+                    self._conn.executemany(
+                        "INSERT OR REPLACE INTO entries (paper_id, prompt_hash, result, fingerprint, created_at) VALUES (?, ?, ?, ?, ?)",
+                        [(paper_id, prompt_hash, *entry) for (paper_id, prompt_hash), entry in self._pending.items()]
+                    )
+            except sqlite3.Error as e:
+                print(f"\nWarning: Failed to write {len(self._pending)} cached results: {str(e)}")
+                return
+            self._pending.clear()
+            self._pending_since = None
+    
+    def migrate_from_dir(self, json_dir: str | Path) -> tuple[int, int]:
+        """Import the per-file JSON cache written by earlier versions.
+        
+        Files are named {paper_id}_{prompt_hash}.json. Entries keep their
+        original hash, so files written with the legacy hash remain reachable
+        through the legacy lookup in get(). Their texts move to the blob store.
+        
+        Args:
+            json_dir: Directory containing the JSON cache files
+        
+        Returns:
+            (number of imported entries, number of skipped files)
+        """
+        pattern = re.compile(r"^(.+)_([0-9a-f]{64})\.json$")
+        imported = skipped = 0
+        rows = []
+        
+        for cache_file in Path(json_dir).glob("*.json"):
+            if not (match := pattern.match(cache_file.name)):
+                continue
+            try:
+                with open(cache_file, encoding='utf-8') as f:
+                    result = json.load(f)
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                print(f"Warning: Skipping corrupted cache file {cache_file.name}")
+                skipped += 1
+                continue
+            rows.append((match.group(1), match.group(2), json.dumps(self._externalize(result), ensure_ascii=False)))
+            
+            if len(rows) >= 500:
+                imported += self._insert_rows(rows)
+                rows = []
+        
+        imported += self._insert_rows(rows)
+        return imported, skipped
+    
+    def _insert_rows(self, rows: list[tuple[str, str, str]]) -> int:
+        """Insert rows without overwriting existing entries.
+        
+        Args:
+            rows: (paper_id, prompt_hash, serialized result) tuples
+        
+        Returns:
+            Number of rows given
+        """
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO entries (paper_id, prompt_hash, result) VALUES (?, ?, ?)",
+                rows
+            )
+        return len(rows)
+    
+    def compact(self) -> int:
+        """Move texts stored inline in existing entries to the blob store.
+        
+        Returns:
+            Number of rewritten entries
+        """
+        self.flush()
+        reader = sqlite3.connect(self.db_path)
+        count = 0
+        rewritten = []
+        
+        for paper_id, prompt_hash, serialized in reader.execute("SELECT paper_id, prompt_hash, result FROM entries"):
+            try:
+                result = json.loads(serialized)
+            except json.JSONDecodeError:
+                continue
+            if any(isinstance(result.get(field), str) for field in self.BLOB_FIELDS):
+                rewritten.append((json.dumps(self._externalize(result), ensure_ascii=False), paper_id, prompt_hash))
+            
+            if len(rewritten) >= 500:
+                count += self._update_rows(rewritten)
+                rewritten = []
+        count += self._update_rows(rewritten)
+        reader.close()
+        
+        with self._lock:
+            self._conn.execute("VACUUM")
+        return count
+    
+    def _update_rows(self, rows: list[tuple[str, str, str]]) -> int:
+        """Replace the stored results of existing entries.
+        
+        Args:
+            rows: (serialized result, paper_id, prompt_hash) tuples
+            
+        Returns:
+            Number of rows given
+        """
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "UPDATE entries SET result = ? WHERE paper_id = ? AND prompt_hash = ?",
+                rows
+            )
+        return len(rows)
@@ -1,11 +1,21 @@
+import asyncio
+import json
 import os
+import re
 from pathlib import Path
+import threading
 import time
 from typing import Optional
-from anthropic import Anthropic, RateLimitError
+from anthropic import Anthropic, APIConnectionError, APIStatusError, AsyncAnthropic, RateLimitError
 from dotenv import load_dotenv
+from .analysis_schema import ANALYSIS_TOOL, message_text, parse_fields, render_markdown
 from .config import Config
 from .cache import PromptCache
+from .fingerprint import Fingerprinter
+from .batch import AnthropicBatchClient, BatchClient
+from .rate_limiter import RateLimiter
+from .streaming import StreamRecorder
+from .text_budget import TextBudget
 
 class ClaudeAnalyzer:
     def __init__(self, config: Config = None):
@@ -15,87 +25,419 @@ class ClaudeAnalyzer:
             config: Configuration object. If None, uses default config.
         """
         load_dotenv()
-        self.client = Anthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
         self.config = config or Config()
+        self.client = Anthropic(
+            api_key=os.getenv("ANTHROPIC_API_KEY"),
+            base_url=self.config.claude_base_url
+        )
+        self._async_client = None
+        self._async_client_loop = None
         self.cache = PromptCache()
+        self.fingerprints = Fingerprinter()
         
         # Load analysis prompt template
         prompt_path = Path(__file__).parent.parent / "analysis_prompt.txt"
         with open(prompt_path) as f:
             self.prompt_template = f.read()
+        self.template_hash = self.fingerprints.text(self.prompt_template)
+        
+        # Trims long papers before they are sent
+        self.text_budget = TextBudget(self.config.text_budget_max_tokens) if self.config.text_budget_enabled else None
         
         # Rate limiting settings
         self.last_request_time = 0
+        self._request_lock = threading.Lock()  # pipeline workers share this analyzer
         self.min_request_interval = 2  # seconds between requests
         self.max_retries = 5
         self.base_retry_delay = 60  # seconds
+        self.base_error_delay = 5  # seconds, after server errors and dropped connections
+        
+        # Token usage of this run, including prompt cache reads and writes
+        self.usage = {
+            "requests": 0,
+            "input_tokens": 0,
+            "output_tokens": 0,
+            "cache_creation_input_tokens": 0,
+            "cache_read_input_tokens": 0,
+            "seconds": 0.0,
+            "streamed_requests": 0,
+            "time_to_first_token": 0.0,
+            "generation_seconds": 0.0,
+            "streamed_output_tokens": 0
+        }
+        self._usage_lock = threading.Lock()
         
+        # Shared by all in-flight async requests
+        self.rate_limiter = RateLimiter(
+            requests_per_minute=self.config.requests_per_minute,
+            input_tokens_per_minute=self.config.input_tokens_per_minute,
+            output_tokens_per_minute=self.config.output_tokens_per_minute
+        )
+    
+    @property
+    def async_client(self) -> AsyncAnthropic:
+        """Get the async API client of the running event loop, creating it on first use.
+        
+        Its connections belong to one loop, so triage and analysis runs on
+        different loops each get their own client.
+        """
+        loop = asyncio.get_running_loop()
+        if self._async_client is None or self._async_client_loop is not loop:
+            # Retries are handled here so that retry-after pauses every request
+            self._async_client = AsyncAnthropic(
+                api_key=os.getenv("ANTHROPIC_API_KEY"),
+                base_url=self.config.claude_base_url,
+                max_retries=0
+            )
+            self._async_client_loop = loop
+        return self._async_client
+    
     def _clean_text(self, text: str) -> str:
         """Clean text of problematic Unicode characters.
         
         Args:
             text: Text to clean
-            
+        
         Returns:
             Cleaned text
         """
         return text.encode('ascii', 'ignore').decode()
+    
+    def _build_content(self, paper_text: str, project_context: str) -> list[dict]:
+        """Build the message content blocks for a paper.
+        
+        The project context and the analysis template come first and end with a
+        cache breakpoint, so they form a prefix that is identical for every paper
+        and is read from the prompt cache after the first request. Only the paper
+        text block varies. Prefixes shorter than the model's minimum cacheable
+        length are simply not cached.
+        
+        Args:
+            paper_text: Extracted text content from the paper
+            project_context: Content from the project's document
+        
+        Returns:
+            Content blocks for the user message
+        """
+        return [
+            {
+                "type": "text",
+                "text": f"Project Context:\n{project_context}"
+            },
+            {
+                "type": "text",
+                "text": self.prompt_template,
+                "cache_control": {"type": "ephemeral"}
+            },
+            {
+                "type": "text",
+                "text": f"Paper Content:\n{paper_text}"
+            }
+        ]
+    
+    def _request_params(self, content: str | list[dict], model: str = None, max_tokens: int = None,
+                        tool: dict = None) -> dict:
+        """Build the Messages API parameters for a prompt.
+        
+        Args:
+            content: The prompt string or content blocks to send to Claude
+            model: Model to use instead of the configured one
+            max_tokens: Output limit to use instead of the configured one
+            tool: Tool the model must answer with, instead of free text
+        
+        Returns:
+            Keyword arguments for messages.create
+        """
+        # Clean the prompt before sending to API
+        if isinstance(content, str):
+            content = self._clean_text(content)
+        else:
+            content = [{**block, "text": self._clean_text(block["text"])} for block in content]
+        params = {
+            "model": model or self.config.claude_model,
+            "max_tokens": max_tokens or self.config.claude_max_tokens,
+            "temperature": self.config.claude_temperature,
+            "messages": [{
+                "role": "user",
+                "content": content
+            }]
+        }
+        if tool is not None:
+            params["tools"] = [tool]
+            params["tool_choice"] = {"type": "tool", "name": tool["name"]}
+        return params
+    
+    def _stream_delta(self, event) -> Optional[str]:
+        """Get the output carried by a stream event: response text or tool call JSON."""
+        if event.type == "text":
+            return event.text
+        if event.type == "input_json":
+            return event.partial_json
+        return None
+    
+    def _record_usage(self, usage, seconds: float, totals: dict = None, recorder: StreamRecorder = None) -> None:
+        """Add the token usage and duration of one response to the run totals.
         
-    def _call_claude_api(self, prompt: str, retry_count: int = 0) -> Optional[str]:
+        Args:
+            usage: Usage object of an API response
+            seconds: Time the request took
+            totals: Totals to add to. If None, the analysis totals in self.usage.
+            recorder: Recorder of a streamed response, for its time to first token and output speed
+        """
+        totals = self.usage if totals is None else totals
+        with self._usage_lock:
+            totals["requests"] += 1
+            totals["seconds"] += seconds
+            for key in ("input_tokens", "output_tokens", "cache_creation_input_tokens", "cache_read_input_tokens"):
+                totals[key] += getattr(usage, key, None) or 0
+            if recorder is not None:
+                recorder.add_to(totals, usage.output_tokens)
+    
+    def usage_report(self) -> str:
+        """Summarize the token usage of this run.
+        
+        Returns:
+            Human-readable report of uncached, cache-write and cache-read input tokens
+        """
+        usage = self.usage
+        cache_read = usage["cache_read_input_tokens"]
+        cache_write = usage["cache_creation_input_tokens"]
+        total_input = usage["input_tokens"] + cache_read + cache_write
+        if total_input == 0:
+            return "No API requests were made."
+        # Cache writes are billed at 1.25x and reads at 0.1x the base input price
+        billed_input = usage["input_tokens"] + 1.25 * cache_write + 0.1 * cache_read
+        return (
+            f"API requests: {usage['requests']}\n"
+            f"Input tokens: {total_input} ({usage['input_tokens']} uncached, "
+            f"{cache_write} cache write, {cache_read} cache read)\n"
+            f"Output tokens: {usage['output_tokens']}\n"
+            f"Prompt cache hit rate: {cache_read / total_input:.1%} of input tokens, "
+            f"input cost {1 - billed_input / total_input:.1%} below an uncached run"
+        ) + (f"\n{StreamRecorder.report(usage)}" if usage["streamed_requests"] else "") + (
+            f"\n{self.text_budget.report()}" if self.text_budget else ""
+        )
+    
+    def _summary_path(self, paper_id: str) -> Path:
+        """Get the file a paper's analysis is streamed to."""
+        return Path(self.config.summaries_dir) / f"{paper_id}.md"
+    
+    def _analysis_options(self, paper_id: str) -> dict:
+        """Get the API call options of a paper's analysis.
+        
+        Structured analyses stream tool call JSON, which is kept in memory
+        rather than streamed to the summary file.
+        """
+        if self.config.claude_structured:
+            return {"tool": ANALYSIS_TOOL}
+        return {"stream_to": self._summary_path(paper_id)}
+    
+    def _build_result(self, paper_id: str, response_text: str, paper_text: str, project_context: str,
+                      text_budget: dict | None) -> dict:
+        """Build the cached result of an analysis from the response.
+        
+        Args:
+            paper_id: arXiv paper ID
+            response_text: Analysis text, or the tool call JSON of a structured analysis
+            paper_text: Paper text that was sent
+            project_context: Content from the project's document
+            text_budget: Budget stats from _fit_text()
+        
+        Returns:
+            Dictionary with the analysis markdown, and its fields if structured
+        """
+        result = {
+            "analysis": response_text,
+            "paper_text": paper_text,
+            "project_context": project_context
+        }
+        if self.config.claude_structured:
+            try:
+                result["fields"] = parse_fields(response_text)
+            except ValueError as e:
+                raise RuntimeError(f"Failed to read the structured analysis of paper {paper_id}: {e}") from e
+            result["analysis"] = render_markdown(result["fields"])
+        if text_budget:
+            result["text_budget"] = text_budget
+        return result
+    
+    def _fit_text(self, paper_id: str, paper_text: str) -> tuple[str, dict | None]:
+        """Trim paper text to the configured token budget.
+        
+        Args:
+            paper_id: arXiv paper ID
+            paper_text: Extracted text content from the paper
+        
+        Returns:
+            Tuple of (text to send, budget stats or None if no budget is configured)
+        """
+        if self.text_budget is None:
+            return paper_text, None
+        budgeted_text, stats = self.text_budget.fit(paper_text)
+        if stats["sent_tokens"] < stats["original_tokens"]:
+            omitted = f" (omitted: {', '.join(stats['omitted'])})" if stats["omitted"] else ""
+            print(f"Trimmed paper {paper_id} from ~{stats['original_tokens']} to ~{stats['sent_tokens']} tokens{omitted}")
+        return budgeted_text, stats
+    
+    def _call_claude_api(self, prompt: str | list[dict], retry_count: int = 0,
+                         stream_to: Path = None, tool: dict = None) -> Optional[str]:
         """Call Claude API with rate limiting and retries.
         
         Args:
-            prompt: The prompt to send to Claude
+            prompt: The prompt string or content blocks to send to Claude
             retry_count: Current retry attempt number
-            
+            stream_to: File the response is written to as it streams in, if
+                streaming is enabled
+            tool: Tool the model must answer with, instead of free text
+        
         Returns:
-            Analysis text if successful, None if all retries failed
+            Analysis text, or the tool call JSON, if successful. None if all retries failed.
         """
         # Ensure minimum time between requests
-        time_since_last = time.time() - self.last_request_time
-        if time_since_last < self.min_request_interval:
-            time.sleep(self.min_request_interval - time_since_last)
-            
+        with self._request_lock:
+            time_since_last = time.time() - self.last_request_time
+            if time_since_last < self.min_request_interval:
+                time.sleep(self.min_request_interval - time_since_last)
+            self.last_request_time = time.time()
+        
         try:
-            # Clean the prompt before sending to API
-            cleaned_prompt = self._clean_text(prompt)
-            
-            response = self.client.messages.create(
-                model=self.config.claude_model,
-                max_tokens=self.config.claude_max_tokens,
-                temperature=self.config.claude_temperature,
-                messages=[{
-                    "role": "user",
-                    "content": cleaned_prompt
-                }]
-            )
+            start = time.perf_counter()
+            if self.config.claude_stream:
+                with StreamRecorder(stream_to) as recorder, self.client.messages.stream(**self._request_params(prompt, tool=tool)) as stream:
+                    for event in stream:
+                        if delta := self._stream_delta(event):
+                            recorder.write(delta)
+                    response = stream.get_final_message()
+                    analysis_text = recorder.finish(response)
+                self._record_usage(response.usage, time.perf_counter() - start, recorder=recorder)
+                return analysis_text
+            response = self.client.messages.create(**self._request_params(prompt, tool=tool))
             self.last_request_time = time.time()
-            return response.content[0].text if isinstance(response.content, list) else response.content
-            
+            self._record_usage(response.usage, time.perf_counter() - start)
+            return message_text(response) if isinstance(response.content, list) else response.content
+        
         except RateLimitError as e:
             if retry_count >= self.max_retries:
                 print(f"\nError: Maximum retries ({self.max_retries}) exceeded.")
                 print("Consider reducing batch size or increasing delay between requests.")
                 return None
-                
+            
             retry_delay = self.base_retry_delay * (2 ** retry_count)  # Exponential backoff
             print(f"\nRate limit hit. Waiting {retry_delay} seconds before retry {retry_count + 1}/{self.max_retries}...")
             time.sleep(retry_delay)
-            return self._call_claude_api(prompt, retry_count + 1)
+            return self._call_claude_api(prompt, retry_count + 1, stream_to, tool)
+    
+    def _retry_delay(self, error: Exception, retry_count: int, base_delay: float = None) -> float:
+        """Get how long to wait after a rate limit or transient error.
         
-    def analyze_paper(self, paper_text: str, project_context: str, paper_id: str) -> dict:
-        """Analyze a paper using Claude API.
+        Args:
+            error: The error returned by the API
+            retry_count: Current retry attempt number
+            base_delay: First delay of the exponential backoff. If None, base_retry_delay.
+        
+        Returns:
+            Seconds from the retry-after header, or the exponential backoff if absent
+        """
+        response = getattr(error, "response", None)
+        retry_after = response.headers.get("retry-after") if response is not None else None
+        try:
+            return max(0.0, float(retry_after))
+        except (TypeError, ValueError):
+            return (base_delay or self.base_retry_delay) * (2 ** retry_count)
+    
+    async def _call_claude_api_async(self, prompt: str | list[dict], model: str = None,
+                                     max_tokens: int = None, usage: dict = None,
+                                     stream_to: Path = None, tool: dict = None) -> Optional[str]:
+        """Call Claude API asynchronously through the shared rate limiter.
+        
+        Args:
+            prompt: The prompt string or content blocks to send to Claude
+            model: Model to use instead of the configured one
+            max_tokens: Output limit to use instead of the configured one
+            usage: Totals to record the usage in. If None, the analysis totals in self.usage.
+            stream_to: File the response is written to as it streams in, if
+                streaming is enabled
+            tool: Tool the model must answer with, instead of free text
+        
+        Returns:
+            Analysis text, or the tool call JSON, if successful. None if all retries failed.
+        """
+        # Rough estimate of 4 characters per token, corrected after the response
+        if isinstance(prompt, str):
+            input_estimate = len(prompt) // 4
+        else:
+            input_estimate = sum(len(block["text"]) for block in prompt) // 4
+        output_reserve = max_tokens or self.config.claude_max_tokens
+        
+        for retry_count in range(self.max_retries + 1):
+            await self.rate_limiter.acquire(input_estimate, output_reserve)
+            recorder = None
+            try:
+                start = time.perf_counter()
+                params = self._request_params(prompt, model, max_tokens, tool)
+                if self.config.claude_stream:
+                    with StreamRecorder(stream_to) as recorder:
+                        async with self.async_client.messages.stream(**params) as stream:
+                            async for event in stream:
+                                if delta := self._stream_delta(event):
+                                    recorder.write(delta)
+                            response = await stream.get_final_message()
+                        response_text = recorder.finish(response)
+                else:
+                    response = await self.async_client.messages.create(**params)
+                    response_text = message_text(response) if isinstance(response.content, list) else response.content
+            except RateLimitError as e:
+                # Reserved tokens count against the limit, but the request wasn't billed
+                self.rate_limiter.reconcile(input_estimate, output_reserve, 0, 0)
+                if retry_count >= self.max_retries:
+                    break
+                retry_delay = self._retry_delay(e, retry_count)
+                print(f"\nRate limit hit. Pausing requests for {retry_delay:.1f} seconds before retry {retry_count + 1}/{self.max_retries}...")
+                self.rate_limiter.pause(retry_delay)
+                continue
+            except (APIStatusError, APIConnectionError) as e:
+                # The client doesn't retry by itself, so overloaded and server errors,
+                # timeouts and dropped connections are retried here
+                self.rate_limiter.reconcile(input_estimate, output_reserve, 0, 0)
+                if isinstance(e, APIStatusError) and e.status_code < 500:
+                    raise
+                if retry_count >= self.max_retries:
+                    break
+                retry_delay = self._retry_delay(e, retry_count, self.base_error_delay)
+                print(f"\nAPI error ({e}). Retrying in {retry_delay:.1f} seconds, retry {retry_count + 1}/{self.max_retries}...")
+                await asyncio.sleep(retry_delay)
+                continue
+            except BaseException:
+                # Truncated streams, cancellation and the like; release the reservation before failing
+                self.rate_limiter.reconcile(input_estimate, output_reserve, 0, 0)
+                raise
+            
+            # Cache reads don't count towards the input token limit
+            self.rate_limiter.reconcile(
+                input_estimate, output_reserve,
+                response.usage.input_tokens + (response.usage.cache_creation_input_tokens or 0),
+                response.usage.output_tokens
+            )
+            self._record_usage(response.usage, time.perf_counter() - start, usage, recorder)
+            return response_text
+        
+        print(f"\nError: Maximum retries ({self.max_retries}) exceeded.")
+        print("Consider lowering the limits in the [rate_limits] section of config.toml.")
+        return None
+    
+    def _build_prompt(self, paper_text: str, project_context: str) -> str:
+        """Build the flat analysis prompt for a paper, used as its cache key.
+        
+        Requests send the same text as content blocks, see _build_content().
         
         Args:
             paper_text: Extracted text content from the paper
             project_context: Content from the project's document
-            paper_id: arXiv paper ID for caching
-            
+        
         Returns:
-            Dictionary containing the analysis results
+            The full prompt string
         """
-        # Prepare the prompt
-        prompt = f"""Project Context:
+        return f"""Project Context:
 {project_context}
 
 Paper Content:
@@ -103,25 +445,327 @@ Paper Content:
 
 {self.prompt_template}"""
 
-        # Check cache first - use original prompt for cache key to maintain compatibility
-        if cached_result := self.cache.get(paper_id, prompt):
+    def _cache_key(self, paper_id: str, paper_text: str, project_context: str, pdf_path: Path = None) -> str:
+        """Build the cache key of an analysis from its inputs.
+        
+        The key combines the paper ID, the content hash of the PDF, the hashes
+        of the project context and the prompt template, and the model settings,
+        so changing any of them invalidates the cached analysis. All hashes are
+        memoized, so the key costs nothing proportional to the prompt size
+        after the first paper.
+        
+        Args:
+            paper_id: arXiv paper ID
+            paper_text: Extracted text content from the paper, hashed if pdf_path is None
+            project_context: Content from the project's document
+            pdf_path: Path to the paper's PDF file
+        
+        Returns:
+            Cache key
+        """
+        if pdf_path is not None:
+            content_hash = f"pdf:{self.fingerprints.file(pdf_path)}"
+        else:
+            content_hash = f"text:{self.fingerprints.text(paper_text)}"
+        return self.fingerprints.combine(
+            "analysis-v2",
+            paper_id,
+            content_hash,
+            *self._settings_fingerprint(project_context)
+        )
+    
+    def _settings_fingerprint(self, project_context: str) -> tuple:
+        """Get the cache key components shared by every paper of a run."""
+        settings = (
+            self.fingerprints.text(project_context),
+            self.template_hash,
+            self.config.claude_model,
+            self.config.claude_max_tokens,
+            self.config.claude_temperature
+        )
+        # Keys of runs without a budget or structured output are unchanged, so their analyses stay cached
+        if self.text_budget:
+            settings += (self.text_budget.fingerprint(),)
+        if self.config.claude_structured:
+            settings += (self.fingerprints.text(json.dumps(ANALYSIS_TOOL, sort_keys=True)),)
+        return settings
+    
+    def _analysis_fingerprint(self, paper_id: str, project_context: str) -> str:
+        """Identify an analysis by everything in its cache key except the paper content.
+        
+        Args:
+            paper_id: arXiv paper ID
+            project_context: Content from the project's document
+        
+        Returns:
+            Fingerprint usable before the paper is downloaded
+        """
+        return self.fingerprints.combine("analysis-v2", paper_id, *self._settings_fingerprint(project_context))
+    
+    def get_cached_analysis(self, paper_id: str, project_context: str) -> dict | None:
+        """Look up an analysis by paper ID and run settings alone.
+        
+        This skips downloading and extracting the paper, so it cannot notice
+        if the PDF content changed since the analysis was cached.
+        
+        Args:
+            paper_id: arXiv paper ID
+            project_context: Content from the project's document
+        
+        Returns:
+            The latest cached analysis for these settings, or None
+        """
+        return self.cache.get_by_fingerprint(paper_id, self._analysis_fingerprint(paper_id, project_context))
+    
+    def _get_cached(self, paper_id: str, key: str, paper_text: str, project_context: str) -> dict | None:
+        """Get a cached analysis, moving entries of earlier versions to the new key.
+        
+        Entries written before cache keys included the model settings are keyed
+        by the hash of the full prompt. They are looked up only when the key
+        misses, and are re-saved under the key and removed, so they are
+        migrated once and a later model change still invalidates them.
+        
+        Args:
+            paper_id: arXiv paper ID
+            key: Cache key from _cache_key()
+            paper_text: Extracted text content from the paper
+            project_context: Content from the project's document
+        
+        Returns:
+            Cached analysis result or None if not found
+        """
+        if cached_result := self.cache.get_by_key(paper_id, key):
+            return cached_result
+        if legacy_result := self.cache.pop(paper_id, self._build_prompt(paper_text, project_context)):
+            return self.cache.save_by_key(
+                paper_id, key, legacy_result, self._analysis_fingerprint(paper_id, project_context)
+            )
+        return None
+    
+    def analyze_paper(self, paper_text: str, project_context: str, paper_id: str, pdf_path: Path = None) -> dict:
+        """Analyze a paper using Claude API.
+        
+        Args:
+            paper_text: Extracted text content from the paper
+            project_context: Content from the project's document
+            paper_id: arXiv paper ID for caching
+            pdf_path: Path to the paper's PDF, whose content hash keys the cache.
+                If None, the paper text is hashed instead.
+        
+        Returns:
+            Dictionary containing the analysis results
+        """
+        key = self._cache_key(paper_id, paper_text, project_context, pdf_path)
+        
+        # Check cache first
+        if cached_result := self._get_cached(paper_id, key, paper_text, project_context):
             print(f"Using cached analysis for paper {paper_id}")
             return cached_result
-            
+        
         print(f"Analyzing paper {paper_id}...")
+        paper_text, text_budget = self._fit_text(paper_id, paper_text)
         
         # Get Claude's analysis with retries
-        analysis_text = self._call_claude_api(prompt)
+        analysis_text = self._call_claude_api(
+            self._build_content(paper_text, project_context), **self._analysis_options(paper_id)
+        )
         if analysis_text is None:
             raise RuntimeError(f"Failed to analyze paper {paper_id} after maximum retries")
         
-        result = {
-            "analysis": analysis_text,
-            "paper_text": paper_text,
-            "project_context": project_context
-        }
+        result = self._build_result(paper_id, analysis_text, paper_text, project_context, text_budget)
+        
+        # The returned copy references the texts in the blob store
+        return self.cache.save_by_key(paper_id, key, result, self._analysis_fingerprint(paper_id, project_context))
+    
+    async def analyze_paper_async(self, paper_text: str, project_context: str, paper_id: str,
+                                  pdf_path: Path = None) -> dict:
+        """Analyze a paper using the async Claude API client.
+        
+        Args:
+            paper_text: Extracted text content from the paper
+            project_context: Content from the project's document
+            paper_id: arXiv paper ID for caching
+            pdf_path: Path to the paper's PDF, whose content hash keys the cache
+        
+        Returns:
+            Dictionary containing the analysis results
+        """
+        key = self._cache_key(paper_id, paper_text, project_context, pdf_path)
+        
+        if cached_result := self._get_cached(paper_id, key, paper_text, project_context):
+            print(f"Using cached analysis for paper {paper_id}")
+            return cached_result
+        
+        print(f"Analyzing paper {paper_id}...")
+        paper_text, text_budget = self._fit_text(paper_id, paper_text)
+        
+        analysis_text = await self._call_claude_api_async(
+            self._build_content(paper_text, project_context), **self._analysis_options(paper_id)
+        )
+        if analysis_text is None:
+            raise RuntimeError(f"Failed to analyze paper {paper_id} after maximum retries")
+        
+        result = self._build_result(paper_id, analysis_text, paper_text, project_context, text_budget)
+        return self.cache.save_by_key(paper_id, key, result, self._analysis_fingerprint(paper_id, project_context))
+    
+    async def analyze_papers_async(self, papers: list[tuple[str, str, Path]], project_context: str) -> list[dict]:
+        """Analyze many papers with several requests in flight at once.
+        
+        Concurrency is bounded by `max_in_flight` and the shared rate limiter.
+        
+        Args:
+            papers: (paper_id, paper_text, pdf_path) tuples. pdf_path may be None.
+            project_context: Content from the project's document
+        
+        Returns:
+            Analysis results in the same order as papers
+        """
+        semaphore = asyncio.Semaphore(self.config.max_in_flight)
+        
+        async def analyze(paper_id: str, paper_text: str, pdf_path: Path) -> dict:
+            async with semaphore:
+                return await self.analyze_paper_async(paper_text, project_context, paper_id, pdf_path)
+        
+        return await asyncio.gather(*(
+            analyze(paper_id, paper_text, pdf_path) for paper_id, paper_text, pdf_path in papers
+        ))
+    
+    def _load_batch_state(self) -> dict | None:
+        """Load the state of a previously submitted batch, if any."""
+        state_path = Path(self.config.batch_state_file)
+        if not state_path.exists():
+            return None
+        with open(state_path) as f:
+            return json.load(f)
+    
+    def _save_batch_state(self, state: dict | None) -> None:
+        """Persist the state of a submitted batch, or clear it when state is None."""
+        state_path = Path(self.config.batch_state_file)
+        if state is None:
+            state_path.unlink(missing_ok=True)
+            return
+        state_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = state_path.with_suffix(state_path.suffix + ".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(state, f, indent=2)
+        os.replace(tmp_path, state_path)
+    
+    def _collect_batch(self, batch_client: BatchClient, state: dict, pending: dict,
+                       project_context: str) -> list[str]:
+        """Wait for a submitted batch to end and cache its results.
+        
+        Args:
+            batch_client: Backend the batch was submitted to
+            state: Stored batch state with the batch ID and custom ID mapping
+            pending: Uncached papers of this run, {custom_id: (paper_id, paper_text, key, text_budget)}
+            project_context: Content from the project's document
+        
+        Returns:
+            IDs of the papers whose requests failed
+        """
+        batch_id = state["batch_id"]
+        while (status := batch_client.status(batch_id)) != "ended":
+            print(f"Batch {batch_id} is {status}, checking again in {self.config.batch_poll_interval} seconds...")
+            time.sleep(self.config.batch_poll_interval)
+        
+        failed = []
+        for custom_id, analysis_text, usage in batch_client.results(batch_id):
+            if custom_id not in pending:
+                # Custom IDs embed the cache key, so this is a paper or prompt no longer requested
+                continue
+            paper_id, paper_text, key, text_budget = pending[custom_id]
+            if analysis_text is None:
+                failed.append(paper_id)
+                continue
+            # Batch requests have no duration of their own, only the tokens are added
+            self._record_usage(usage, 0.0)
+            try:
+                result = self._build_result(paper_id, analysis_text, paper_text, project_context, text_budget)
+            except RuntimeError as e:
+                print(f"\nWarning: {e}")
+                failed.append(paper_id)
+                continue
+            self.cache.save_by_key(paper_id, key, result, self._analysis_fingerprint(paper_id, project_context))
+        return failed
+    
+    def _pending_batch_requests(self, papers: list[tuple[str, str, Path]], project_context: str) -> dict:
+        """Find the papers of a batch run that are not cached yet.
+        
+        Args:
+            papers: (paper_id, paper_text, pdf_path) tuples
+            project_context: Content from the project's document
+        
+        Returns:
+            {custom_id: (paper_id, paper_text, key, text_budget)} for every uncached paper,
+            with the paper text trimmed to the token budget
+        """
+        pending = {}
+        for paper_id, paper_text, pdf_path in papers:
+            key = self._cache_key(paper_id, paper_text, project_context, pdf_path)
+            if self._get_cached(paper_id, key, paper_text, project_context):
+                continue
+            # Custom IDs may only contain letters, digits, "_" and "-"
+            custom_id = re.sub(r"[^a-zA-Z0-9_-]", "_", paper_id)[:40]
+            custom_id = f"{custom_id}-{key[:16]}"
+            budgeted_text, text_budget = self._fit_text(paper_id, paper_text)
+            pending[custom_id] = (paper_id, budgeted_text, key, text_budget)
+        return pending
+    
+    def analyze_papers_batch(self, papers: list[tuple[str, str, Path]], project_context: str,
+                             batch_client: BatchClient = None) -> list[dict]:
+        """Analyze papers through the Message Batches API.
+        
+        All uncached prompts go out in one batch, which is polled until it ends
+        and whose results are written to the cache. The batch ID is stored in
+        `batch_state_file` so a run that is killed while waiting picks up the
+        same batch instead of resubmitting.
+        
+        Args:
+            papers: (paper_id, paper_text, pdf_path) tuples. pdf_path may be None.
+            project_context: Content from the project's document
+            batch_client: Batch backend. If None, uses the Anthropic API.
+        
+        Returns:
+            Analysis results in the same order as papers
+        """
+        batch_client = batch_client or AnthropicBatchClient(self.client)
+        
+        pending = self._pending_batch_requests(papers, project_context)
+        if state := self._load_batch_state():
+            print(f"Resuming batch {state['batch_id']}...")
+            self._collect_batch(batch_client, state, pending, project_context)
+            self._save_batch_state(None)
+            # Requests that failed in the resumed batch are resubmitted below
+            pending = {
+                custom_id: request for custom_id, request in pending.items()
+                if self.cache.get_by_key(request[0], request[2]) is None
+            }
+        
+        failed = []
+        if pending:
+            print(f"Submitting batch of {len(pending)} papers...")
+            batch_id = batch_client.submit([
+                {
+                    "custom_id": custom_id,
+                    "params": self._request_params(
+                        self._build_content(paper_text, project_context),
+                        tool=ANALYSIS_TOOL if self.config.claude_structured else None
+                    )
+                }
+                for custom_id, (_, paper_text, _, _) in pending.items()
+            ])
+            state = {"batch_id": batch_id}
+            self._save_batch_state(state)
+            failed = self._collect_batch(batch_client, state, pending, project_context)
+            self._save_batch_state(None)
         
-        # Cache the result using original prompt to maintain compatibility
-        self.cache.save(paper_id, prompt, result)
+        if failed:
+            raise RuntimeError(f"Batch analysis failed for papers: {', '.join(failed)}")
         
-        return result 
\ No newline at end of file
+        results = []
+        for paper_id, paper_text, pdf_path in papers:
+            result = self.cache.get_by_key(paper_id, self._cache_key(paper_id, paper_text, project_context, pdf_path))
+            if result is None:
+                raise RuntimeError(f"No batch result returned for paper {paper_id}")
+            results.append(result)
+        return results
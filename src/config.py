@@ -10,7 +10,7 @@ class Config:
         """
         self.config_path = Path(config_path)
         self.load_config()
-        
+    
     def load_config(self):
         """Load configuration from TOML file."""
         if not self.config_path.exists():
@@ -19,19 +19,97 @@ class Config:
                 "claude": {
                     "model": "claude-3-5-haiku-latest",
                     "max_tokens": 4000,
-                    "temperature": 0
+                    "temperature": 0,
+                    "stream": True,
+                    "structured": False
                 },
                 "files": {
                     "project_doc": "project.docx",
                     "paper_list": "paper_list.txt",
                     "summaries_dir": "summaries",
                     "papers_dir": "papers"
+                },
+                "pipeline": {
+                    "enabled": True,
+                    "download_workers": 4,
+                    "extract_workers": 2,
+                    "analyze_workers": 2,
+                    "async_analysis": True
+                },
+                "rate_limits": {
+                    "requests_per_minute": 50,
+                    "input_tokens_per_minute": 40000,
+                    "output_tokens_per_minute": 8000,
+                    "max_in_flight": 8
+                },
+                "download": {
+                    "per_host_limit": 2
+                },
+                "metadata": {
+                    "ttl_days": 30
+                },
+                "harvest": {
+                    "categories": ["cs.LG"],
+                    "workers": 3,
+                    "requests_per_minute": 20,
+                    "page_size": 2000,
+                    "max_results_per_window": 10000,
+                    "overlap_days": 3
+                },
+                "filter": {
+                    "top_k": 100
+                },
+                "text_budget": {
+                    "enabled": False,
+                    "max_tokens": 30000
+                },
+                "meta_summary": {
+                    "mode": "hierarchical",
+                    "max_group_tokens": 60000,
+                    "group_size": 8,
+                    "workers": 4,
+                    "clusters": 0,
+                    "max_features": 2000,
+                    "cluster_state_file": ".cache/meta_summary_clusters.json"
+                },
+                "triage": {
+                    "enabled": False,
+                    "model": "claude-3-5-haiku-latest",
+                    "threshold": 40,
+                    "max_tokens": 300,
+                    "max_input_chars": 8000
+                },
+                "pdf": {
+                    "workers": 4,
+                    "pages_per_task": 16,
+                    "cache_text": True
+                },
+                "gather": {
+                    "workers": 4
+                },
+                "batch": {
+                    "enabled": False,
+                    "poll_interval": 60,
+                    "state_file": ".cache/batch_state.json"
                 }
             }
         else:
             with open(self.config_path, "rb") as f:
                 self.config = tomli.load(f)
-                
+    
+    def _get(self, section: str, key: str, default=None):
+        """Get an optional setting, falling back to a default.
+        
+        Args:
+            section: TOML table name
+            key: Key within the table
+            default: Value returned if the table or key is missing
+        
+        Returns:
+            The configured value or the default
+        """
+        return self.config.get(section, {}).get(key, default)
+    
     @property
     def claude_model(self) -> str:
         """Get the Claude model name."""
@@ -47,6 +125,21 @@ class Config:
         """Get the temperature for Claude API."""
         return self.config["claude"]["temperature"]
     
+    @property
+    def claude_stream(self) -> bool:
+        """Get whether responses are streamed and written to disk as they arrive."""
+        return self._get("claude", "stream", True)
+    
+    @property
+    def claude_structured(self) -> bool:
+        """Get whether analyses are returned as typed fields through tool use."""
+        return self._get("claude", "structured", False)
+    
+    @property
+    def claude_base_url(self) -> str | None:
+        """Get the Messages API base URL, or None for the default endpoint."""
+        return self._get("claude", "base_url")
+    
     @property
     def project_doc(self) -> str:
         """Get the project document path."""
@@ -65,4 +158,204 @@ class Config:
     @property
     def papers_dir(self) -> str:
         """Get the papers directory path."""
-        return self.config["files"]["papers_dir"] 
\ No newline at end of file
+        return self.config["files"]["papers_dir"]
+    
+    @property
+    def pipeline_enabled(self) -> bool:
+        """Whether papers are processed by the concurrent pipeline."""
+        return self._get("pipeline", "enabled", True)
+    
+    @property
+    def download_workers(self) -> int:
+        """Get the number of concurrent download workers."""
+        return self._get("pipeline", "download_workers", 4)
+    
+    @property
+    def extract_workers(self) -> int:
+        """Get the number of concurrent text extraction workers."""
+        return self._get("pipeline", "extract_workers", 2)
+    
+    @property
+    def analyze_workers(self) -> int:
+        """Get the number of concurrent analysis workers."""
+        return self._get("pipeline", "analyze_workers", 2)
+    
+    @property
+    def pipeline_async_analysis(self) -> bool:
+        """Whether the pipeline analyzes papers through the async, rate-limited client."""
+        return self._get("pipeline", "async_analysis", True)
+    
+    @property
+    def requests_per_minute(self) -> int:
+        """Get the API request limit per minute."""
+        return self._get("rate_limits", "requests_per_minute", 50)
+    
+    @property
+    def input_tokens_per_minute(self) -> int:
+        """Get the API input token limit per minute."""
+        return self._get("rate_limits", "input_tokens_per_minute", 40000)
+    
+    @property
+    def output_tokens_per_minute(self) -> int:
+        """Get the API output token limit per minute."""
+        return self._get("rate_limits", "output_tokens_per_minute", 8000)
+    
+    @property
+    def max_in_flight(self) -> int:
+        """Get the maximum number of concurrent async API requests."""
+        return self._get("rate_limits", "max_in_flight", 8)
+    
+    @property
+    def batch_enabled(self) -> bool:
+        """Whether papers are analyzed through the Message Batches API."""
+        return self._get("batch", "enabled", False)
+    
+    @property
+    def batch_poll_interval(self) -> int:
+        """Get the seconds between batch status checks."""
+        return self._get("batch", "poll_interval", 60)
+    
+    @property
+    def batch_state_file(self) -> str:
+        """Get the path storing the ID of a submitted, uncollected batch."""
+        return self._get("batch", "state_file", ".cache/batch_state.json")
+    
+    @property
+    def pdf_workers(self) -> int:
+        """Get the number of PDF text extraction processes."""
+        return self._get("pdf", "workers", 4)
+    
+    @property
+    def pdf_pages_per_task(self) -> int:
+        """Get the number of pages parsed per extraction task."""
+        return self._get("pdf", "pages_per_task", 16)
+    
+    @property
+    def pdf_cache_text(self) -> bool:
+        """Whether extracted PDF text is cached across runs."""
+        return self._get("pdf", "cache_text", True)
+    
+    @property
+    def gather_workers(self) -> int:
+        """Get the number of processes parsing summaries in gather_summaries.py."""
+        return self._get("gather", "workers", 4)
+    
+    @property
+    def download_per_host_limit(self) -> int:
+        """Get the maximum number of concurrent downloads from one host."""
+        return self._get("download", "per_host_limit", 2)
+    
+    @property
+    def metadata_ttl_days(self) -> float:
+        """Get the age in days after which stored arXiv metadata is refreshed."""
+        return self._get("metadata", "ttl_days", 30)
+    
+    @property
+    def harvest_categories(self) -> list[str]:
+        """Get the arXiv categories harvested by collect_recent_papers.py."""
+        return self._get("harvest", "categories", None) or [self._get("harvest", "category", "cs.LG")]
+    
+    @property
+    def harvest_workers(self) -> int:
+        """Get the number of date chunks harvested concurrently."""
+        return self._get("harvest", "workers", 3)
+    
+    @property
+    def harvest_requests_per_minute(self) -> float:
+        """Get the arXiv API request budget shared by all harvest workers."""
+        return self._get("harvest", "requests_per_minute", 20)
+    
+    @property
+    def harvest_page_size(self) -> int:
+        """Get the number of results requested per arXiv API page."""
+        return self._get("harvest", "page_size", 2000)
+    
+    @property
+    def harvest_max_results_per_window(self) -> int:
+        """Get the result count above which a harvest window is split."""
+        return self._get("harvest", "max_results_per_window", 10000)
+    
+    @property
+    def harvest_overlap_days(self) -> float:
+        """Get the days before the last harvested paper that an incremental harvest fetches again."""
+        return self._get("harvest", "overlap_days", 3)
+    
+    @property
+    def filter_top_k(self) -> int:
+        """Get the number of papers filter_papers.py keeps."""
+        return self._get("filter", "top_k", 100)
+    
+    @property
+    def filter_min_score(self):
+        """Get the minimum relevance, as a fraction of the best score, for filter_papers.py. None keeps all top_k."""
+        return self._get("filter", "min_score", None)
+    
+    @property
+    def triage_enabled(self) -> bool:
+        """Get whether a cheap model screens papers before the full analysis."""
+        return self._get("triage", "enabled", False)
+    
+    @property
+    def triage_model(self) -> str:
+        """Get the model that scores paper relevance during triage."""
+        return self._get("triage", "model", "claude-3-5-haiku-latest")
+    
+    @property
+    def triage_threshold(self) -> int:
+        """Get the triage score (0-100) a paper needs to be analyzed in full."""
+        return self._get("triage", "threshold", 40)
+    
+    @property
+    def triage_max_tokens(self) -> int:
+        """Get the maximum output tokens of a triage response."""
+        return self._get("triage", "max_tokens", 300)
+    
+    @property
+    def triage_max_input_chars(self) -> int:
+        """Get the number of characters of paper text the triage model sees."""
+        return self._get("triage", "max_input_chars", 8000)
+    
+    @property
+    def text_budget_enabled(self) -> bool:
+        """Get whether long papers are trimmed to a token budget before analysis."""
+        return self._get("text_budget", "enabled", False)
+    
+    @property
+    def text_budget_max_tokens(self) -> int:
+        """Get the estimated tokens of paper text sent per analysis."""
+        return self._get("text_budget", "max_tokens", 30000)
+    
+    @property
+    def meta_summary_mode(self) -> str:
+        """Get how the meta-summary is built: "single", "hierarchical" or "clusters"."""
+        return self._get("meta_summary", "mode", "hierarchical")
+    
+    @property
+    def meta_summary_max_group_tokens(self) -> int:
+        """Get the estimated input tokens of one partial meta-summary request."""
+        return self._get("meta_summary", "max_group_tokens", 60000)
+    
+    @property
+    def meta_summary_group_size(self) -> int:
+        """Get the average number of texts per partial meta-summary."""
+        return self._get("meta_summary", "group_size", 8)
+    
+    @property
+    def meta_summary_workers(self) -> int:
+        """Get the number of partial meta-summaries requested at once."""
+        return self._get("meta_summary", "workers", 4)
+    
+    @property
+    def meta_summary_clusters(self) -> int:
+        """Get the number of topic clusters; 0 picks one from the number of papers."""
+        return self._get("meta_summary", "clusters", 0)
+    
+    @property
+    def meta_summary_max_features(self) -> int:
+        """Get the vocabulary size of the local topic embeddings."""
+        return self._get("meta_summary", "max_features", 2000)
+    
+    @property
+    def meta_summary_cluster_state_file(self) -> str:
+        """Get the file holding the topic model and cluster assignments."""
+        return self._get("meta_summary", "cluster_state_file", ".cache/meta_summary_clusters.json")
@@ -0,0 +1,88 @@
+from collections import OrderedDict
+import hashlib
+import os
+from pathlib import Path
+import threading
+
+class Fingerprinter:
+    def __init__(self, recent_texts: int = 8):
+        """Initialize the fingerprinter.
+        
+        Hashes are memoized for the lifetime of the object, so the project
+        context, the prompt template and each PDF are hashed once per run.
+        
+        Args:
+            recent_texts: Number of recently hashed texts to remember
+        """
+        self._texts = OrderedDict()
+        self._recent_texts = recent_texts
+        self._files = {}
+        self._lock = threading.Lock()
+    
+    def text(self, text: str) -> str:
+        """Get the SHA-256 of a text.
+        
+        Args:
+            text: Text to hash
+        
+        Returns:
+            Hex digest
+        """
+        with self._lock:
+            if (digest := self._texts.get(text)) is not None:
+                self._texts.move_to_end(text)
+                return digest
+        digest = hashlib.sha256(text.encode("utf-8", "surrogatepass")).hexdigest()
+        with self._lock:
+            self._texts[text] = digest
+            if len(self._texts) > self._recent_texts:
+                self._texts.popitem(last=False)
+        return digest
+    
+    def file(self, path: str | Path) -> str:
+        """Get the SHA-256 of a file's content.
+        
+        The hash is recomputed only if the file's size or modification time changed.
+        
+        Args:
+            path: Path to the file
+        
+        Returns:
+            Hex digest
+        """
+        stat = os.stat(path)
+        memo_key = (str(Path(path).resolve()), stat.st_size, stat.st_mtime_ns)
+        with self._lock:
+            if (digest := self._files.get(memo_key)) is not None:
+                return digest
+        
+        sha = hashlib.sha256()
+        with open(path, "rb") as f:
+            while chunk := f.read(1 << 20):
+                sha.update(chunk)
+        digest = sha.hexdigest()
+        with self._lock:
+            self._files[memo_key] = digest
+        return digest
+    
+    def remember_file(self, path: str | Path, digest: str) -> None:
+        """Record a file hash known from elsewhere, e.g. a persistent cache.
+        
+        Args:
+            path: Path to the file
+            digest: SHA-256 of the file's current content
+        """
+        stat = os.stat(path)
+        with self._lock:
+            self._files[(str(Path(path).resolve()), stat.st_size, stat.st_mtime_ns)] = digest
+    
+    def combine(self, *components) -> str:
+        """Hash a sequence of components into a single key.
+        
+        Args:
+            components: Values whose string forms make up the key
+        
+        Returns:
+            Hex digest
+        """
+        return hashlib.sha256("\x1f".join(str(c) for c in components).encode()).hexdigest()
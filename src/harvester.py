@@ -0,0 +1,493 @@
+import csv
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from datetime import datetime, timedelta, timezone
+import json
+import logging
+import math
+import os
+from pathlib import Path
+import threading
+from typing import IO, Callable, Iterable, Iterator, Optional
+import arxiv
+from .metadata_store import MetadataStore
+from .rate_limiter import RequestPacer
+
+logger = logging.getLogger(__name__)
+
+class _PacedClient(arxiv.Client):
+    def __init__(self, pacer: RequestPacer, page_size: int = 100, num_retries: int = 3):
+        """arxiv.Client whose page requests, retries included, wait for a shared pacer.
+        
+        The pacer replaces the client's own per-instance delay, so several
+        clients in different threads stay within one rate budget. The total
+        result count reported by the last first page is kept in last_total.
+        """
+        super().__init__(page_size=page_size, delay_seconds=0, num_retries=num_retries)
+        self.pacer = pacer
+        self.last_total = 0
+    
+    def _parse_feed(self, url: str, first_page: bool = True, _try_index: int = 0):
+        self.pacer.acquire()
+        feed = super()._parse_feed(url, first_page=first_page, _try_index=_try_index)
+        if first_page:
+            self.last_total = int(feed.feed.get("opensearch_totalresults", 0))
+        return feed
+
+class _WindowTooLarge(Exception):
+    def __init__(self, total: int):
+        """Raised when a date window holds more results than the API will page through."""
+        super().__init__(f"{total} results")
+        self.total = total
+
+class ArxivHarvester:
+    FIELDS = ["title", "authors", "abstract", "published_date", "updated_date", "arxiv_id", "url"]
+    # Version of the checkpoint format
+    CHECKPOINT_VERSION = 2
+    
+    def __init__(self, output_file: str, categories: list[str] = ("cs.LG",), workers: int = 3,
+                 requests_per_minute: float = 20, page_size: int = 2000,
+                 max_results_per_window: int = 10000, metadata_store: Optional[MetadataStore] = None):
+        """Initialize a harvester of arXiv listings by submission date.
+        
+        The date range of each category is cut into windows that are fetched
+        concurrently, across categories too. Window lengths adapt to the
+        observed paper density: a window reporting more than
+        max_results_per_window results is split and fetched again, and
+        after sparse windows the following ones are made longer, so each
+        window needs as few page requests as possible and none is truncated.
+        
+        Each finished window is appended to the output file and recorded in a
+        checkpoint next to it, so memory use does not grow with the length of
+        the range and an interrupted harvest resumes with the missing windows.
+        
+        Args:
+            output_file: CSV file, or JSON Lines file if it ends in .jsonl
+            categories: arXiv categories to harvest. Papers listed in several
+                of them are written once.
+            workers: Number of windows fetched at the same time
+            requests_per_minute: Rate budget shared by all workers
+            page_size: Results per page request (the API allows up to 2000)
+            max_results_per_window: Largest result count the API reliably pages through
+            metadata_store: MetadataStore that harvested papers are added to (optional)
+        """
+        self.output_file = Path(output_file)
+        self.checkpoint_file = self.output_file.with_name(self.output_file.name + ".checkpoint.json")
+        self.format = "jsonl" if self.output_file.suffix == ".jsonl" else "csv"
+        self.categories = list(categories)
+        self.workers = workers
+        self.page_size = page_size
+        self.max_results_per_window = max_results_per_window
+        # Windows are sized for this many results, leaving headroom below the limit
+        self.target_results = max(1, max_results_per_window // 2)
+        self.metadata_store = metadata_store
+        self.pacer = RequestPacer(requests_per_minute)
+        # arxiv.Client is not thread-safe, so each worker thread gets its own
+        self._clients = threading.local()
+        # Index of the papers in the output file, from arXiv ID without version
+        # to the versioned ID, so each paper is written once
+        self._index = {}
+    
+    def _client(self) -> _PacedClient:
+        """Get the arXiv client of the calling thread."""
+        if not hasattr(self._clients, "client"):
+            self._clients.client = _PacedClient(self.pacer, page_size=self.page_size)
+        return self._clients.client
+    
+    def _query(self, category: str, start: datetime, end: datetime, date_field: str) -> str:
+        """Build the search query for papers in a category with date_field in [start, end)."""
+        # Date bounds are inclusive and have minute resolution
+        last_minute = end - timedelta(minutes=1)
+        return f"cat:{category} AND {date_field}:[{start:%Y%m%d%H%M} TO {last_minute:%Y%m%d%H%M}]"
+    
+    def _row(self, result: arxiv.Result) -> dict:
+        """Convert an arXiv result into an output row."""
+        return {
+            "title": result.title,
+            "authors": ", ".join(author.name for author in result.authors),
+            "abstract": result.summary,
+            "published_date": result.published.strftime("%Y-%m-%d"),
+            "updated_date": result.updated.isoformat(),
+            "arxiv_id": result.entry_id.split("/")[-1],
+            "url": result.entry_id
+        }
+    
+    def fetch_window(self, category: str, start: datetime, end: datetime,
+                     date_field: str = "submittedDate") -> list[dict]:
+        """Fetch the papers of a category with a date in one window.
+        
+        Args:
+            category: arXiv category
+            start: Window start (inclusive)
+            end: Window end (exclusive)
+            date_field: "submittedDate" for first submission, "lastUpdatedDate" for latest version
+        
+        Returns:
+            Output rows of the papers in the window
+        
+        Raises:
+            _WindowTooLarge: If the window has more results than can be paged through
+        """
+        search = arxiv.Search(
+            query=self._query(category, start, end, date_field),
+            max_results=None,
+            sort_by=arxiv.SortCriterion.SubmittedDate,
+            sort_order=arxiv.SortOrder.Descending
+        )
+        splittable = end - start > timedelta(minutes=1)
+        
+        client = self._client()
+        results = {}
+        try:
+            for result in client.results(search):
+                # The first page tells how many results there are in total
+                if not results and client.last_total > self.max_results_per_window and splittable:
+                    raise _WindowTooLarge(client.last_total)
+                results[result.entry_id] = result
+        except arxiv.UnexpectedEmptyPageError:
+            if splittable:
+                raise _WindowTooLarge(max(client.last_total, len(results)))
+            logger.warning(f"Reached API limit for {category} at {start:%Y-%m-%d %H:%M} after collecting {len(results)} papers")
+        
+        if self.metadata_store is not None:
+            self.metadata_store.put_results(list(results.values()))
+        return [self._row(result) for result in results.values()]
+    
+    @staticmethod
+    def _split(start: datetime, end: datetime, pieces: int) -> list[tuple[datetime, datetime]]:
+        """Split a window into up to `pieces` windows of whole minutes."""
+        minutes = int((end - start) / timedelta(minutes=1))
+        pieces = max(2, min(pieces, minutes))
+        bounds = [start + timedelta(minutes=minutes * i // pieces) for i in range(pieces)] + [end]
+        return list(zip(bounds, bounds[1:]))
+    
+    def _window_length(self, density: Optional[float], chunk_days: float) -> timedelta:
+        """Get the length of the next window for a category.
+        
+        Args:
+            density: Papers per day seen so far in the category, None before any window finished
+            chunk_days: Window length in days to start with
+        
+        Returns:
+            Window length, in whole minutes
+        """
+        if density is None:
+            days = chunk_days
+        elif density <= 0:
+            return timedelta.max
+        else:
+            days = self.target_results / density
+        return timedelta(minutes=max(60, int(days * 24 * 60)))
+    
+    def _gaps(self, done: list[list], start: datetime, end: datetime) -> list[tuple[datetime, datetime]]:
+        """Get the parts of [start, end) not covered by finished windows."""
+        gaps = []
+        current = start
+        for window_start, window_end, _ in sorted(done):
+            window_start, window_end = datetime.fromisoformat(window_start), datetime.fromisoformat(window_end)
+            if window_start > current:
+                gaps.append((current, window_start))
+            current = max(current, window_end)
+        if current < end:
+            gaps.append((current, end))
+        return gaps
+    
+    def _run_windows(self, gaps: dict[str, list], observed: dict[str, list], chunk_days: float,
+                     date_field: str, on_window: Callable[[str, datetime, datetime, list[dict]], None]) -> list:
+        """Fetch date ranges of each category in adaptively sized windows.
+        
+        Args:
+            gaps: Ranges to fetch per category, as (start, end) pairs in date order
+            observed: Papers and days already seen per category, as [papers, days].
+                Updated as windows finish.
+            chunk_days: Window length in days while a category's density is unknown
+            date_field: Date the ranges refer to, see fetch_window()
+            on_window: Called in the calling thread with (category, start, end, rows)
+                for each finished window
+        
+        Returns:
+            (category, start, end) of the windows that failed
+        """
+        density = {
+            category: papers / days if days > 0 else None
+            for category, (papers, days) in observed.items()
+        }
+        in_flight = {category: 0 for category in gaps}
+        
+        def next_window() -> Optional[tuple[str, datetime, datetime]]:
+            """Cut the next window from the category with the fewest windows in flight."""
+            waiting = [category for category in gaps if gaps[category]]
+            if not waiting:
+                return None
+            category = min(waiting, key=lambda c: in_flight[c])
+            gap_start, gap_end = gaps[category].pop(0)
+            length = self._window_length(density[category], chunk_days)
+            window_end = gap_end if length >= gap_end - gap_start else gap_start + length
+            if window_end < gap_end:
+                gaps[category].insert(0, (window_end, gap_end))
+            return category, gap_start, window_end
+        
+        failed = []
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures: dict[Future, tuple[str, datetime, datetime]] = {}
+            while True:
+                while len(futures) < self.workers and (window := next_window()) is not None:
+                    futures[executor.submit(self.fetch_window, *window, date_field)] = window
+                    in_flight[window[0]] += 1
+                if not futures:
+                    break
+                
+                finished, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    category, start, end = futures.pop(future)
+                    in_flight[category] -= 1
+                    days = (end - start) / timedelta(days=1)
+                    try:
+                        rows = future.result()
+                    except _WindowTooLarge as e:
+                        # Refetch in pieces sized for the reported count
+                        pieces = self._split(start, end, math.ceil(e.total / self.target_results))
+                        logger.info(f"{category} {start:%Y-%m-%d %H:%M} to {end:%Y-%m-%d %H:%M} has {e.total} papers, "
+                                    f"splitting into {len(pieces)} windows")
+                        gaps[category][:0] = pieces
+                        density[category] = e.total / days
+                        continue
+                    except Exception as e:
+                        logger.error(f"Error collecting {category} papers for {start:%Y-%m-%d %H:%M} to {end:%Y-%m-%d %H:%M}: {str(e)}")
+                        failed.append((category, start, end))
+                        continue
+                    
+                    on_window(category, start, end, rows)
+                    observed[category][0] += len(rows)
+                    observed[category][1] += days
+                    density[category] = observed[category][0] / observed[category][1]
+                    logger.info(f"Collected {len(rows)} {category} papers for {start:%Y-%m-%d %H:%M} to {end:%Y-%m-%d %H:%M}")
+        return failed
+    
+    def _load_checkpoint(self) -> Optional[dict]:
+        """Load the checkpoint of an unfinished harvest into the same output file."""
+        try:
+            with open(self.checkpoint_file) as f:
+                state = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+        if (state.get("version") != self.CHECKPOINT_VERSION or state.get("format") != self.format
+                or sorted(state.get("done", {})) != sorted(self.categories)):
+            logger.warning(f"Ignoring checkpoint {self.checkpoint_file}, it was written for a different harvest")
+            return None
+        if not self.output_file.exists() or self.output_file.stat().st_size < state["committed_bytes"]:
+            logger.warning(f"Ignoring checkpoint {self.checkpoint_file}, {self.output_file} is missing or truncated")
+            return None
+        return state
+    
+    def has_checkpoint(self) -> bool:
+        """Whether an interrupted harvest into the output file can be resumed."""
+        return self._load_checkpoint() is not None
+    
+    def _save_checkpoint(self, state: dict) -> None:
+        """Write the checkpoint atomically."""
+        tmp_path = self.checkpoint_file.with_name(self.checkpoint_file.name + ".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(state, f, indent=2)
+        os.replace(tmp_path, self.checkpoint_file)
+    
+    def _read_rows(self) -> Iterator[dict]:
+        """Read the rows of the output file one at a time."""
+        with open(self.output_file, newline="", encoding="utf-8") as f:
+            if self.format == "jsonl":
+                for line in f:
+                    if line.strip():
+                        yield json.loads(line)
+            else:
+                yield from csv.DictReader(f)
+    
+    def _scan_output(self) -> Optional[datetime]:
+        """Rebuild the ID index from the output file and find its high-water mark.
+        
+        Returns:
+            Latest update time of any paper in the file, None if it has no papers
+        """
+        self._index = {}
+        high_water_mark = None
+        for row in self._read_rows():
+            self._index[MetadataStore.split_version(row["arxiv_id"])[0]] = row["arxiv_id"]
+            # Files written before updated_date was added only have the publication day
+            if row.get("updated_date"):
+                updated = datetime.fromisoformat(row["updated_date"])
+            else:
+                updated = datetime.fromisoformat(row["published_date"]).replace(tzinfo=timezone.utc)
+            if high_water_mark is None or updated > high_water_mark:
+                high_water_mark = updated
+        return high_water_mark
+    
+    def _write_rows(self, f: IO, rows: Iterable[dict], header: bool) -> None:
+        """Write rows to an open output file in the output format."""
+        if self.format == "jsonl":
+            for row in rows:
+                f.write(json.dumps(row, ensure_ascii=False) + "\n")
+        else:
+            writer = csv.DictWriter(f, fieldnames=self.FIELDS, extrasaction="ignore")
+            if header:
+                writer.writeheader()
+            writer.writerows(rows)
+    
+    def _append(self, rows: list[dict], state: dict) -> int:
+        """Append the rows of a finished window to the output file.
+        
+        Papers already in the file, e.g. cross-listed in another harvested
+        category, are skipped.
+        
+        Args:
+            rows: Output rows
+            state: Harvest state. Its committed_bytes is advanced past the new rows.
+        
+        Returns:
+            Number of rows written
+        """
+        new_rows = {}
+        for row in rows:
+            base_id = MetadataStore.split_version(row["arxiv_id"])[0]
+            if base_id not in self._index:
+                new_rows[base_id] = row
+        with open(self.output_file, "a", newline="", encoding="utf-8") as f:
+            self._write_rows(f, new_rows.values(), header=f.tell() == 0)
+            f.flush()
+            os.fsync(f.fileno())
+            state["committed_bytes"] = f.tell()
+        self._index.update((base_id, row["arxiv_id"]) for base_id, row in new_rows.items())
+        return len(new_rows)
+    
+    def harvest(self, start_date: datetime, end_date: datetime, chunk_days: float = 15, restart: bool = False) -> int:
+        """Harvest all papers submitted in a date range into the output file.
+        
+        If a checkpoint from an interrupted harvest exists, its date range is
+        used and only the parts it doesn't list as finished are fetched.
+        Rows written after the last checkpoint are discarded first.
+        
+        Args:
+            start_date: Range start (inclusive)
+            end_date: Range end (exclusive)
+            chunk_days: Length of the first window of each category in days.
+                Later windows are sized from the density of the earlier ones.
+            restart: If True, ignore any checkpoint and start over
+        
+        Returns:
+            Number of papers written by this call
+        """
+        state = None if restart else self._load_checkpoint()
+        if state is None:
+            state = {
+                "version": self.CHECKPOINT_VERSION,
+                "format": self.format,
+                # Whole minutes, the resolution of the submittedDate filter
+                "start": start_date.replace(second=0, microsecond=0).isoformat(),
+                "end": end_date.replace(second=0, microsecond=0).isoformat(),
+                "chunk_days": chunk_days,
+                "committed_bytes": 0,
+                # Finished windows of each category as [start, end, papers]
+                "done": {category: [] for category in self.categories}
+            }
+            self.output_file.write_bytes(b"")
+            self._save_checkpoint(state)
+            self._index = {}
+        else:
+            logger.info(f"Resuming harvest from {self.checkpoint_file}")
+            with open(self.output_file, "r+b") as f:
+                f.truncate(state["committed_bytes"])
+            self._scan_output()
+        
+        start_date, end_date = datetime.fromisoformat(state["start"]), datetime.fromisoformat(state["end"])
+        gaps = {category: self._gaps(state["done"][category], start_date, end_date) for category in self.categories}
+        observed = {
+            category: [
+                sum(papers for _, _, papers in state["done"][category]),
+                sum((datetime.fromisoformat(end) - datetime.fromisoformat(start)) / timedelta(days=1)
+                    for start, end, _ in state["done"][category])
+            ]
+            for category in self.categories
+        }
+        
+        written = 0
+        
+        def on_window(category: str, start: datetime, end: datetime, rows: list[dict]) -> None:
+            """Append a finished window and record it in the checkpoint."""
+            nonlocal written
+            written += self._append(rows, state)
+            state["done"][category].append([start.isoformat(), end.isoformat(), len(rows)])
+            self._save_checkpoint(state)
+        
+        failed = self._run_windows(gaps, observed, state["chunk_days"], "submittedDate", on_window)
+        if failed:
+            raise RuntimeError(f"{len(failed)} date windows failed. Run again to resume from {self.checkpoint_file}")
+        
+        self.checkpoint_file.unlink()
+        return written
+    
+    def update(self, end_date: datetime, overlap_days: float = 3) -> tuple[int, int]:
+        """Add papers submitted or updated since the last harvest to the output file.
+        
+        The high-water mark is the latest update time in the output file.
+        Papers updated from overlap_days before it until end_date are fetched,
+        because arXiv lists papers some time after their submission. Papers
+        already in the file are replaced by their fetched row, the others are
+        appended. The file is rewritten atomically, so an interrupted update
+        leaves it unchanged.
+        
+        Args:
+            end_date: End of the update range (exclusive), usually now
+            overlap_days: Days before the high-water mark that are fetched again
+        
+        Returns:
+            Tuple of (papers added, papers whose row changed)
+        """
+        high_water_mark = self._scan_output()
+        if high_water_mark is None:
+            raise ValueError(f"{self.output_file} has no papers to update, run a full harvest first")
+        start_date = (high_water_mark - timedelta(days=overlap_days)).replace(second=0, microsecond=0)
+        end_date = end_date.replace(second=0, microsecond=0)
+        logger.info(f"Fetching papers updated since {start_date:%Y-%m-%d %H:%M} (high-water mark {high_water_mark:%Y-%m-%d %H:%M})")
+        
+        # Rows fetched in this update, keyed by ID without version
+        fetched = {}
+        
+        def on_window(category: str, start: datetime, end: datetime, rows: list[dict]) -> None:
+            """Collect the rows of a finished window, keeping the latest version of each paper."""
+            for row in rows:
+                base_id = MetadataStore.split_version(row["arxiv_id"])[0]
+                if base_id not in fetched or row["updated_date"] > fetched[base_id]["updated_date"]:
+                    fetched[base_id] = row
+        
+        failed = self._run_windows(
+            {category: [(start_date, end_date)] for category in self.categories},
+            {category: [0, 0.0] for category in self.categories},
+            (end_date - start_date) / timedelta(days=1),
+            "lastUpdatedDate",
+            on_window
+        )
+        if failed:
+            raise RuntimeError(f"{len(failed)} date windows failed, {self.output_file} was not changed")
+        
+        changed = 0
+        
+        def upserted_rows() -> Iterator[dict]:
+            """Yield the rows of the output file with fetched rows replacing or added to them."""
+            nonlocal changed
+            for row in self._read_rows():
+                base_id = MetadataStore.split_version(row["arxiv_id"])[0]
+                if (new_row := fetched.pop(base_id, None)) is not None:
+                    if any(str(new_row[field]) != str(row.get(field) or "") for field in self.FIELDS):
+                        changed += 1
+                    row = new_row
+                yield row
+            # Papers not in the file yet
+            yield from fetched.values()
+        
+        tmp_path = self.output_file.with_name(self.output_file.name + ".tmp")
+        with open(tmp_path, "w", newline="", encoding="utf-8") as f:
+            self._write_rows(f, upserted_rows(), header=True)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.output_file)
+        
+        added = len(fetched)
+        self._index.update((base_id, row["arxiv_id"]) for base_id, row in fetched.items())
+        return added, changed
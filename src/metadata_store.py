@@ -0,0 +1,182 @@
+import json
+from pathlib import Path
+import re
+import sqlite3
+import threading
+import time
+from typing import Optional
+import arxiv
+
+class MetadataStore:
+    FIELDS = ("arxiv_id", "version", "title", "authors", "abstract", "published", "updated", "categories", "pdf_url")
+    
+    def __init__(self, cache_dir: str = ".cache", ttl_days: float = 30):
+        """Initialize the local arXiv metadata store.
+        
+        Metadata is kept in a single SQLite file inside cache_dir, keyed by the
+        arXiv ID without version. The downloader, gather_summaries.py and
+        collect_recent_papers.py all read from and write to it, so a paper's
+        metadata is fetched from arXiv once and then refreshed only after ttl_days.
+        
+        Args:
+            cache_dir: Directory of the metadata database
+            ttl_days: Age in days after which a record is fetched again
+        """
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(exist_ok=True)
+        self.db_path = self.cache_dir / "metadata.sqlite"
+        self.ttl_seconds = ttl_days * 86400
+        
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS papers (
+                arxiv_id TEXT PRIMARY KEY,
+                version INTEGER,
+                title TEXT,
+                authors TEXT,
+                abstract TEXT,
+                published TEXT,
+                updated TEXT,
+                categories TEXT,
+                pdf_url TEXT,
+                fetched_at REAL NOT NULL
+            ) WITHOUT ROWID
+        """)
+        self._conn.commit()
+    
+    @staticmethod
+    def split_version(arxiv_id: str) -> tuple[str, Optional[int]]:
+        """Split an arXiv ID into the ID without version and the version number.
+        
+        Args:
+            arxiv_id: arXiv ID, optionally ending in a version such as "v2"
+        
+        Returns:
+            Tuple of the ID without version and the version, None if absent
+        """
+        if match := re.fullmatch(r"(.+?)v(\d+)", arxiv_id):
+            return match.group(1), int(match.group(2))
+        return arxiv_id, None
+    
+    @classmethod
+    def record_from_result(cls, result: arxiv.Result) -> dict:
+        """Convert an arXiv API result into a metadata record.
+        
+        Args:
+            result: Result returned by arxiv.Client
+        
+        Returns:
+            Metadata record with the keys in FIELDS
+        """
+        arxiv_id, version = cls.split_version(result.get_short_id())
+        return {
+            "arxiv_id": arxiv_id,
+            "version": version,
+            "title": result.title,
+            "authors": [author.name for author in result.authors],
+            "abstract": result.summary,
+            "published": result.published.isoformat() if result.published else None,
+            "updated": result.updated.isoformat() if result.updated else None,
+            "categories": list(result.categories),
+            "pdf_url": result.pdf_url
+        }
+    
+    def _row_to_record(self, row: tuple) -> dict:
+        """Convert a database row into a metadata record."""
+        record = dict(zip(self.FIELDS, row))
+        record["authors"] = json.loads(record["authors"] or "[]")
+        record["categories"] = json.loads(record["categories"] or "[]")
+        return record
+    
+    def get_many(self, arxiv_ids: list[str], include_stale: bool = False) -> dict[str, dict]:
+        """Get the stored metadata of many papers.
+        
+        Args:
+            arxiv_ids: arXiv IDs. A version suffix is ignored.
+            include_stale: If True, also return records older than the TTL
+        
+        Returns:
+            Mapping from each requested ID to its record, for the IDs that were found
+        """
+        by_base_id = {}
+        for arxiv_id in arxiv_ids:
+            by_base_id.setdefault(self.split_version(arxiv_id)[0], []).append(arxiv_id)
+        min_fetched_at = 0 if include_stale else time.time() - self.ttl_seconds
+        base_ids = list(by_base_id)
+        records = {}
+        with self._lock:
+            # Stay below SQLite's limit on query parameters
+            for start in range(0, len(base_ids), 500):
+                chunk = base_ids[start:start + 500]
+                rows = self._conn.execute(
+                    f"SELECT {', '.join(self.FIELDS)} FROM papers "
+                    f"WHERE arxiv_id IN ({', '.join('?' * len(chunk))}) AND fetched_at >= ?",
+                    (*chunk, min_fetched_at)
+                ).fetchall()
+                for row in rows:
+                    for arxiv_id in by_base_id[row[0]]:
+                        records[arxiv_id] = self._row_to_record(row)
+        return records
+    
+    def get(self, arxiv_id: str, include_stale: bool = False) -> Optional[dict]:
+        """Get the stored metadata of a paper.
+        
+        Args:
+            arxiv_id: arXiv ID. A version suffix is ignored.
+            include_stale: If True, also return a record older than the TTL
+        
+        Returns:
+            Metadata record, or None if not stored or expired
+        """
+        return self.get_many([arxiv_id], include_stale).get(arxiv_id)
+    
+    def missing(self, arxiv_ids: list[str]) -> list[str]:
+        """Get the IDs that have no fresh record and need to be fetched.
+        
+        Args:
+            arxiv_ids: arXiv IDs
+        
+        Returns:
+            IDs without a record younger than the TTL, without duplicates
+        """
+        fresh = self.get_many(arxiv_ids)
+        return [arxiv_id for arxiv_id in dict.fromkeys(arxiv_ids) if arxiv_id not in fresh]
+    
+    def put_many(self, records: list[dict]) -> None:
+        """Store metadata records, replacing older records of the same papers.
+        
+        Args:
+            records: Metadata records as returned by record_from_result
+        """
+        fetched_at = time.time()
+        rows = [
+            (
+                record["arxiv_id"], record.get("version"), record.get("title"),
+                json.dumps(record.get("authors") or []), record.get("abstract"),
+                record.get("published"), record.get("updated"),
+                json.dumps(record.get("categories") or []), record.get("pdf_url"),
+                fetched_at
+            )
+            for record in records
+        ]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                f"INSERT OR REPLACE INTO papers ({', '.join(self.FIELDS)}, fetched_at) "
+                f"VALUES ({', '.join('?' * (len(self.FIELDS) + 1))})",
+                rows
+            )
+    
+    def put_results(self, results: list[arxiv.Result]) -> list[dict]:
+        """Store arXiv API results.
+        
+        Args:
+            results: Results returned by arxiv.Client
+        
+        Returns:
+            The stored metadata records
+        """
+        records = [self.record_from_result(result) for result in results]
+        self.put_many(records)
+        return records
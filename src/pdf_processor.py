@@ -1,48 +1,193 @@
+from concurrent.futures import Future, ProcessPoolExecutor
+import multiprocessing
 from pathlib import Path
+import pypdf
 from pypdf import PdfReader
 import logging
+import threading
 from typing import Optional
+from .text_cache import ExtractedTextCache
+
+# Part of the extracted-text cache key; bump when extraction output changes
+EXTRACTOR_VERSION = f"pypdf-{pypdf.__version__}/1"
+
+def _extract_pages(pdf_path: str, start: int, stop: Optional[int]) -> list[Optional[str]]:
+    """Extract the text of a range of pages.
+    
+    Module-level so it can run in a worker process.
+    
+    Args:
+        pdf_path: Path to the PDF file
+        start: Index of the first page
+        stop: Index after the last page, None for the end of the document
+    
+    Returns:
+        Text of each page, None for pages that failed or had no text
+    """
+    reader = PdfReader(pdf_path)
+    page_texts = []
+    for page in reader.pages[start:stop]:
+        try:
+            page_texts.append(page.extract_text() or None)
+        except (TypeError, AttributeError, KeyError) as e:
+            page_texts.append(None)
+    return page_texts
 
 class PDFProcessor:
+    def __init__(self, workers: int = 1, pages_per_task: int = 16, text_cache: ExtractedTextCache = None):
+        """Initialize the PDF processor.
+        
+        Args:
+            workers: Number of worker processes. With 1, pages are parsed in
+                the calling process.
+            pages_per_task: Pages per worker task. Longer PDFs are split into
+                page ranges that are parsed in parallel.
+            text_cache: Persistent cache of extracted text. If None, every PDF is parsed.
+        """
+        self.workers = workers
+        self.pages_per_task = pages_per_task
+        self.text_cache = text_cache
+        self._pool = None
+        self._pool_lock = threading.Lock()
+    
+    def _get_pool(self) -> Optional[ProcessPoolExecutor]:
+        """Get the worker process pool, creating it on first use."""
+        if self.workers <= 1:
+            return None
+        with self._pool_lock:
+            if self._pool is None:
+                # spawn avoids forking the pipeline's threads into the workers
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+        return self._pool
+    
+    def close(self) -> None:
+        """Shut down the worker processes."""
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown()
+                self._pool = None
+    
+    def _submit(self, pool: ProcessPoolExecutor, pdf_path: Path) -> list[Future]:
+        """Submit the page ranges of a PDF to the worker pool.
+        
+        Args:
+            pool: Worker process pool
+            pdf_path: Path to the PDF file
+        
+        Returns:
+            One future per page range, in page order
+        """
+        total_pages = len(PdfReader(str(pdf_path)).pages)
+        return [
+            pool.submit(_extract_pages, str(pdf_path), start, min(start + self.pages_per_task, total_pages))
+            for start in range(0, total_pages, self.pages_per_task)
+        ]
+    
+    def _assemble(self, pdf_path: Path, page_texts: list[Optional[str]]) -> str:
+        """Join the text of all pages and report pages that failed.
+        
+        Args:
+            pdf_path: Path to the PDF file
+            page_texts: Text of each page, None for failed pages
+        
+        Returns:
+            Extracted text content. Returns error message if no page had text.
+        """
+        total_pages = len(page_texts)
+        failed_pages = sum(1 for page_text in page_texts if page_text is None)
+        
+        if failed_pages > 0:
+            print(f"\nWarning: Failed to extract text from {failed_pages}/{total_pages} pages in {pdf_path.name}")
+        
+        text = "\n".join(page_text for page_text in page_texts if page_text is not None).strip()
+        if not text:
+            print(f"\nWarning: No text could be extracted from {pdf_path.name}")
+            return f"[Error: Could not extract text from PDF file {pdf_path.name}]"
+        
+        if failed_pages == total_pages:
+            return f"[Error: Failed to extract text from any page in {pdf_path.name}]"
+        
+        return text
+    
+    def _error_text(self, pdf_path: Path, error: Exception) -> str:
+        """Report a PDF that could not be processed at all."""
+        print(f"\nError processing PDF {pdf_path.name}: {str(error)}")
+        return f"[Error: Failed to process PDF file {pdf_path.name}: {str(error)}]"
+    
+    def _cached_text(self, pdf_path: Path) -> Optional[str]:
+        """Get the previously extracted text of a PDF, if cached."""
+        if self.text_cache is None:
+            return None
+        return self.text_cache.get(pdf_path, EXTRACTOR_VERSION)
+    
+    def _cache_text(self, pdf_path: Path, text: str) -> str:
+        """Cache successfully extracted text and return it."""
+        if self.text_cache is not None and not text.startswith("[Error:"):
+            self.text_cache.save(pdf_path, EXTRACTOR_VERSION, text)
+        return text
+    
     def extract_text(self, pdf_path: Path) -> str:
         """Extract text content from a PDF file.
         
         Args:
             pdf_path: Path to the PDF file
-            
+        
         Returns:
             Extracted text content. Returns error message if extraction fails.
         """
+        pdf_path = Path(pdf_path)
         try:
-            reader = PdfReader(str(pdf_path))
-            text = ""
-            failed_pages = 0
-            total_pages = len(reader.pages)
-            
-            for page_num, page in enumerate(reader.pages, 1):
-                try:
-                    page_text = page.extract_text()
-                    if page_text:
-                        text += page_text + "\n"
-                    else:
-                        failed_pages += 1
-                except (TypeError, AttributeError, KeyError) as e:
-                    failed_pages += 1
-                    continue
-            
-            if failed_pages > 0:
-                print(f"\nWarning: Failed to extract text from {failed_pages}/{total_pages} pages in {pdf_path.name}")
-                
-            text = text.strip()
-            if not text:
-                print(f"\nWarning: No text could be extracted from {pdf_path.name}")
-                return f"[Error: Could not extract text from PDF file {pdf_path.name}]"
-                
-            if failed_pages == total_pages:
-                return f"[Error: Failed to extract text from any page in {pdf_path.name}]"
-                
-            return text
+            if (text := self._cached_text(pdf_path)) is not None:
+                return text
             
+            if (pool := self._get_pool()) is None:
+                page_texts = _extract_pages(str(pdf_path), 0, None)
+            else:
+                page_texts = [text for future in self._submit(pool, pdf_path) for text in future.result()]
+            return self._cache_text(pdf_path, self._assemble(pdf_path, page_texts))
+        
         except Exception as e:
-            print(f"\nError processing PDF {pdf_path.name}: {str(e)}")
-            return f"[Error: Failed to process PDF file {pdf_path.name}: {str(e)}]" 
\ No newline at end of file
+            return self._error_text(pdf_path, e)
+    
+    def extract_texts(self, pdf_paths: list[Path]) -> list[str]:
+        """Extract text content from many PDF files in parallel.
+        
+        Page ranges of all files are queued on the worker pool at once, so
+        work is spread both across papers and across the pages of long papers.
+        
+        Args:
+            pdf_paths: Paths to the PDF files
+        
+        Returns:
+            Extracted text of each file, in the same order as pdf_paths
+        """
+        pdf_paths = [Path(pdf_path) for pdf_path in pdf_paths]
+        if (pool := self._get_pool()) is None:
+            return [self.extract_text(pdf_path) for pdf_path in pdf_paths]
+        
+        submitted = []
+        for pdf_path in pdf_paths:
+            try:
+                if (text := self._cached_text(pdf_path)) is not None:
+                    submitted.append(text)
+                else:
+                    submitted.append(self._submit(pool, pdf_path))
+            except Exception as e:
+                submitted.append(e)
+        
+        texts = []
+        for pdf_path, futures in zip(pdf_paths, submitted):
+            try:
+                if isinstance(futures, Exception):
+                    raise futures
+                if isinstance(futures, str):
+                    texts.append(futures)
+                    continue
+                page_texts = [text for future in futures for text in future.result()]
+                texts.append(self._cache_text(pdf_path, self._assemble(pdf_path, page_texts)))
+            except Exception as e:
+                texts.append(self._error_text(pdf_path, e))
+        return texts
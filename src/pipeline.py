@@ -0,0 +1,185 @@
+import asyncio
+import queue
+import threading
+from typing import Callable
+
+_STOP = object()
+
+class PaperPipeline:
+    def __init__(self, downloader, pdf_processor, analyzer,
+                 download_workers: int = 4, extract_workers: int = 2, analyze_workers: int = 2,
+                 async_analysis: bool = False):
+        """Initialize the concurrent paper pipeline.
+        
+        Each stage (download, extract, analyze) runs in its own bounded pool of
+        worker threads. Stages are connected by bounded queues so a slow stage
+        applies backpressure to the ones before it.
+        
+        Args:
+            downloader: ArxivDownloader used for the download stage
+            pdf_processor: PDFProcessor used for the extraction stage
+            analyzer: ClaudeAnalyzer used for the analysis stage. If None, the
+                pipeline stops after extraction.
+            download_workers: Number of concurrent downloads
+            extract_workers: Number of concurrent text extractions
+            analyze_workers: Number of concurrent Claude analyses
+            async_analysis: If True, analyses run on one event loop through
+                the analyzer's async client and shared rate limiter, instead
+                of the blocking client with its fixed request spacing
+        """
+        self.downloader = downloader
+        self.pdf_processor = pdf_processor
+        self.analyzer = analyzer
+        self.download_workers = max(1, download_workers)
+        self.extract_workers = max(1, extract_workers)
+        self.analyze_workers = max(1, analyze_workers)
+        self.async_analysis = async_analysis
+    
+    def run(self, arxiv_links: list[str], project_context: str,
+            on_result: Callable[[int, object], None] = None) -> list:
+        """Download, extract and analyze papers concurrently.
+        
+        Args:
+            arxiv_links: List of arXiv paper URLs to analyze
+            project_context: Content from the project's document
+            on_result: If given, called from the worker threads with the index
+                and result of each paper as soon as it is done, instead of
+                keeping the result
+        
+        Returns:
+            Analysis results in the same order as arxiv_links, or
+            (paper_id, paper_text, pdf_path) tuples if the pipeline has no
+            analyzer. Entries are None if on_result is given.
+        """
+        results = [None] * len(arxiv_links)
+        errors = []
+        failed = threading.Event()
+        
+        loop = None
+        if self.analyzer is not None and self.async_analysis:
+            # Analyze workers hand their requests to this loop and wait for them
+            loop = asyncio.new_event_loop()
+            loop_thread = threading.Thread(target=loop.run_forever, daemon=True)
+            loop_thread.start()
+        
+        def download(item):
+            paper_id, link = item
+            return paper_id, self.downloader.download(link)
+        
+        def extract(item):
+            paper_id, pdf_path = item
+            return paper_id, self.pdf_processor.extract_text(pdf_path), pdf_path
+        
+        def analyze(item):
+            paper_id, paper_text, pdf_path = item
+            if loop is not None:
+                return asyncio.run_coroutine_threadsafe(
+                    self.analyzer.analyze_paper_async(paper_text, project_context, paper_id, pdf_path), loop
+                ).result()
+            return self.analyzer.analyze_paper(
+                paper_text=paper_text,
+                project_context=project_context,
+                paper_id=paper_id,
+                pdf_path=pdf_path
+            )
+        
+        download_queue = queue.Queue(maxsize=2 * self.download_workers)
+        extract_queue = queue.Queue(maxsize=2 * self.extract_workers)
+        analyze_queue = queue.Queue(maxsize=2 * self.analyze_workers)
+        
+        def store(index, result):
+            if on_result is not None:
+                on_result(index, result)
+            else:
+                results[index] = result
+        
+        stages = [
+            (download, download_queue, self.download_workers),
+            (extract, extract_queue, self.extract_workers),
+        ]
+        if self.analyzer is not None:
+            stages.append((analyze, analyze_queue, self.analyze_workers))
+        
+        threads = []
+        for position, (func, inbox, workers) in enumerate(stages):
+            if position + 1 < len(stages):
+                emit = stages[position + 1][1].put
+                downstream_workers = stages[position + 1][2]
+            else:
+                emit, downstream_workers = None, 0
+            threads.extend(self._start_stage(
+                func, inbox, workers, emit, downstream_workers, store, errors, failed
+            ))
+        
+        for index, link in enumerate(arxiv_links):
+            if failed.is_set():
+                break
+            paper_id = self.downloader._extract_arxiv_id(link)
+            download_queue.put((index, (paper_id, link)))
+        for _ in range(self.download_workers):
+            download_queue.put(_STOP)
+        
+        for thread in threads:
+            thread.join()
+        if loop is not None:
+            loop.call_soon_threadsafe(loop.stop)
+            loop_thread.join()
+            loop.close()
+        
+        if errors:
+            raise errors[0]
+        return results
+    
+    def _start_stage(self, func: Callable, inbox: queue.Queue, workers: int,
+                     emit: Callable | None, downstream_workers: int,
+                     store: Callable, errors: list, failed: threading.Event) -> list[threading.Thread]:
+        """Start the worker threads for one pipeline stage.
+        
+        Args:
+            func: Function applied to each item's payload
+            inbox: Queue the stage reads (index, payload) items from
+            workers: Number of worker threads
+            emit: Puts results on the next stage's queue, or None for the last stage
+            downstream_workers: Number of workers in the next stage to stop when done
+            store: Callback storing (index, result) for the last stage
+            errors: Shared list collecting raised exceptions
+            failed: Event set once any stage fails, so remaining items are skipped
+        
+        Returns:
+            The started threads
+        """
+        remaining = [workers]
+        lock = threading.Lock()
+        
+        def worker():
+            while True:
+                item = inbox.get()
+                if item is _STOP:
+                    break
+                # Keep draining after a failure so upstream puts never block
+                if failed.is_set():
+                    continue
+                index, payload = item
+                try:
+                    result = func(payload)
+                    if emit is None:
+                        # Inside the try, so a failing on_result callback also stops the run
+                        store(index, result)
+                except Exception as e:
+                    errors.append(e)
+                    failed.set()
+                    continue
+                if emit is not None:
+                    emit((index, result))
+            
+            with lock:
+                remaining[0] -= 1
+                last = remaining[0] == 0
+            if last and emit is not None:
+                for _ in range(downstream_workers):
+                    emit(_STOP)
+        
+        threads = [threading.Thread(target=worker, daemon=True) for _ in range(workers)]
+        for thread in threads:
+            thread.start()
+        return threads
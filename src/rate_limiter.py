@@ -0,0 +1,156 @@
+import asyncio
+import threading
+import time
+from typing import Optional
+
+class TokenBucket:
+    def __init__(self, per_minute: float):
+        """Initialize a bucket that refills continuously up to its per-minute limit.
+        
+        Args:
+            per_minute: Bucket capacity, refilled evenly over one minute
+        """
+        self.capacity = float(per_minute)
+        self.tokens = self.capacity
+        self.refill_rate = self.capacity / 60.0
+        self.updated = time.monotonic()
+    
+    def _refill(self, now: float) -> None:
+        """Add the tokens accrued since the last update."""
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.refill_rate)
+        self.updated = now
+    
+    def wait_time(self, amount: float, now: float) -> float:
+        """Get the seconds until `amount` tokens are available.
+        
+        Args:
+            amount: Tokens needed. Requests larger than the capacity wait for a full bucket.
+            now: Current monotonic time
+        
+        Returns:
+            Seconds to wait, 0 if the tokens are available now
+        """
+        self._refill(now)
+        deficit = min(amount, self.capacity) - self.tokens
+        return max(0.0, deficit / self.refill_rate)
+    
+    def consume(self, amount: float) -> None:
+        """Take tokens from the bucket. The balance may go negative."""
+        self.tokens -= amount
+    
+    def refund(self, amount: float) -> None:
+        """Return tokens that were reserved but not used."""
+        self.tokens = min(self.capacity, self.tokens + amount)
+
+class RateLimiter:
+    def __init__(self, requests_per_minute: Optional[int] = None,
+                 input_tokens_per_minute: Optional[int] = None,
+                 output_tokens_per_minute: Optional[int] = None):
+        """Initialize a shared limiter for requests, input tokens and output tokens.
+        
+        Any limit left as None is not enforced.
+        
+        Args:
+            requests_per_minute: Maximum requests per minute
+            input_tokens_per_minute: Maximum input tokens per minute
+            output_tokens_per_minute: Maximum output tokens per minute
+        """
+        self.requests = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self.input_tokens = TokenBucket(input_tokens_per_minute) if input_tokens_per_minute else None
+        self.output_tokens = TokenBucket(output_tokens_per_minute) if output_tokens_per_minute else None
+        self.paused_until = 0.0
+        self.poll_interval = 0.25  # seconds
+        self._lock = None
+        self._loop = None
+    
+    def _get_lock(self) -> asyncio.Lock:
+        """Get a lock bound to the running event loop."""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._lock = asyncio.Lock()
+            self._loop = loop
+        return self._lock
+    
+    def _demands(self, input_tokens: int, output_tokens: int) -> list[tuple[TokenBucket, float]]:
+        """Pair each enforced bucket with the amount a request needs from it."""
+        demands = [
+            (self.requests, 1),
+            (self.input_tokens, input_tokens),
+            (self.output_tokens, output_tokens),
+        ]
+        return [(bucket, amount) for bucket, amount in demands if bucket is not None]
+    
+    async def acquire(self, input_tokens: int, output_tokens: int) -> None:
+        """Wait until a request fits within every limit, then reserve its share.
+        
+        Waiters are served in arrival order.
+        
+        Args:
+            input_tokens: Estimated input tokens of the request
+            output_tokens: Output tokens to reserve (usually max_tokens)
+        """
+        async with self._get_lock():
+            while True:
+                now = time.monotonic()
+                demands = self._demands(input_tokens, output_tokens)
+                wait = max(
+                    [self.paused_until - now] + [bucket.wait_time(amount, now) for bucket, amount in demands]
+                )
+                if wait <= 0:
+                    for bucket, amount in demands:
+                        bucket.consume(amount)
+                    return
+                # Re-check periodically so refunds from finished requests are picked up
+                await asyncio.sleep(min(wait, self.poll_interval))
+    
+    def reconcile(self, reserved_input: int, reserved_output: int,
+                  actual_input: int, actual_output: int) -> None:
+        """Correct a reservation once the real usage is known.
+        
+        Args:
+            reserved_input: Input tokens reserved by acquire()
+            reserved_output: Output tokens reserved by acquire()
+            actual_input: Input tokens reported by the API
+            actual_output: Output tokens reported by the API
+        """
+        for bucket, reserved, actual in (
+            (self.input_tokens, reserved_input, actual_input),
+            (self.output_tokens, reserved_output, actual_output),
+        ):
+            if bucket is None:
+                continue
+            if actual < reserved:
+                bucket.refund(reserved - actual)
+            else:
+                bucket.consume(actual - reserved)
+    
+    def pause(self, seconds: float) -> None:
+        """Hold back all requests for the given number of seconds.
+        
+        Args:
+            seconds: Delay requested by the server, e.g. from a retry-after header
+        """
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+class RequestPacer:
+    def __init__(self, requests_per_minute: float):
+        """Initialize a blocking limiter that spaces requests evenly across threads.
+        
+        Unlike a token bucket it allows no bursts, which is what APIs asking for
+        a fixed delay between requests (such as arXiv) expect.
+        
+        Args:
+            requests_per_minute: Maximum requests per minute
+        """
+        self.interval = 60.0 / requests_per_minute
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+    
+    def acquire(self) -> None:
+        """Block until the calling thread may send its next request."""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
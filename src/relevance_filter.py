@@ -0,0 +1,112 @@
+import re
+from typing import Optional
+import numpy as np
+
+# Frequent English words that carry no topical signal
+STOPWORDS = frozenset("""
+a about above after again against all also am an and any are as at be because been before being below between
+both but by can could did do does doing down during each few for from further had has have having he her here
+hers him his how i if in into is it its itself just me more most my no nor not now of off on once only or other
+our ours out over own same she should so some such than that the their theirs them then there these they this
+those through to too under until up very was we were what when where which while who whom why will with would
+you your yours paper propose proposed show using use used based approach method methods results new
+""".split())
+
+class RelevanceFilter:
+    def __init__(self, k1: float = 1.5, b: float = 0.75, k3: float = 8.0):
+        """Initialize a BM25 scorer that ranks abstracts against the project context.
+        
+        Scoring runs locally and needs no API calls. Only terms of the project
+        context are counted in the abstracts, and the per-term sums are done
+        with NumPy over all abstracts at once.
+        
+        Args:
+            k1: Saturation of term frequency in an abstract
+            b: Strength of the abstract length normalization
+            k3: Saturation of term frequency in the project context, which
+                is much longer than a usual query
+        """
+        self.k1 = k1
+        self.b = b
+        self.k3 = k3
+        self._token_pattern = re.compile(r"[a-z][a-z0-9]+")
+    
+    def tokenize(self, text: str) -> list[str]:
+        """Split text into lowercase terms without stopwords.
+        
+        Args:
+            text: Text to split
+        
+        Returns:
+            List of terms
+        """
+        return [token for token in self._token_pattern.findall(text.lower()) if token not in STOPWORDS]
+    
+    def score(self, query: str, documents: list[str]) -> np.ndarray:
+        """Score documents against a query with BM25.
+        
+        Args:
+            query: Query text, e.g. the project context
+            documents: Texts to score, e.g. title and abstract of each paper
+        
+        Returns:
+            Score of each document, in the same order as documents
+        """
+        query_terms, query_counts = np.unique(self.tokenize(query), return_counts=True)
+        vocabulary = {term: index for index, term in enumerate(query_terms)}
+        n_docs = len(documents)
+        if not n_docs or not vocabulary:
+            return np.zeros(n_docs)
+        
+        # Query term IDs of each document; stopwords are never in the vocabulary
+        find_tokens = self._token_pattern.findall
+        lookup = vocabulary.get
+        doc_lengths = np.empty(n_docs)
+        matches_per_doc = np.empty(n_docs, dtype=np.int64)
+        term_ids = []
+        for doc_id, document in enumerate(documents):
+            tokens = find_tokens(document.lower())
+            doc_lengths[doc_id] = len(tokens)
+            matches = [term_id for term_id in map(lookup, tokens) if term_id is not None]
+            matches_per_doc[doc_id] = len(matches)
+            term_ids += matches
+        if not term_ids:
+            return np.zeros(n_docs)
+        doc_ids = np.repeat(np.arange(n_docs, dtype=np.int64), matches_per_doc)
+        
+        # Term frequency of each distinct (document, term) pair
+        pair_keys = doc_ids * len(vocabulary) + np.asarray(term_ids, dtype=np.int64)
+        pair_keys, term_freqs = np.unique(pair_keys, return_counts=True)
+        pair_docs, pair_terms = np.divmod(pair_keys, len(vocabulary))
+        
+        doc_freqs = np.bincount(pair_terms, minlength=len(vocabulary))
+        idf = np.log1p((n_docs - doc_freqs + 0.5) / (doc_freqs + 0.5))
+        query_weights = query_counts * (self.k3 + 1) / (query_counts + self.k3)
+        
+        avg_length = max(doc_lengths.mean(), 1.0)
+        length_norm = self.k1 * (1 - self.b + self.b * doc_lengths[pair_docs] / avg_length)
+        contributions = (
+            idf[pair_terms] * query_weights[pair_terms]
+            * term_freqs * (self.k1 + 1) / (term_freqs + length_norm)
+        )
+        return np.bincount(pair_docs, weights=contributions, minlength=n_docs)
+    
+    def select(self, scores: np.ndarray, top_k: Optional[int] = None,
+               min_score: Optional[float] = None) -> np.ndarray:
+        """Pick the best-scoring documents.
+        
+        Args:
+            scores: Scores returned by score()
+            top_k: Keep at most this many documents
+            min_score: Keep only documents scoring at least this fraction (0-1)
+                of the best score
+        
+        Returns:
+            Indices of the kept documents, best first
+        """
+        order = np.argsort(-scores, kind="stable")
+        if min_score is not None and len(scores) and scores.max() > 0:
+            order = order[scores[order] >= min_score * scores.max()]
+        if top_k is not None:
+            order = order[:top_k]
+        return order
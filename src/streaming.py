@@ -0,0 +1,115 @@
+import os
+from pathlib import Path
+import time
+
+class StreamRecorder:
+    def __init__(self, output_path: str | Path = None):
+        """Collect a streamed response, writing it to disk as it arrives.
+        
+        Text goes to "<name>.partial.md" next to output_path while the
+        response streams, and the file is moved to output_path once the
+        stream completes. The partial file is removed if the request fails,
+        so one left behind belongs to a request that was still in flight
+        when the run stopped.
+        
+        Args:
+            output_path: Final path of the response text. If None, the text
+                is only collected in memory.
+        """
+        self.output_path = Path(output_path) if output_path is not None else None
+        self.partial_path = None
+        self._file = None
+        self._chunks = []
+        self.started = time.perf_counter()
+        self.first_token = None
+        self.finished = None
+    
+    def __enter__(self) -> "StreamRecorder":
+        if self.output_path is not None:
+            self.output_path.parent.mkdir(parents=True, exist_ok=True)
+            self.partial_path = self.output_path.with_name(f"{self.output_path.stem}.partial.md")
+            # Line buffered, so the partial file shows progress
+            self._file = open(self.partial_path, "w", buffering=1)
+        return self
+    
+    def __exit__(self, exc_type, exc, traceback) -> None:
+        if self._file is not None and not self._file.closed:
+            self._file.close()
+            if exc_type is not None:
+                self.partial_path.unlink(missing_ok=True)
+    
+    def write(self, text: str) -> None:
+        """Add a chunk of streamed text.
+        
+        Args:
+            text: Text delta of the stream
+        """
+        if self.first_token is None:
+            self.first_token = time.perf_counter()
+        self._chunks.append(text)
+        if self._file is not None:
+            self._file.write(text)
+    
+    def finish(self, message) -> str:
+        """Mark the stream complete and move the partial file to its final path.
+        
+        Args:
+            message: Final message of the stream
+        
+        Returns:
+            Full response text
+        """
+        if message.stop_reason is None:
+            # The connection dropped before message_stop, so the text is cut short
+            raise RuntimeError("Response stream ended before the message was complete")
+        self.finished = time.perf_counter()
+        if self._file is not None:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._file.close()
+            os.replace(self.partial_path, self.output_path)
+        return "".join(self._chunks)
+    
+    @property
+    def time_to_first_token(self) -> float:
+        """Get the seconds from the request to the first text delta."""
+        return (self.first_token or self.finished or time.perf_counter()) - self.started
+    
+    @property
+    def generation_seconds(self) -> float:
+        """Get the seconds from the first text delta to the end of the stream."""
+        if self.first_token is None:
+            return 0.0
+        return (self.finished or time.perf_counter()) - self.first_token
+    
+    def add_to(self, totals: dict, output_tokens: int) -> None:
+        """Add the timings of this stream to run totals.
+        
+        Args:
+            totals: Totals with streamed_requests, time_to_first_token,
+                generation_seconds and streamed_output_tokens
+            output_tokens: Output tokens of the response
+        """
+        totals["streamed_requests"] += 1
+        totals["time_to_first_token"] += self.time_to_first_token
+        totals["generation_seconds"] += self.generation_seconds
+        totals["streamed_output_tokens"] += output_tokens
+    
+    @staticmethod
+    def report(totals: dict) -> str:
+        """Summarize the latency of the streamed responses in run totals.
+        
+        Args:
+            totals: Totals filled by add_to()
+        
+        Returns:
+            Human-readable report of time to first token and output speed
+        """
+        streamed = totals["streamed_requests"]
+        if not streamed:
+            return "No responses were streamed."
+        tokens_per_second = totals["streamed_output_tokens"] / max(totals["generation_seconds"], 1e-9)
+        return (
+            f"Streamed responses: {streamed}, {totals['time_to_first_token'] / streamed:.2f}s mean time to first token, "
+            f"{tokens_per_second:.1f} output tokens/s"
+        )
@@ -1,123 +1,528 @@
 from pathlib import Path
 import json
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
 from datetime import datetime
-from typing import Optional
+from typing import Iterable, Iterator, Optional
 from anthropic import Anthropic, RateLimitError
 import os
 from dotenv import load_dotenv
+from .cache import PromptCache
 from .config import Config
+from .fingerprint import Fingerprinter
+from .streaming import StreamRecorder
+from .topic_clusters import TopicClusterer
+
+# Cache entries of meta-summary tree nodes are stored under this paper ID
+META_SUMMARY_CACHE_ID = "meta-summary"
+
+# Index of the latest summary of each paper, inside the output directory
+MANIFEST_NAME = "manifest.json"
+
+FINAL_INSTRUCTIONS = """Please provide a comprehensive meta-summary that:
+1. Identifies common themes and patterns
+2. Highlights key differences and contradictions
+3. Suggests potential research directions based on gaps in the literature
+4. Provides a structured overview of the current state of research in this area"""
 
 class SummaryGenerator:
-    def __init__(self, output_dir: str = "summaries", config: Config = None):
+    def __init__(self, output_dir: str = "summaries", config: Config = None, cache: PromptCache = None):
         """Initialize the summary generator.
         
         Args:
             output_dir: Directory to save generated summaries
             config: Configuration object. If None, uses default config
+            cache: Cache for the partial summaries of the hierarchical meta-summary.
+                If None, opens the default prompt cache.
         """
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(exist_ok=True)
+        self.manifest = self.load_manifest(self.output_dir)
+        self._manifest_lock = threading.Lock()
         
         # Initialize Claude client for meta-summary
         load_dotenv()
-        self.client = Anthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
         self.config = config or Config()
+        self.client = Anthropic(
+            api_key=os.getenv("ANTHROPIC_API_KEY"),
+            base_url=self.config.claude_base_url
+        )
+        self.cache = cache or PromptCache()
+        self.fingerprints = Fingerprinter()
         
         # Rate limiting settings
         self.last_request_time = 0
+        self._request_lock = threading.Lock()  # partial summaries are requested in parallel
+        
+        # Latency of the streamed responses of this run
+        self.stream_totals = {
+            "streamed_requests": 0,
+            "time_to_first_token": 0.0,
+            "generation_seconds": 0.0,
+            "streamed_output_tokens": 0
+        }
+        self._stream_lock = threading.Lock()
         self.min_request_interval = 2  # seconds between requests
         self.max_retries = 5
         self.base_retry_delay = 60  # seconds
-        
-    def _call_claude_api(self, prompt: str, retry_count: int = 0) -> Optional[str]:
+    
+    def _call_claude_api(self, prompt: str, retry_count: int = 0, stream_to: Path = None) -> Optional[str]:
         """Call Claude API with rate limiting and retries.
         
         Args:
             prompt: The prompt to send to Claude
             retry_count: Current retry attempt number
-            
+            stream_to: File the response is written to as it streams in, if
+                streaming is enabled
+        
         Returns:
             Analysis text if successful, None if all retries failed
         """
         # Ensure minimum time between requests
-        time_since_last = time.time() - self.last_request_time
-        if time_since_last < self.min_request_interval:
-            time.sleep(self.min_request_interval - time_since_last)
-            
+        with self._request_lock:
+            time_since_last = time.time() - self.last_request_time
+            if time_since_last < self.min_request_interval:
+                time.sleep(self.min_request_interval - time_since_last)
+            self.last_request_time = time.time()
+        
+        params = {
+            "model": self.config.claude_model,
+            "max_tokens": self.config.claude_max_tokens,
+            "temperature": self.config.claude_temperature,
+            "messages": [{
+                "role": "user",
+                "content": prompt
+            }]
+        }
         try:
-            response = self.client.messages.create(
-                model=self.config.claude_model,
-                max_tokens=self.config.claude_max_tokens,
-                temperature=self.config.claude_temperature,
-                messages=[{
-                    "role": "user",
-                    "content": prompt
-                }]
-            )
+            if self.config.claude_stream:
+                with StreamRecorder(stream_to) as recorder, self.client.messages.stream(**params) as stream:
+                    for text in stream.text_stream:
+                        recorder.write(text)
+                    response = stream.get_final_message()
+                    summary = recorder.finish(response)
+                with self._stream_lock:
+                    recorder.add_to(self.stream_totals, response.usage.output_tokens)
+                return summary
+            response = self.client.messages.create(**params)
             self.last_request_time = time.time()
             return response.content[0].text if isinstance(response.content, list) else response.content
-            
+        
         except RateLimitError as e:
             if retry_count >= self.max_retries:
                 print(f"\nError: Maximum retries ({self.max_retries}) exceeded.")
                 print("Consider reducing batch size or increasing delay between requests.")
                 return None
-                
+            
             retry_delay = self.base_retry_delay * (2 ** retry_count)  # Exponential backoff
             print(f"\nRate limit hit. Waiting {retry_delay} seconds before retry {retry_count + 1}/{self.max_retries}...")
             time.sleep(retry_delay)
-            return self._call_claude_api(prompt, retry_count + 1)
+            return self._call_claude_api(prompt, retry_count + 1, stream_to)
+    
+    def summary_path(self, paper_id: str) -> Path:
+        """Get the path of a paper's analysis in the output directory."""
+        return self.output_dir / f"{paper_id}.md"
+    
+    def _write_atomic(self, path: Path, text: str) -> None:
+        """Write a file through a temporary file, so readers never see it half written."""
+        tmp_path = path.with_name(f".{path.name}.{threading.get_ident()}.tmp")
+        with open(tmp_path, "w") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    
+    @staticmethod
+    def load_manifest(output_dir: str | Path) -> dict:
+        """Read the summary manifest of an output directory.
         
-    def generate_individual_summaries(self, analyses: list[dict]) -> None:
-        """Generate individual markdown files for each paper analysis.
+        Args:
+            output_dir: Directory the summaries were written to
+        
+        Returns:
+            {paper_id: entry} with the path, raw_path, timestamp, model,
+            prompt_fingerprint and structured flag of each paper's latest
+            summary, relative paths being relative to output_dir. The raw
+            data of structured summaries holds their fields. Empty if there
+            is no manifest.
+        """
+        manifest_path = Path(output_dir) / MANIFEST_NAME
+        if not manifest_path.exists():
+            return {}
+        with open(manifest_path) as f:
+            return json.load(f)["papers"]
+    
+    def write_summary(self, paper_id: str, analysis: dict, model: str = None, fingerprint: str = None) -> Path:
+        """Write one paper's analysis as soon as it is available.
+        
+        The analysis goes to "<paper_id>.md" and the raw result to
+        "<paper_id>_raw.json", replacing the files of earlier runs. Paper
+        text and project context stay references into the blob store. The
+        paper's manifest entry is updated afterwards, so the manifest only
+        points to complete files. Safe to call from several threads.
         
         Args:
-            analyses: List of paper analysis results
+            paper_id: arXiv paper ID
+            analysis: Paper analysis result
+            model: Model that wrote the analysis. If None, the configured model.
+            fingerprint: Fingerprint of the prompt and settings of the analysis
+        
+        Returns:
+            Path of the markdown file
         """
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        output_path = self.summary_path(paper_id)
+        raw_path = self.output_dir / f"{paper_id}_raw.json"
+        self._write_atomic(output_path, analysis["analysis"])
+        self._write_atomic(raw_path, json.dumps(analysis, indent=2))
         
-        for i, analysis in enumerate(analyses, 1):
-            output_path = self.output_dir / f"paper_{i}_{timestamp}.md"
-            
-            with open(output_path, "w") as f:
-                f.write(analysis["analysis"])
-                
-            # Save raw data for reference
-            raw_path = self.output_dir / f"paper_{i}_{timestamp}_raw.json"
-            with open(raw_path, "w") as f:
-                json.dump(analysis, f, indent=2)
-                
-    def generate_meta_summary(self, analyses: list[dict]) -> None:
+        with self._manifest_lock:
+            self.manifest[paper_id] = {
+                "path": output_path.name,
+                "raw_path": raw_path.name,
+                "timestamp": datetime.now().isoformat(timespec="seconds"),
+                "model": model or self.config.claude_model,
+                "prompt_fingerprint": fingerprint,
+                "structured": "fields" in analysis
+            }
+            self._write_atomic(
+                self.output_dir / MANIFEST_NAME,
+                json.dumps({"version": 1, "papers": self.manifest}, indent=1)
+            )
+        return output_path
+    
+    def generate_individual_summaries(self, paper_ids: list[str], analyses: Iterable[dict]) -> None:
+        """Write the analyses of many papers, see write_summary().
+        
+        Args:
+            paper_ids: arXiv paper IDs
+            analyses: Paper analysis results in the same order as paper_ids
+        """
+        for paper_id, analysis in zip(paper_ids, analyses):
+            self.write_summary(paper_id, analysis)
+    
+    def read_analyses(self, paper_ids: list[str]) -> Iterator[dict]:
+        """Read analyses written by write_summary() back from disk, one at a time.
+        
+        Args:
+            paper_ids: arXiv paper IDs
+        
+        Yields:
+            Dictionaries with the paper ID and its analysis text
+        """
+        for paper_id in paper_ids:
+            with open(self.summary_path(paper_id)) as f:
+                yield {"paper_id": paper_id, "analysis": f.read()}
+    
+    def generate_meta_summary(self, analyses: Iterable[dict]) -> None:
         """Generate a meta-summary of all paper analyses.
         
+        In "single" mode every analysis goes into one prompt. In
+        "hierarchical" mode, the default, analyses that don't fit in one
+        prompt are summarized in groups, and the partial summaries are
+        reduced level by level into the final one. See _summarize_hierarchically().
+        In "clusters" mode, analyses are grouped by topic and each topic is
+        summarized before a final synthesis. See _summarize_by_topic().
+        
         Args:
-            analyses: List of paper analysis results
+            analyses: Paper analysis results, e.g. from read_analyses()
         """
         print("\nGenerating meta-summary...")
         
-        # Prepare prompt for meta-summary
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        output_path = self.output_dir / f"meta_summary_{timestamp}.md"
+        
+        # The final request streams into output_path
         summaries = [analysis["analysis"] for analysis in analyses]
-        prompt = f"""I have analyzed {len(summaries)} papers for my literature review. Below are the individual analyses. Please provide a comprehensive meta-summary that:
+        if self.config.meta_summary_mode == "single":
+            meta_summary = self._call_claude_api(self._final_prompt(summaries), stream_to=output_path)
+            if meta_summary is None:
+                raise RuntimeError("Failed to generate meta-summary after maximum retries")
+        elif self.config.meta_summary_mode == "clusters":
+            meta_summary = self._summarize_by_topic(summaries, stream_to=output_path)
+        else:
+            meta_summary = self._summarize_hierarchically(summaries, stream_to=output_path)
+        
+        # Save meta-summary, also when it came from the cache
+        with open(output_path, "w") as f:
+            f.write(meta_summary)
+        
+        print(f"Meta-summary saved to {output_path}")
+        if self.stream_totals["streamed_requests"]:
+            print(StreamRecorder.report(self.stream_totals))
+    
+    def _final_prompt(self, summaries: list[str]) -> str:
+        """Build the prompt of a meta-summary over individual analyses."""
+        individual_analyses = "\n".join(f"Paper {i+1}:\n{summary}\n" for i, summary in enumerate(summaries))
+        return f"""I have analyzed {len(summaries)} papers for my literature review. Below are the individual analyses. {FINAL_INSTRUCTIONS}
+
+Individual Paper Analyses:
+
+{individual_analyses}"""
+
+    def _group_prompt(self, summaries: list[str]) -> str:
+        """Build the prompt that summarizes one group of individual analyses."""
+        individual_analyses = "\n".join(f"Paper {i+1}:\n{summary}\n" for i, summary in enumerate(summaries))
+        return f"""I have analyzed papers for my literature review. Below are the individual analyses of {len(summaries)} of them, one group of a larger set. Please write a partial meta-summary of this group that:
 1. Identifies common themes and patterns
 2. Highlights key differences and contradictions
-3. Suggests potential research directions based on gaps in the literature
-4. Provides a structured overview of the current state of research in this area
+3. Notes gaps in the literature and open questions
+4. Keeps the specific methods, results and relevance scores that a summary of the whole set would need
 
 Individual Paper Analyses:
 
-{chr(10).join(f"Paper {i+1}:\n{summary}\n" for i, summary in enumerate(summaries))}"""
+{individual_analyses}"""
+
+    def _reduce_prompt(self, partials: list[str], final: bool) -> str:
+        """Build the prompt that merges partial meta-summaries, or writes the final one from them."""
+        partial_summaries = "\n".join(f"Group {i+1}:\n{partial}\n" for i, partial in enumerate(partials))
+        if final:
+            instructions = FINAL_INSTRUCTIONS
+        else:
+            instructions = (
+                "Please merge them into a single partial meta-summary with the same structure, "
+                "keeping the specific methods, results and relevance scores that a summary of the whole set would need."
+            )
+        return f"""I have analyzed papers for my literature review and summarized them in groups. Below are {len(partials)} partial meta-summaries, each covering a different group of papers. {instructions}
+
+Partial Meta-Summaries:
+
+{partial_summaries}"""
 
-        # Get meta-summary from Claude with retries
-        meta_summary = self._call_claude_api(prompt)
-        if meta_summary is None:
-            raise RuntimeError("Failed to generate meta-summary after maximum retries")
+    def _estimate_tokens(self, text: str) -> int:
+        """Estimate the number of tokens of a text, at about 4 characters per token."""
+        return len(text) // 4
+    
+    def _group(self, texts: list[str]) -> list[list[str]]:
+        """Split texts into groups that fit in one prompt.
         
-        # Save meta-summary
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        output_path = self.output_dir / f"meta_summary_{timestamp}.md"
+        Besides the token limit, a group ends after any text whose hash is a
+        multiple of group_size, so groups average group_size texts. The
+        boundaries depend on the content alone, so adding papers only changes
+        the groups they land in, and the other groups keep their cached summaries.
+        Every group but the last has at least two texts, so each level shrinks.
         
-        with open(output_path, "w") as f:
-            f.write(meta_summary)
-            
-        print(f"Meta-summary saved to {output_path}") 
\ No newline at end of file
+        Args:
+            texts: Analyses or partial summaries in order
+        
+        Returns:
+            Groups of consecutive texts, a single one if all texts fit in one prompt
+        """
+        if sum(map(self._estimate_tokens, texts)) <= self.config.meta_summary_max_group_tokens:
+            return [texts]
+        
+        groups = []
+        group, group_tokens = [], 0
+        for text in texts:
+            tokens = self._estimate_tokens(text)
+            if len(group) >= 2 and group_tokens + tokens > self.config.meta_summary_max_group_tokens:
+                groups.append(group)
+                group, group_tokens = [], 0
+            group.append(text)
+            group_tokens += tokens
+            if len(group) >= 2 and int(self.fingerprints.text(text)[:8], 16) % self.config.meta_summary_group_size == 0:
+                groups.append(group)
+                group, group_tokens = [], 0
+        if group:
+            groups.append(group)
+        return groups
+    
+    def _summarize_node(self, prompt: str, stream_to: Path = None) -> str:
+        """Get the summary of one node of the meta-summary tree, from the cache if possible.
+        
+        Args:
+            prompt: Prompt of the node, which contains the texts of its children
+            stream_to: File the summary is streamed to if it is requested
+        
+        Returns:
+            Summary text
+        """
+        key = self.fingerprints.combine(
+            "meta-summary-v1",
+            self.fingerprints.text(prompt),
+            self.config.claude_model,
+            self.config.claude_max_tokens,
+            self.config.claude_temperature
+        )
+        if cached_result := self.cache.get_by_key(META_SUMMARY_CACHE_ID, key):
+            return cached_result["summary"]
+        
+        summary = self._call_claude_api(prompt, stream_to=stream_to)
+        if summary is None:
+            raise RuntimeError("Failed to generate partial meta-summary after maximum retries")
+        self.cache.save_by_key(META_SUMMARY_CACHE_ID, key, {"summary": summary})
+        return summary
+    
+    def _reduce_levels(self, texts: list[str]) -> tuple[list[str], int]:
+        """Summarize texts in groups, level by level, until they fit in one prompt.
+        
+        Args:
+            texts: Analyses or partial summaries
+        
+        Returns:
+            Tuple of (texts that fit in one prompt, number of levels summarized)
+        """
+        level = 0
+        while len(groups := self._group(texts)) > 1:
+            level += 1
+            print(f"Summarizing {len(texts)} {'analyses' if level == 1 else 'partial summaries'} "
+                  f"in {len(groups)} groups (level {level})...")
+            prompts = [
+                self._group_prompt(group) if level == 1 else self._reduce_prompt(group, final=False)
+                for group in groups
+            ]
+            try:
+                with ThreadPoolExecutor(max_workers=self.config.meta_summary_workers) as executor:
+                    texts = list(executor.map(self._summarize_node, prompts))
+            finally:
+                self.cache.flush()
+        return texts, level
+    
+    def _summarize_hierarchically(self, summaries: list[str], stream_to: Path = None) -> str:
+        """Reduce analyses to a meta-summary through a tree of partial summaries.
+        
+        Each level groups its texts with _group() and summarizes the groups in
+        parallel, until a level fits in one prompt. Every node is cached by
+        the hash of its prompt, so a rerun only requests the nodes whose
+        inputs changed, and nodes finished before a failure are kept.
+        
+        Args:
+            summaries: Individual paper analyses
+            stream_to: File the final summary is streamed to
+        
+        Returns:
+            Meta-summary text
+        """
+        texts, level = self._reduce_levels(summaries)
+        prompt = self._final_prompt(texts) if level == 0 else self._reduce_prompt(texts, final=True)
+        try:
+            return self._summarize_node(prompt, stream_to)
+        finally:
+            self.cache.flush()
+    
+    def _load_cluster_state(self) -> dict | None:
+        """Load the topic model and cluster assignments of the last clustered meta-summary, if any."""
+        state_path = Path(self.config.meta_summary_cluster_state_file)
+        if not state_path.exists():
+            return None
+        with open(state_path) as f:
+            return json.load(f)
+    
+    def _save_cluster_state(self, state: dict) -> None:
+        """Persist the topic model and cluster assignments atomically."""
+        state_path = Path(self.config.meta_summary_cluster_state_file)
+        state_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = state_path.with_suffix(state_path.suffix + ".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(state, f)
+        os.replace(tmp_path, state_path)
+    
+    def _cluster(self, summaries: list[str]) -> np.ndarray:
+        """Group analyses by topic, reusing the assignments of earlier runs.
+        
+        Analyses clustered before keep their cluster, and new ones join the
+        nearest stored centroid, so a rerun only changes the clusters that
+        gained or lost papers. The clustering is fitted again when the
+        settings change or when more than a quarter of the analyses are new.
+        
+        Args:
+            summaries: Individual paper analyses
+        
+        Returns:
+            Cluster index of each analysis
+        """
+        clusterer = TopicClusterer(max_features=self.config.meta_summary_max_features)
+        hashes = [self.fingerprints.text(summary) for summary in summaries]
+        settings = [self.config.meta_summary_clusters, self.config.meta_summary_max_features]
+        
+        state = self._load_cluster_state()
+        if state and state["settings"] == settings:
+            assignments = state["assignments"]
+            new = [index for index, digest in enumerate(hashes) if digest not in assignments]
+            if len(new) <= len(summaries) // 4:
+                labels = np.array([assignments.get(digest, -1) for digest in hashes])
+                if new:
+                    vectors = clusterer.embed([summaries[index] for index in new], state["vocabulary"], np.array(state["idf"]))
+                    labels[new] = clusterer.assign(vectors, np.array(state["centroids"]))
+                self._save_cluster_state({**state, "assignments": dict(zip(hashes, labels.tolist()))})
+                return labels
+        
+        n_clusters = self.config.meta_summary_clusters or max(2, round((len(summaries) / 2) ** 0.5))
+        print(f"Clustering {len(summaries)} analyses into {n_clusters} topics...")
+        vocabulary, idf = clusterer.fit_vocabulary(summaries)
+        vectors = clusterer.embed(summaries, vocabulary, idf)
+        centroids = clusterer.fit_centroids(vectors, n_clusters)
+        labels = clusterer.assign(vectors, centroids)
+        self._save_cluster_state({
+            "settings": settings,
+            "vocabulary": vocabulary,
+            "idf": idf.tolist(),
+            "centroids": centroids.tolist(),
+            "assignments": dict(zip(hashes, labels.tolist()))
+        })
+        return labels
+    
+    def _topic_prompt(self, texts: list[str], partial: bool) -> str:
+        """Build the prompt that summarizes the analyses of one topic cluster."""
+        label = "Partial Summaries" if partial else "Individual Paper Analyses"
+        numbered = "\n".join(f"{'Group' if partial else 'Paper'} {i+1}:\n{text}\n" for i, text in enumerate(texts))
+        return f"""I have analyzed papers for my literature review and grouped them by topic. Below are the {label.lower()} of one topic. Please:
+1. Name the topic in a short title
+2. Summarize the approaches and findings the papers share
+3. Highlight key differences and contradictions between them
+4. Note gaps in the literature and open questions within this topic
+
+{label}:
+
+{numbered}"""
+
+    def _synthesis_prompt(self, topic_summaries: list[str], n_papers: int) -> str:
+        """Build the prompt that combines the topic summaries into the meta-summary."""
+        topics = "\n".join(f"Topic {i+1}:\n{summary}\n" for i, summary in enumerate(topic_summaries))
+        return f"""I have analyzed {n_papers} papers for my literature review and grouped them into {len(topic_summaries)} topics. Below is a summary of each topic. {FINAL_INSTRUCTIONS}
+
+Organize the meta-summary around these topics and the connections between them.
+
+Topic Summaries:
+
+{topics}"""
+
+    def _summarize_topic(self, texts: list[str]) -> str:
+        """Summarize one topic cluster, reducing it in groups first if it doesn't fit in one prompt."""
+        texts, level = self._reduce_levels(texts)
+        return self._summarize_node(self._topic_prompt(texts, partial=level > 0))
+    
+    def _summarize_by_topic(self, summaries: list[str], stream_to: Path = None) -> str:
+        """Build the meta-summary from one summary per topic cluster.
+        
+        Analyses are clustered locally with _cluster(), each cluster is
+        summarized in its own request, in parallel, and a final request
+        combines the topic summaries. Topic summaries are cached like the
+        nodes of the hierarchical mode, so only clusters whose papers changed
+        are requested again.
+        
+        Args:
+            summaries: Individual paper analyses
+            stream_to: File the final synthesis is streamed to
+        
+        Returns:
+            Meta-summary text
+        """
+        if len(summaries) <= self.config.meta_summary_group_size:
+            # Too few analyses to be worth clustering
+            return self._summarize_hierarchically(summaries, stream_to)
+        
+        labels = self._cluster(summaries)
+        # Papers keep their order within a topic, so unchanged topics have unchanged prompts
+        topics = [
+            [summary for summary, label in zip(summaries, labels) if label == cluster]
+            for cluster in sorted(set(labels.tolist()))
+        ]
+        print(f"Summarizing {len(topics)} topics of {', '.join(str(len(topic)) for topic in topics)} papers...")
+        try:
+            with ThreadPoolExecutor(max_workers=self.config.meta_summary_workers) as executor:
+                topic_summaries = list(executor.map(self._summarize_topic, topics))
+            return self._summarize_node(self._synthesis_prompt(topic_summaries, len(summaries)), stream_to)
+        finally:
+            self.cache.flush()
@@ -0,0 +1,119 @@
+from concurrent.futures import ProcessPoolExecutor
+import json
+import multiprocessing
+import os
+from pathlib import Path
+import re
+from .analysis_schema import field_columns
+
+# Columns filled from each summary, in CSV order
+SUMMARY_FIELDS = ("Summary", "Relation to project", "Potential Extensions", "Relevance", "Reasoning")
+
+# A section heading opens a paragraph: an optional list marker like "1." or
+# "*", optional bold or markdown heading markers, a label like "Summary of the paper" and a colon. Labels run to the
+# first colon of their line, so matching never crosses a line. The leading
+# blank line lets the regex engine skip ahead to candidate positions.
+_HEADING = re.compile(r"\n[ \t]*\n[ \t]*(?:(?:\d+\.|[-*+])[ \t]+)?(?:#{1,6}[ \t]+)?(?:\*\*)?(?P<label>[A-Z][^:\n]{0,120}?)(?:\*\*)?:[ \t]*(?:\*\*)?")
+# Labels that can head a section; others, like "Figure 3" or "In particular, the authors", are body text
+_LABEL = re.compile(r"[A-Za-z /*]+(?: of .*)?")
+
+# Section kinds, matched at the start of a label
+_SECTION_KINDS = (
+    ("Summary", re.compile(r"summary\b", re.IGNORECASE)),
+    ("Relation to project", re.compile(r"(?:relation to|key findings relevant to|relevance to) ", re.IGNORECASE)),
+    ("Potential Extensions", re.compile(r"potential (?:extensions|topics)", re.IGNORECASE)),
+)
+# The score follows the first mention of relevance or a score, after a colon
+_SCORE_LABEL = re.compile(r"Relevance|Score")
+_SCORE = re.compile(r"[^:]*:.*?(\d+)/100[ \t]*(?:\*\*)?", re.DOTALL)
+
+def parse_summary(content: str) -> dict:
+    """Split the markdown of a paper analysis into its sections in one pass.
+    
+    Args:
+        content: Markdown written for one paper
+    
+    Returns:
+        Dictionary with a value for each of SUMMARY_FIELDS, "N/A" where the
+        section is missing
+    """
+    parsed = dict.fromkeys(SUMMARY_FIELDS, "N/A")
+    # So a heading on the first line opens a paragraph too
+    content = "\n\n" + content
+    
+    # Section boundaries, as (label, start of heading, start of body)
+    headings = []
+    for match in _HEADING.finditer(content):
+        label = match.group("label").strip("* ")
+        if _LABEL.fullmatch(label):
+            headings.append((label, match.start(), match.end()))
+    
+    for index, (label, _, body_start) in enumerate(headings):
+        body_end = headings[index + 1][1] if index + 1 < len(headings) else len(content)
+        for field, pattern in _SECTION_KINDS:
+            if parsed[field] == "N/A" and pattern.match(label):
+                parsed[field] = content[body_start:body_end].strip()
+                break
+    
+    # The reasoning is everything after the score but a closing question
+    if (label := _SCORE_LABEL.search(content)) and (match := _SCORE.match(content, label.end())):
+        parsed["Relevance"] = match.group(1)
+        paragraphs = content[match.end():].strip().split("\n\n")
+        if paragraphs and paragraphs[-1].strip().endswith("?"):
+            paragraphs = paragraphs[:-1]
+        parsed["Reasoning"] = "\n\n".join(paragraphs).strip()
+    return parsed
+
+def parse_summary_file(file_path: str | Path) -> dict:
+    """Parse a markdown summary file, see parse_summary().
+    
+    Raw JSON files of structured analyses are read as they are, without
+    parsing the markdown. Module-level so it can run in a worker process.
+    
+    Args:
+        file_path: Path to the markdown summary, or to the raw JSON of a structured analysis
+    
+    Returns:
+        Parsed sections, all "N/A" if the file can't be read
+    """
+    try:
+        with open(file_path, encoding="utf-8") as f:
+            if str(file_path).endswith(".json"):
+                return field_columns(json.load(f)["fields"])
+            return parse_summary(f.read())
+    except Exception as e:
+        print(f"Error parsing summary file {file_path}: {e}")
+        return dict.fromkeys(SUMMARY_FIELDS, "N/A")
+
+class SummaryParser:
+    def __init__(self, workers: int = 1, files_per_task: int = 64):
+        """Initialize a parser of many summary files.
+        
+        Args:
+            workers: Number of worker processes, at most one per CPU. With 1,
+                or for fewer files than one task holds, files are parsed in
+                the calling process.
+            files_per_task: Files sent to a worker at once
+        """
+        self.workers = min(workers, os.cpu_count() or 1)
+        self.files_per_task = files_per_task
+    
+    def parse_files(self, file_paths: list[str | Path]) -> list[dict]:
+        """Parse many summary files.
+        
+        Args:
+            file_paths: Paths to the summary files
+        
+        Returns:
+            Parsed sections of each file, in the same order as file_paths
+        """
+        file_paths = [str(file_path) for file_path in file_paths]
+        if self.workers <= 1 or len(file_paths) <= self.files_per_task:
+            return [parse_summary_file(file_path) for file_path in file_paths]
+        
+        # spawn keeps the workers independent of the caller's threads
+        with ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn")
+        ) as pool:
+            return list(pool.map(parse_summary_file, file_paths, chunksize=self.files_per_task))
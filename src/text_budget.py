@@ -0,0 +1,208 @@
+import re
+import threading
+
+# Section kinds in the order they are kept when a paper exceeds its budget.
+# Text before the first heading holds the title, authors and usually the abstract.
+SECTION_PRIORITY = (
+    "front",
+    "abstract",
+    "introduction",
+    "conclusion",
+    "method",
+    "results",
+    "discussion",
+    "other",
+    "related_work",
+    "appendix",
+    "references"
+)
+
+# Heading titles recognized for each section kind, matched after the section number
+SECTION_TITLES = {
+    "abstract": r"abstract",
+    "introduction": r"introduction",
+    "related_work": r"related\s+works?|background|preliminaries|prior\s+work",
+    "method": r"methods?|methodology|(?:our|proposed)\s+(?:approach|method)|approach|model|framework|problem\s+(?:setup|formulation|statement)",
+    "results": r"experiments?|(?:experimental|empirical)\s+(?:setup|results|evaluation|study)|results|evaluation",
+    "discussion": r"discussion|limitations|analysis",
+    "conclusion": r"conclusions?|concluding\s+remarks|summary|future\s+work",
+    "references": r"references|bibliography",
+    "appendix": r"appendix|appendices|supplementary(?:\s+material)?"
+}
+
+# Single-word titles that also stand alone on a line as figure or table labels
+# in extracted text, so they only head a section when numbered or after a blank line
+AMBIGUOUS_TITLES = {"model", "analysis", "summary", "approach", "results", "evaluation"}
+
+class TextBudget:
+    def __init__(self, max_tokens: int, chars_per_token: float = 4.0):
+        """Initialize a budget that trims paper text to a number of input tokens.
+        
+        The text is split at its section headings, and sections are kept in
+        the order of SECTION_PRIORITY until the budget is used up, so the
+        references go first and the appendix next. Kept sections stay in
+        document order, and each omitted one is replaced by a one-line note.
+        
+        Args:
+            max_tokens: Estimated tokens of paper text sent per analysis
+            chars_per_token: Characters per token of the estimate
+        """
+        self.max_tokens = max_tokens
+        self.chars_per_token = chars_per_token
+        
+        titles = "|".join(f"(?P<{kind}>{pattern})" for kind, pattern in SECTION_TITLES.items())
+        # A heading is a short line: an optional number like "3", "3.", "IV." or "A", then a title
+        self._known_heading = re.compile(
+            rf"^[ \t]*(?:(?P<number>\d{{1,2}}\.?|[IVX]{{1,4}}\.|[A-H]\.?)[ \t]+)?(?:{titles})[ \t]*:?[ \t]*$",
+            re.IGNORECASE | re.MULTILINE
+        )
+        # Other top-level headings, like "4 Scaling Laws" or "B Proofs"
+        self._numbered_heading = re.compile(
+            r"^[ \t]*(?P<number>\d{1,2}\.?|[A-H]\.?)[ \t]+(?P<title>[A-Z][A-Za-z\-]*(?:[ \t]+[A-Za-z\-]+){0,7})[ \t]*$",
+            re.MULTILINE
+        )
+        
+        # Savings of this run
+        self.totals = {
+            "papers": 0,
+            "trimmed": 0,
+            "original_tokens": 0,
+            "sent_tokens": 0
+        }
+        self._lock = threading.Lock()
+    
+    def fingerprint(self) -> str:
+        """Identify the budget settings, for cache keys."""
+        return f"text-budget:{self.max_tokens}:{self.chars_per_token}"
+    
+    def estimate_tokens(self, text: str) -> int:
+        """Estimate the number of tokens of a text from its length.
+        
+        Args:
+            text: Text to estimate
+        
+        Returns:
+            Estimated token count
+        """
+        return int(len(text) / self.chars_per_token + 0.5)
+    
+    def _follows_blank_line(self, text: str, start: int) -> bool:
+        """Whether the line starting at start is the first of the text or follows a blank line."""
+        if start == 0:
+            return True
+        previous_start = text.rfind("\n", 0, start - 1) + 1
+        return not text[previous_start:start - 1].strip()
+    
+    def split_sections(self, text: str) -> list[tuple[str, str]]:
+        """Split paper text at its section headings.
+        
+        Args:
+            text: Extracted text of a paper
+        
+        Returns:
+            (kind, text) tuples in document order, each starting with its heading
+        """
+        headings = []
+        for match in self._known_heading.finditer(text):
+            kind = next(kind for kind in SECTION_TITLES if match.group(kind))
+            if (match.group(kind).lower() in AMBIGUOUS_TITLES and not match.group("number")
+                    and not self._follows_blank_line(text, match.start())):
+                continue
+            headings.append((match.start(), kind, match.group("number")))
+        known_starts = {start for start, _, _ in headings}
+        for match in self._numbered_heading.finditer(text):
+            if match.start() not in known_starts:
+                headings.append((match.start(), "other", match.group("number")))
+        headings.sort()
+        
+        boundaries = [(0, "front")]
+        back_matter = False
+        for start, kind, number in headings:
+            if kind in ("references", "appendix"):
+                back_matter = True
+            elif kind == "other" and back_matter:
+                # Unnamed sections after the references, like "B Proofs", are appendices
+                kind = "appendix"
+            elif kind == "other" and not number[0].isdigit():
+                # Before the references a capital letter is more likely a sentence, as in "A new model"
+                continue
+            boundaries.append((start, kind))
+        
+        sections = []
+        for index, (start, kind) in enumerate(boundaries):
+            end = boundaries[index + 1][0] if index + 1 < len(boundaries) else len(text)
+            if text[start:end].strip():
+                sections.append((kind, text[start:end]))
+        return sections
+    
+    def _truncate(self, section: str, tokens: int) -> str:
+        """Cut a section to about a number of tokens at a paragraph or line break."""
+        limit = int(tokens * self.chars_per_token)
+        cut = section.rfind("\n\n", 0, limit)
+        if cut < limit // 2:
+            cut = section.rfind("\n", 0, limit)
+        if cut < limit // 2:
+            cut = limit
+        return section[:cut]
+    
+    def fit(self, text: str) -> tuple[str, dict]:
+        """Trim paper text to the budget.
+        
+        Args:
+            text: Extracted text of a paper
+        
+        Returns:
+            Tuple of (text to send, stats with original_tokens, sent_tokens and
+            the omitted and truncated section kinds)
+        """
+        original_tokens = self.estimate_tokens(text)
+        stats = {"original_tokens": original_tokens, "sent_tokens": original_tokens, "omitted": [], "truncated": []}
+        if original_tokens <= self.max_tokens:
+            self._record(stats)
+            return text, stats
+        
+        sections = self.split_sections(text)
+        order = sorted(range(len(sections)), key=lambda index: SECTION_PRIORITY.index(sections[index][0]))
+        kept = [None] * len(sections)
+        remaining = self.max_tokens
+        for index in order:
+            kind, section = sections[index]
+            tokens = self.estimate_tokens(section)
+            if tokens <= remaining:
+                kept[index] = section
+                remaining -= tokens
+            elif remaining >= 200 and kind != "references":
+                # A partial reference list is of no use, but the start of other sections is
+                kept[index] = self._truncate(section, remaining) + f"\n[... rest of this section omitted, ~{tokens - remaining} tokens ...]\n"
+                stats["truncated"].append(kind)
+                remaining = 0
+            else:
+                kept[index] = f"\n[{kind.replace('_', ' ').capitalize()} section omitted, ~{tokens} tokens]\n"
+                stats["omitted"].append(kind)
+        
+        budgeted = "".join(kept)
+        stats["sent_tokens"] = self.estimate_tokens(budgeted)
+        stats["omitted"] = sorted(set(stats["omitted"]), key=SECTION_PRIORITY.index)
+        self._record(stats)
+        return budgeted, stats
+    
+    def _record(self, stats: dict) -> None:
+        """Add the savings of one paper to the run totals."""
+        with self._lock:
+            self.totals["papers"] += 1
+            self.totals["trimmed"] += stats["sent_tokens"] < stats["original_tokens"]
+            self.totals["original_tokens"] += stats["original_tokens"]
+            self.totals["sent_tokens"] += stats["sent_tokens"]
+    
+    def report(self) -> str:
+        """Summarize the estimated input tokens saved in this run.
+        
+        Returns:
+            Human-readable report
+        """
+        totals = self.totals
+        saved = totals["original_tokens"] - totals["sent_tokens"]
+        return (
+            f"Text budget: {totals['trimmed']} of {totals['papers']} papers trimmed to {self.max_tokens} tokens, "
+            f"~{saved} input tokens saved ({saved / max(totals['original_tokens'], 1):.1%} of the paper text)"
+        )
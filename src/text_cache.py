@@ -0,0 +1,110 @@
+import os
+from pathlib import Path
+import sqlite3
+import threading
+from typing import Optional
+from .blob_store import BlobStore
+from .fingerprint import Fingerprinter
+
+class ExtractedTextCache:
+    def __init__(self, cache_dir: str = ".cache", fingerprints: Fingerprinter = None):
+        """Initialize the cache of text extracted from PDFs.
+        
+        Texts are keyed by the SHA-256 of the PDF and the extractor version and
+        kept in the shared blob store, so the text of a paper is stored once for
+        both this cache and the prompt cache. The file size and modification
+        time of each PDF are recorded too, so an unchanged file is found
+        without hashing it again.
+        
+        Args:
+            cache_dir: Directory of the cache database and blob store
+            fingerprints: Fingerprinter used to hash PDFs. Sharing the analyzer's
+                lets it reuse the hashes looked up here.
+        """
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(exist_ok=True)
+        self.blobs = BlobStore(self.cache_dir / "blobs")
+        self.fingerprints = fingerprints or Fingerprinter()
+        
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.cache_dir / "text_cache.sqlite", check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS texts (
+                pdf_hash TEXT NOT NULL,
+                extractor_version TEXT NOT NULL,
+                blob TEXT NOT NULL,
+                path TEXT,
+                size INTEGER,
+                mtime_ns INTEGER,
+                PRIMARY KEY (pdf_hash, extractor_version)
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS texts_by_file ON texts (path, size, mtime_ns)")
+        self._conn.commit()
+    
+    def _file_signature(self, pdf_path: Path) -> tuple[str, int, int]:
+        """Get the (path, size, mtime_ns) of a file."""
+        stat = os.stat(pdf_path)
+        return str(Path(pdf_path).resolve()), stat.st_size, stat.st_mtime_ns
+    
+    def get(self, pdf_path: Path, extractor_version: str) -> Optional[str]:
+        """Get the cached text of a PDF.
+        
+        Args:
+            pdf_path: Path to the PDF file
+            extractor_version: Version of the extraction code that produced the text
+        
+        Returns:
+            The extracted text, or None if not cached
+        """
+        signature = self._file_signature(pdf_path)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT pdf_hash, blob FROM texts WHERE path = ? AND size = ? AND mtime_ns = ? AND extractor_version = ?",
+                (*signature, extractor_version)
+            ).fetchone()
+        if row is not None:
+            self.fingerprints.remember_file(pdf_path, row[0])
+        else:
+            # The file may have been moved or touched without changing its content
+            pdf_hash = self.fingerprints.file(pdf_path)
+            with self._lock, self._conn:
+                row = self._conn.execute(
+                    "SELECT pdf_hash, blob FROM texts WHERE pdf_hash = ? AND extractor_version = ?",
+                    (pdf_hash, extractor_version)
+                ).fetchone()
+                if row is not None:
+                    self._conn.execute(
+                        "UPDATE texts SET path = ?, size = ?, mtime_ns = ? WHERE pdf_hash = ? AND extractor_version = ?",
+                        (*signature, pdf_hash, extractor_version)
+                    )
+        if row is None:
+            return None
+        
+        try:
+            return self.blobs.get({BlobStore.REF_KEY: row[1]})
+        except (OSError, RuntimeError) as e:
+            print(f"\nWarning: Cached text for {Path(pdf_path).name} is unreadable, will re-extract: {str(e)}")
+            return None
+    
+    def save(self, pdf_path: Path, extractor_version: str, text: str) -> None:
+        """Cache the text extracted from a PDF.
+        
+        Args:
+            pdf_path: Path to the PDF file
+            extractor_version: Version of the extraction code that produced the text
+            text: Extracted text
+        """
+        signature = self._file_signature(pdf_path)
+        pdf_hash = self.fingerprints.file(pdf_path)
+        try:
+            ref = self.blobs.put(text)
+        except OSError as e:
+            print(f"\nWarning: Failed to cache extracted text for {Path(pdf_path).name}: {str(e)}")
+            return
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO texts (pdf_hash, extractor_version, blob, path, size, mtime_ns) VALUES (?, ?, ?, ?, ?, ?)",
+                (pdf_hash, extractor_version, ref[BlobStore.REF_KEY], *signature)
+            )
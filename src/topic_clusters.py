@@ -0,0 +1,132 @@
+import numpy as np
+from .relevance_filter import RelevanceFilter
+
+class TopicClusterer:
+    def __init__(self, max_features: int = 2000, max_iterations: int = 50, seed: int = 0):
+        """Initialize a local topic clusterer for paper analyses.
+        
+        Texts are embedded as L2-normalized TF-IDF vectors over a vocabulary
+        learned from the texts themselves, and grouped with spherical k-means
+        on the NumPy matrix. No API calls are made.
+        
+        Args:
+            max_features: Largest vocabulary size; the terms found in most texts are kept
+            max_iterations: Upper bound on k-means iterations
+            seed: Seed of the k-means++ initialization, so results are reproducible
+        """
+        self.max_features = max_features
+        self.max_iterations = max_iterations
+        self.seed = seed
+        self._tokenizer = RelevanceFilter()
+    
+    def _term_counts(self, texts: list[str], vocabulary: dict) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Count vocabulary terms per text.
+        
+        Returns:
+            Tuple of (text index, term index, count) arrays, one entry per distinct pair
+        """
+        doc_ids = []
+        term_ids = []
+        for doc_id, text in enumerate(texts):
+            matches = [term_id for term_id in map(vocabulary.get, self._tokenizer.tokenize(text)) if term_id is not None]
+            doc_ids += [doc_id] * len(matches)
+            term_ids += matches
+        pair_keys = np.asarray(doc_ids, dtype=np.int64) * max(len(vocabulary), 1) + np.asarray(term_ids, dtype=np.int64)
+        pair_keys, counts = np.unique(pair_keys, return_counts=True)
+        pair_docs, pair_terms = np.divmod(pair_keys, max(len(vocabulary), 1))
+        return pair_docs, pair_terms, counts
+    
+    def fit_vocabulary(self, texts: list[str]) -> tuple[list[str], np.ndarray]:
+        """Learn the vocabulary and inverse document frequencies of a corpus.
+        
+        Terms in fewer than two texts, or in more than half of them (like the
+        headings every analysis shares), carry no topic and are left out.
+        
+        Args:
+            texts: Texts to learn from
+        
+        Returns:
+            Tuple of (vocabulary terms, IDF of each term)
+        """
+        doc_freqs = {}
+        for text in texts:
+            for term in set(self._tokenizer.tokenize(text)):
+                doc_freqs[term] = doc_freqs.get(term, 0) + 1
+        max_df = max(2, len(texts) // 2)
+        candidates = [(freq, term) for term, freq in doc_freqs.items() if 2 <= freq <= max_df]
+        # Most frequent first, ties broken alphabetically so the vocabulary is deterministic
+        candidates.sort(key=lambda item: (-item[0], item[1]))
+        vocabulary = sorted(term for _, term in candidates[:self.max_features])
+        freqs = np.array([doc_freqs[term] for term in vocabulary], dtype=float)
+        idf = np.log((1 + len(texts)) / (1 + freqs)) + 1
+        return vocabulary, idf
+    
+    def embed(self, texts: list[str], vocabulary: list[str], idf: np.ndarray) -> np.ndarray:
+        """Embed texts as TF-IDF vectors.
+        
+        Args:
+            texts: Texts to embed
+            vocabulary: Terms from fit_vocabulary()
+            idf: IDF of each term from fit_vocabulary()
+        
+        Returns:
+            Matrix with one L2-normalized row per text; rows of texts without
+            vocabulary terms are zero
+        """
+        vectors = np.zeros((len(texts), len(vocabulary)))
+        if not texts or not vocabulary:
+            return vectors
+        pair_docs, pair_terms, counts = self._term_counts(texts, {term: index for index, term in enumerate(vocabulary)})
+        # Sublinear term frequency, so one term repeated throughout an analysis doesn't dominate
+        vectors[pair_docs, pair_terms] = (1 + np.log(counts)) * idf[pair_terms]
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return np.divide(vectors, norms, out=vectors, where=norms > 0)
+    
+    def fit_centroids(self, vectors: np.ndarray, n_clusters: int) -> np.ndarray:
+        """Cluster vectors with spherical k-means.
+        
+        Args:
+            vectors: L2-normalized rows from embed()
+            n_clusters: Number of clusters; reduced to the number of vectors if larger
+        
+        Returns:
+            Matrix with one L2-normalized centroid per row
+        """
+        rng = np.random.default_rng(self.seed)
+        n_clusters = min(n_clusters, len(vectors))
+        
+        # k-means++ initialization on cosine distance
+        centroids = [vectors[rng.integers(len(vectors))]]
+        distances = 1 - vectors @ centroids[0]
+        for _ in range(1, n_clusters):
+            weights = np.clip(distances, 0, None)
+            if weights.sum() <= 0:
+                weights = np.ones(len(vectors))
+            centroids.append(vectors[rng.choice(len(vectors), p=weights / weights.sum())])
+            distances = np.minimum(distances, 1 - vectors @ centroids[-1])
+        centroids = np.array(centroids)
+        
+        labels = None
+        for _ in range(self.max_iterations):
+            new_labels = self.assign(vectors, centroids)
+            if labels is not None and np.array_equal(labels, new_labels):
+                break
+            labels = new_labels
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, labels, vectors)
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            # Empty clusters keep their previous centroid
+            centroids = np.where(norms > 0, sums / np.where(norms > 0, norms, 1), centroids)
+        return centroids
+    
+    def assign(self, vectors: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+        """Assign vectors to their most similar centroid.
+        
+        Args:
+            vectors: L2-normalized rows from embed()
+            centroids: Centroids from fit_centroids()
+        
+        Returns:
+            Cluster index of each vector
+        """
+        return np.argmax(vectors @ centroids.T, axis=1)
@@ -0,0 +1,222 @@
+import asyncio
+import json
+from pathlib import Path
+import re
+from .claude_analyzer import ClaudeAnalyzer
+from .config import Config
+
+class PaperTriage:
+    def __init__(self, analyzer: ClaudeAnalyzer, config: Config = None):
+        """Initialize the cheap-model relevance triage.
+        
+        A fast model scores each paper's abstract (or first pages) against the
+        project context. Only papers scoring at least the threshold are
+        analyzed in full by the main model. Triage results live in the
+        analyzer's PromptCache under their own keys, apart from the analyses.
+        
+        Args:
+            analyzer: Analyzer whose API client, rate limiter and cache are shared
+            config: Configuration object. If None, uses the analyzer's config.
+        """
+        self.analyzer = analyzer
+        self.config = config or analyzer.config
+        
+        prompt_path = Path(__file__).parent.parent / "triage_prompt.txt"
+        with open(prompt_path) as f:
+            self.prompt_template = f.read()
+        self.template_hash = analyzer.fingerprints.text(self.prompt_template)
+        
+        # Token usage and time of the triage requests of this run
+        self.usage = {
+            "requests": 0,
+            "input_tokens": 0,
+            "output_tokens": 0,
+            "cache_creation_input_tokens": 0,
+            "cache_read_input_tokens": 0,
+            "seconds": 0.0,
+            "streamed_requests": 0,
+            "time_to_first_token": 0.0,
+            "generation_seconds": 0.0,
+            "streamed_output_tokens": 0
+        }
+        self.passed = 0
+        self.skipped = 0
+    
+    def _build_content(self, paper_text: str, project_context: str) -> list[dict]:
+        """Build the message content blocks, with the shared prefix cached like the analysis prompt."""
+        return [
+            {
+                "type": "text",
+                "text": f"Project Context:\n{project_context}"
+            },
+            {
+                "type": "text",
+                "text": self.prompt_template,
+                "cache_control": {"type": "ephemeral"}
+            },
+            {
+                "type": "text",
+                "text": f"Paper:\n{paper_text[:self.config.triage_max_input_chars]}"
+            }
+        ]
+    
+    def _cache_key(self, paper_id: str, paper_text: str, project_context: str) -> str:
+        """Build the cache key of a triage result from its inputs."""
+        fingerprints = self.analyzer.fingerprints
+        return fingerprints.combine(
+            "triage-v1",
+            paper_id,
+            fingerprints.text(paper_text[:self.config.triage_max_input_chars]),
+            fingerprints.text(project_context),
+            self.template_hash,
+            self.config.triage_model,
+            self.config.triage_max_tokens
+        )
+    
+    def _parse_response(self, text: str) -> tuple[int, str]:
+        """Get the score and reason from a triage response.
+        
+        Args:
+            text: Response text, a JSON object unless the model strayed from the format
+        
+        Returns:
+            Tuple of (score from 0 to 100, reason)
+        """
+        if match := re.search(r"\{.*\}", text, re.DOTALL):
+            try:
+                parsed = json.loads(match.group(0))
+                return max(0, min(100, int(parsed["score"]))), str(parsed.get("reason", ""))
+            except (ValueError, KeyError, TypeError):
+                pass
+        # Outside JSON, only a number after a "score" label or a leading "NN/100" is the score
+        if match := (re.search(r"\bscore\b\W*(?:(?:of|is)\s+)?(\d{1,3})\b", text, re.IGNORECASE)
+                     or re.match(r"\W*(\d{1,3})\s*/\s*100\b", text)):
+            return max(0, min(100, int(match.group(1)))), text.strip()
+        # Unreadable responses let the paper through rather than dropping it
+        return 100, f"Unreadable triage response: {text.strip()}"
+    
+    async def triage_paper_async(self, paper_id: str, paper_text: str, project_context: str) -> dict:
+        """Score a paper's relevance with the triage model.
+        
+        Args:
+            paper_id: arXiv paper ID
+            paper_text: Abstract or first pages of the paper
+            project_context: Content from the project's document
+        
+        Returns:
+            Dictionary with the score, the reason and the triage model
+        """
+        key = self._cache_key(paper_id, paper_text, project_context)
+        if cached_result := self.analyzer.cache.get_by_key(paper_id, key):
+            return cached_result
+        
+        response = await self.analyzer._call_claude_api_async(
+            self._build_content(paper_text, project_context),
+            model=self.config.triage_model,
+            max_tokens=self.config.triage_max_tokens,
+            usage=self.usage
+        )
+        if response is None:
+            raise RuntimeError(f"Failed to triage paper {paper_id} after maximum retries")
+        
+        score, reason = self._parse_response(response)
+        return self.analyzer.cache.save_by_key(paper_id, key, {
+            "score": score,
+            "reason": reason,
+            "model": self.config.triage_model
+        })
+    
+    def triage_papers(self, papers: list[tuple[str, str]], project_context: str) -> list[dict]:
+        """Score many papers, with several triage requests in flight at once.
+        
+        Args:
+            papers: (paper_id, paper_text) tuples
+            project_context: Content from the project's document
+        
+        Returns:
+            Triage results in the same order as papers, each with a "passed" flag
+        """
+        async def run() -> list[dict]:
+            semaphore = asyncio.Semaphore(self.config.max_in_flight)
+            
+            async def triage(paper_id: str, paper_text: str) -> dict:
+                async with semaphore:
+                    return await self.triage_paper_async(paper_id, paper_text, project_context)
+            
+            return await asyncio.gather(*(triage(paper_id, paper_text) for paper_id, paper_text in papers))
+        
+        results = []
+        for (paper_id, _), result in zip(papers, asyncio.run(run())):
+            passed = result["score"] >= self.config.triage_threshold
+            if passed:
+                self.passed += 1
+            else:
+                self.skipped += 1
+                print(f"Skipping paper {paper_id}: triage relevance {result['score']}/100")
+            results.append({**result, "passed": passed})
+        return results
+    
+    def skipped_result(self, paper_id: str, triage: dict, paper_text: str, project_context: str) -> dict:
+        """Build the stand-in analysis of a paper the triage model rejected.
+        
+        It is written like an analysis, so gather_summaries.py can parse it,
+        and is marked so it can be left out of the meta-summary. Like cached
+        analyses, it holds blob references instead of the texts, so the raw
+        file of each rejected paper doesn't repeat the project context.
+        
+        Args:
+            paper_id: arXiv paper ID
+            triage: Triage result
+            paper_text: Text the triage model saw
+            project_context: Content from the project's document
+        
+        Returns:
+            Dictionary shaped like an analysis result
+        """
+        return {
+            "analysis": (
+                f"Summary: Not analyzed in full. The triage model ({triage['model']}) rated paper {paper_id} "
+                f"below the relevance threshold of {self.config.triage_threshold}/100.\n\n"
+                f"Relevance score: {triage['score']}/100\n\n"
+                f"{triage['reason']}"
+            ),
+            "triage": {key: triage[key] for key in ("score", "reason", "model")},
+            "triage_skipped": True,
+            "paper_text": self.analyzer.cache.blobs.put(paper_text),
+            "project_context": self.analyzer.cache.blobs.put(project_context)
+        }
+    
+    def savings_report(self, analysis_usage: dict) -> str:
+        """Compare the run against analyzing every triaged paper with the main model.
+        
+        Skipped papers are assumed to cost what the papers analyzed in this
+        run cost on average. Download and extraction time saved is not counted.
+        
+        Args:
+            analysis_usage: Usage totals of the main model, ClaudeAnalyzer.usage
+        
+        Returns:
+            Human-readable report
+        """
+        triage_input = sum(self.usage[key] for key in ("input_tokens", "cache_creation_input_tokens", "cache_read_input_tokens"))
+        report = (
+            f"Triage with {self.config.triage_model}: {self.passed + self.skipped} papers, "
+            f"{self.skipped} skipped below {self.config.triage_threshold}/100\n"
+            f"Triage tokens: {triage_input} input, {self.usage['output_tokens']} output, "
+            f"{self.usage['seconds']:.1f}s in {self.usage['requests']} requests"
+        )
+        if analysis_usage["requests"] == 0:
+            return report + "\nNo papers were analyzed by the main model in this run, so savings can't be estimated."
+        
+        analyzed = analysis_usage["requests"]
+        per_paper_input = sum(
+            analysis_usage[key] for key in ("input_tokens", "cache_creation_input_tokens", "cache_read_input_tokens")
+        ) / analyzed
+        per_paper_output = analysis_usage["output_tokens"] / analyzed
+        per_paper_seconds = analysis_usage["seconds"] / analyzed
+        return report + (
+            f"\nEstimated savings against analyzing all papers with {self.config.claude_model}: "
+            f"{self.skipped * per_paper_input - triage_input:.0f} input tokens, "
+            f"{self.skipped * per_paper_output - self.usage['output_tokens']:.0f} output tokens, "
+            f"{self.skipped * per_paper_seconds - self.usage['seconds']:.1f}s of request time"
+        )
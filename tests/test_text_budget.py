@@ -0,0 +1,22 @@
+from literature_review.text_budget import TextBudget
+
+def test_figure_label_inside_a_section_is_not_a_heading():
+    text = (
+        "A Paper Title\n\nAbstract\n\nWe study scaling.\n\n"
+        "1 Introduction\n\nScaling matters.\n\n"
+        "2 Method\n\nWe train a transformer, shown below.\n"
+        "Model\n"
+        "Figure 1: Architecture of the transformer.\n\n"
+        "3 Results\n\nThe transformer scales.\n\n"
+        "References\n\n[1] A reference.\n"
+    )
+    sections = TextBudget(max_tokens=100).split_sections(text)
+    
+    assert [kind for kind, _ in sections] == ["front", "abstract", "introduction", "method", "results", "references"]
+    assert "Model\nFigure 1" in dict(sections)["method"]
+
+def test_ambiguous_title_after_a_blank_line_is_a_heading():
+    text = "Abstract\n\nWe study scaling.\n\nResults\n\nThe transformer scales.\n"
+    sections = TextBudget(max_tokens=100).split_sections(text)
+    
+    assert [kind for kind, _ in sections] == ["abstract", "results"]